@@ -1,3 +1,5 @@
+import os
+
 import streamlit as st
 
 st.set_page_config(
@@ -15,6 +17,8 @@ image_url = "https://raw.githubusercontent.com/JUNG-PFe/pitcher-visualization_2/
 # -------------------------------
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False  # 초기값: 로그아웃 상태
+if "is_admin" not in st.session_state:
+    st.session_state.is_admin = False  # 관리자: 사이드바에 실행 시간 패널 표시
 
 # -------------------------------
 # 아이디와 비밀번호 입력
@@ -25,6 +29,10 @@ st.sidebar.header("로그인 / 로그아웃")
 VALID_USERNAME = "KIA"
 VALID_PASSWORD = "kiatigers11"
 
+# 관리자 계정 (비밀번호는 환경 변수로만 설정, 없으면 관리자 로그인 불가)
+ADMIN_USERNAME = "KIA_admin"
+ADMIN_PASSWORD = os.environ.get("PITCHER_ADMIN_PASSWORD")
+
 # 로그인 상태 확인
 if not st.session_state.logged_in:
     # 로그인 폼
@@ -35,8 +43,10 @@ if not st.session_state.logged_in:
 
     # 로그인 검증
     if login_button:
-        if username == VALID_USERNAME and password == VALID_PASSWORD:
+        is_admin = bool(ADMIN_PASSWORD) and username == ADMIN_USERNAME and password == ADMIN_PASSWORD
+        if (username == VALID_USERNAME and password == VALID_PASSWORD) or is_admin:
             st.session_state.logged_in = True  # 로그인 성공 상태 저장
+            st.session_state.is_admin = is_admin
             st.sidebar.success(f"로그인 성공: {username}님 환영합니다!")
             
         else:
@@ -46,6 +56,7 @@ else:
     # 로그아웃 버튼 추가
     if st.sidebar.button("로그아웃"):
         st.session_state.logged_in = False
+        st.session_state.is_admin = False
         
         
 
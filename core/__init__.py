@@ -0,0 +1 @@
+"""투수 데이터 분석 공용 모듈 (Streamlit 페이지에서 import 해서 사용)"""
@@ -0,0 +1,382 @@
+"""로컬 HTTP API (ASGI 앱, 페이지와 같은 계산 코드 사용)
+
+영상 · 전력분석 도구가 페이지에서 보는 구종별 요약 · 존 히트맵 · 트렌드 · 궤적 값을 xlsx 다운로드 없이
+받아 가도록 GET 엔드포인트를 제공한다. 응답은 JSON (기본) 또는 Arrow IPC 스트림
+(format=arrow 또는 Accept: application/vnd.apache.arrow.stream).
+
+호크아이 · PTS 는 시즌 파일 단위로 불러와서, 조건(year · start · end)에 걸리는 시즌만 읽는다.
+ETag 는 (읽은 시즌들의 데이터 버전, 경로, 조건, 형식) 으로 계산 전에 정해지므로 If-None-Match 가 같으면 계산 없이 304 를 돌려주고,
+응답 본문은 'api' 캐시(core.cache.REGISTRY 예산 적용)에 저장해 같은 요청에 다시 쓴다.
+프레임워크 없이 ASGI 규격만 따르므로 uvicorn 등으로 띄우거나, request() 로 네트워크 없이 호출할 수 있다.
+
+공통 조건: source (hawkeye | pts), pitcher, batter, batter_side, pitcher_throw, runner, bcount,
+          start · end (날짜), year, month, pitch_types · hit_results (쉼표로 구분)
+    /pitchers    투수 이름 목록 (q: 검색어)
+    /filter      조건에 맞는 투구 (columns: 쉼표로 구분, limit · offset)
+    /summary     구종별 요약
+    /trend       15일 간격 × 구종 평균 (호크아이, variables: 쉼표로 구분)
+    /heatmap     존별 지표 (grid: 3x3 | 5x5 | 3x3 + 체이스)
+    /trajectory  투구별 궤적 모델 계수 · 진입각 (pitcher, date, pitch_types), samples=1 이면 측정 샘플
+    /similar     비슷한 구종 (호크아이, pitcher · pitch_type · season · k, same_type=0 · exclude_self=0 이면 조건 해제)
+
+예)
+    python -m core.api --port 8502
+    curl 'http://127.0.0.1:8502/summary?source=hawkeye&pitcher=양현종&start=2024-04-01'
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import traceback
+from urllib.parse import parse_qsl, urlencode
+
+import pandas as pd
+
+from core.cache import REGISTRY, args_key, spec_key
+from core.export import arrow_stream_bytes
+from core.figures import PITCH_COLORS
+from core.filter import HAWKEYE_COLUMNS, PTS_COLUMNS, apply_filters, prune_seasons, search_names
+from core.loader import (
+    DATA_DIR_ENV, concat_seasons, discover_seasons, load_hawkeye_season, load_pts_season, load_trajectories,
+    load_trajectory_metrics,
+)
+from core.similarity import PitchIndex, pitch_profiles
+from core.summary import pitch_summary, pts_summary
+from core.trajectory import approach_metrics, fit_table
+from core.trend import TREND_VARIABLES, trend_table
+from core.zone import GRIDS, prepare_zone_arrays, zone_stats, zone_table
+
+JSON_TYPE = "application/json; charset=utf-8"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+# hawkeye · pts 는 시즌을 인자로 받는 불러오기 함수, 나머지는 인자 없음
+LOADERS = dict(pts=load_pts_season, trajectory=load_trajectories, metrics=load_trajectory_metrics)
+
+# 데이터 종류별 (필터 컬럼, 투수 컬럼, 존 히트맵 스키마)
+SOURCES = dict(
+    hawkeye=dict(columns=HAWKEYE_COLUMNS, pitcher="투수", zone="호크아이"),
+    pts=dict(columns=PTS_COLUMNS, pitcher="Pitcher", zone="PTS"),
+)
+TEXT_KEYS = ("pitcher", "batter", "batter_side", "pitcher_throw", "runner", "bcount")
+LIST_KEYS = ("pitch_types", "hit_results")
+
+
+class BadRequest(ValueError):
+    """요청 조건이 잘못됨 (400)"""
+
+
+def _list(value):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+
+def _int(params, key):
+    try:
+        return int(params[key]) if params.get(key) else None
+    except ValueError:
+        raise BadRequest(f"{key} 는 정수여야 합니다: {params[key]}")
+
+
+def _date(value, key):
+    try:
+        return pd.Timestamp(value)
+    except ValueError:
+        raise BadRequest(f"{key} 날짜 형식이 잘못됐습니다: {value}")
+
+
+def filter_spec(params):
+    """요청 조건 → 필터 조건 dict (core.filter 와 같은 키)"""
+    spec = {key: params[key] for key in TEXT_KEYS if params.get(key)}
+    spec.update({key: _list(params.get(key)) for key in LIST_KEYS if params.get(key)})
+    if params.get("start") or params.get("end"):
+        spec["date_range"] = (
+            _date(params.get("start") or "1900-01-01", "start"),
+            _date(params.get("end") or "2100-12-31", "end") + pd.Timedelta(hours=23, minutes=59, seconds=59),
+        )
+    for key in ("year", "month"):
+        value = _int(params, key)
+        if value is not None:
+            spec[key] = value
+    return spec
+
+
+def _source(params, allowed=tuple(SOURCES)):
+    source = params.get("source", "hawkeye")
+    if source not in allowed:
+        raise BadRequest(f"source 는 {', '.join(allowed)} 중 하나여야 합니다: {source}")
+    return source
+
+
+class AnalyticsApp:
+    """분석 API ASGI 앱
+
+    loaders: {데이터 이름: 불러오기 함수} (기본은 core.loader, 테스트에서는 합성 데이터)
+    seasons: {데이터 이름: 시즌 목록} (기본은 core.loader.discover_seasons 로 찾음)
+    """
+
+    def __init__(self, loaders=None, cache=None, seasons=None):
+        self.loaders = {**LOADERS, "hawkeye": self._hawkeye_season, **(loaders or {})}
+        self.cache = cache if cache is not None else REGISTRY.cache("api")
+        self._seasons = dict(seasons or {})
+        self._data = {}  # (이름, 시즌) → (데이터프레임, 버전)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.index = PitchIndex()
+        self._profile_lock = threading.Lock()  # 시즌 프로필 갱신 · 색인 반영 (요청은 여러 스레드에서 처리됨)
+        self.routes = {
+            "/pitchers": self.pitchers,
+            "/filter": self.filtered,
+            "/summary": self.summary,
+            "/trend": self.trend,
+            "/heatmap": self.heatmap,
+            "/trajectory": self.trajectory,
+            "/similar": self.similar,
+        }
+
+    def _hawkeye_season(self, season):
+        # 궤적 지표는 한 번만 계산해서 시즌마다 연결
+        return load_hawkeye_season(season, self.data("metrics")[0])
+
+    def data(self, name, season=None):
+        """불러온 데이터와 버전(내용 해시). 데이터(시즌)마다 처음 요청 때 한 번만 불러옴"""
+        key = (name, season)
+        if key not in self._data:
+            with self._lock:
+                lock = self._locks.setdefault(key, threading.Lock())
+            with lock:
+                if key not in self._data:
+                    df = self.loaders[name]() if season is None else self.loaders[name](season)
+                    self._data[key] = (df, args_key(df))
+        return self._data[key]
+
+    def seasons(self, source, spec=None):
+        """데이터가 있는 시즌 중 조건(year · date_range)에 걸리는 시즌. 없으면 BadRequest"""
+        if source not in self._seasons:
+            self._seasons[source] = discover_seasons(source)
+        seasons = prune_seasons(self._seasons[source], spec or {})
+        if not seasons:
+            available = ", ".join(str(season) for season in self._seasons[source])
+            raise BadRequest(f"조건에 맞는 시즌이 없습니다 (있는 시즌: {available})")
+        return seasons
+
+    def frame(self, source, spec):
+        """조건에 걸리는 시즌만 불러와 이어 붙인 데이터"""
+        return concat_seasons(lambda season: self.data(source, season)[0], self.seasons(source, spec))
+
+    def versions(self, path, params):
+        """응답에 쓰이는 데이터 버전 목록 (시즌 데이터는 조건에 걸리는 시즌만)"""
+        source = "trajectory" if path == "/trajectory" else params.get("source", "hawkeye")
+        if source in SOURCES:
+            return [self.data(source, season)[1] for season in self.seasons(source, filter_spec(params))]
+        return [self.data(source)[1]] if source in self.loaders else []
+
+    def reload(self, name=None):
+        """불러온 데이터를 버림 (다음 요청 때 시즌을 다시 찾고 다시 불러오며 버전이 바뀜)"""
+        for key in list(self._data):
+            if name is None or key[0] == name:
+                self._data.pop(key, None)
+        for source in [name] if name else list(self._seasons):
+            self._seasons.pop(source, None)
+
+    # 엔드포인트: 조건 → 데이터프레임 (또는 JSON 으로 바꿀 dict)
+
+    def _filtered(self, params, source):
+        spec = filter_spec(params)
+        return apply_filters(self.frame(source, spec), spec, SOURCES[source]["columns"])
+
+    def pitchers(self, params):
+        source = _source(params, ("hawkeye", "pts", "trajectory"))
+        df = self.frame(source, filter_spec(params)) if source in SOURCES else self.data(source)[0]
+        column = SOURCES[source]["pitcher"] if source in SOURCES else "pitcher"
+        return dict(pitchers=search_names(df[column], params.get("q")))
+
+    def filtered(self, params):
+        filtered = self._filtered(params, _source(params))
+        columns = _list(params.get("columns"))
+        missing = [c for c in columns if c not in filtered.columns]
+        if missing:
+            raise BadRequest(f"없는 컬럼: {', '.join(missing)}")
+        offset = _int(params, "offset") or 0
+        limit = _int(params, "limit")
+        rows = filtered.iloc[offset:offset + limit if limit is not None else None]
+        return rows[columns] if columns else rows
+
+    def summary(self, params):
+        source = _source(params)
+        summarize = pitch_summary if source == "hawkeye" else pts_summary
+        return summarize(self._filtered(params, source), order=list(PITCH_COLORS.keys()))
+
+    def trend(self, params):
+        variables = _list(params.get("variables")) or TREND_VARIABLES
+        unknown = [v for v in variables if v not in TREND_VARIABLES]
+        if unknown:
+            raise BadRequest(f"트렌드 변수가 아님: {', '.join(unknown)}")
+        aggregated = trend_table(self._filtered(params, _source(params, ("hawkeye",))))
+        return aggregated[['15_day_interval', '구종', *variables]]
+
+    def heatmap(self, params):
+        source = _source(params)
+        grid_name = params.get("grid", "3x3")
+        if grid_name not in GRIDS:
+            raise BadRequest(f"grid 는 {', '.join(GRIDS)} 중 하나여야 합니다: {grid_name}")
+        arrays = prepare_zone_arrays(self._filtered(params, source), SOURCES[source]["zone"])
+        return zone_table(zone_stats(arrays, GRIDS[grid_name]), GRIDS[grid_name])
+
+    def trajectory(self, params):
+        df, _ = self.data("trajectory")
+        mask = pd.Series(True, index=df.index)
+        if params.get("pitcher"):
+            mask &= df['pitcher'] == params["pitcher"]
+        if params.get("date"):
+            mask &= df['date'] == _date(params["date"], "date")
+        if params.get("pitch_types"):
+            mask &= df['pitch_type'].isin(_list(params["pitch_types"]))
+        samples = df[mask]
+        if params.get("samples") == "1":
+            return samples
+        fits = fit_table(samples, pitch_col='group')
+        return pd.concat([fits, approach_metrics(fits)], axis=1)
+
+    def similar(self, params):
+        pitcher, pitch_type = params.get("pitcher"), params.get("pitch_type")
+        if not pitcher or not pitch_type:
+            raise BadRequest("pitcher 와 pitch_type 이 필요합니다")
+        seasons = self.seasons("hawkeye", filter_spec(params))
+        for season in seasons:
+            df, version = self.data("hawkeye", season)
+            key = ("profiles", season)
+            with self._profile_lock:
+                if self._data.get(key, (None, None))[1] != version:  # 시즌 데이터가 바뀌었을 때만 다시 계산
+                    self._data[key] = (pitch_profiles(df), version)
+                self.index.update(self._data[key][0])
+        neighbors = self.index.query(
+            pitcher, pitch_type, season=_int(params, "season"), k=_int(params, "k") or 10, seasons=seasons,
+            same_type=params.get("same_type") != "0", exclude_self=params.get("exclude_self") != "0",
+        )
+        if neighbors is None:
+            raise BadRequest(f"기준 프로필이 없습니다: {pitcher} {pitch_type}")
+        return neighbors
+
+    # 요청 처리
+
+    def etag(self, path, params, fmt):
+        """계산 전에 정해지는 응답 ETag (데이터 버전 + 경로 + 조건 + 형식)"""
+        return '"' + spec_key(self.versions(path, params), path, sorted(params.items()), fmt) + '"'
+
+    def respond(self, path, params, headers):
+        """(상태 코드, 헤더 목록, 본문) — 동기 함수라 스레드에서 실행"""
+        handler = self.routes.get(path)
+        if handler is None:
+            return _error(404, f"없는 경로: {path}")
+        params = dict(params)
+        fmt = params.pop("format", None) or ("arrow" if ARROW_TYPE in headers.get("accept", "") else "json")
+        if fmt not in ("json", "arrow"):
+            return _error(400, f"format 은 json, arrow 중 하나여야 합니다: {fmt}")
+
+        try:
+            etag = self.etag(path, params, fmt)
+            common = [("etag", etag), ("cache-control", "no-cache"), ("vary", "accept")]
+            if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+                return 304, common, b""
+
+            body = self.cache.get(etag)
+            if body is None:
+                body = _encode(handler(params), fmt)
+                self.cache.put(etag, body)
+        except BadRequest as error:
+            return _error(400, str(error))
+        content_type = ARROW_TYPE if fmt == "arrow" else JSON_TYPE
+        return 200, [("content-type", content_type), *common], body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        if method not in ("GET", "HEAD"):
+            status, headers, body = _error(405, f"지원하지 않는 메서드: {method}")
+        else:
+            params = parse_qsl(scope.get("query_string", b"").decode("utf-8"), keep_blank_values=False)
+            request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+            # 계산은 스레드에서 (이벤트 루프를 막지 않도록)
+            try:
+                status, headers, body = await asyncio.to_thread(self.respond, scope["path"], params, request_headers)
+            except Exception as error:  # 예상 못 한 오류도 JSON 으로 응답 (내용은 서버 로그에)
+                traceback.print_exc()
+                status, headers, body = _error(500, f"서버 오류: {type(error).__name__}: {error}")
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+            + [(b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": b"" if method == "HEAD" else body})
+
+
+def _error(status, message):
+    return status, [("content-type", JSON_TYPE)], json.dumps(dict(error=message), ensure_ascii=False).encode()
+
+
+def _encode(result, fmt):
+    """결과 → 응답 본문. 표는 JSON {count, data: [행]} 또는 Arrow 스트림"""
+    if isinstance(result, dict):
+        if fmt == "arrow":
+            raise BadRequest("이 경로는 JSON 만 지원합니다")
+        return json.dumps(result, ensure_ascii=False).encode()
+    if fmt == "arrow":
+        return arrow_stream_bytes(result)
+    records = result.to_json(orient="records", force_ascii=False, date_format="iso")
+    return f'{{"count": {len(result)}, "data": {records}}}'.encode()
+
+
+def request(app, path, params=None, headers=None, method="GET"):
+    """네트워크 없이 앱 호출 (테스트 · 스크립트용). 반환값: (상태 코드, 헤더 dict, 본문 바이트)"""
+    path, _, query = path.partition("?")
+    if params:
+        query = "&".join(filter(None, [query, urlencode(params)]))
+    scope = dict(
+        type="http", asgi={"version": "3.0"}, http_version="1.1", method=method, scheme="http",
+        path=path, raw_path=path.encode(), query_string=query.encode(), root_path="",
+        headers=[(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in (headers or {}).items()],
+        server=("127.0.0.1", 80), client=("127.0.0.1", 0),
+    )
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, body = messages[0], b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], {k.decode("latin-1"): v.decode("latin-1") for k, v in start["headers"]}, body
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 결과 로컬 HTTP API")
+    parser.add_argument("--host", default="127.0.0.1", help="열 주소 (기본: 이 컴퓨터에서만)")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--data", help=f"xlsx 폴더 (기본: {DATA_DIR_ENV} 또는 GitHub)")
+    args = parser.parse_args(argv)
+
+    if args.data:
+        os.environ[DATA_DIR_ENV] = os.path.abspath(args.data)
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("서버 실행에는 uvicorn 이 필요합니다 (pip install uvicorn)")
+    uvicorn.run(AnalyticsApp(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
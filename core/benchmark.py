@@ -0,0 +1,248 @@
+"""규모별 성능 측정 (합성 데이터 사용, Streamlit 없이 실행)
+
+합성 데이터(core.synthetic)를 1× · 10× · 100× 규모로 만들어 페이지와 같은 계산 코드로
+불러오기 · 구종 재분류 · 필터 · 요약 · 트렌드 · 히트맵 · 그림 만들기 · 내보내기 단계 시간을 재고 JSON 으로 저장한다.
+이전 결과 파일(--baseline)을 주면 단계별로 몇 배 느려졌는지 함께 출력한다.
+
+불러오기 단계는 합성 데이터를 실제와 같은 xlsx 로 저장한 뒤 읽는다. 저장한 파일은 --data 폴더에
+규모 · 시드별로 남겨 두고 다시 쓰며, 엑셀 한 시트에 들어가지 않는 규모는 건너뛴다.
+
+예)
+    python -m core.benchmark --scales 1,10
+    python -m core.benchmark --scales 100 --stages filter,summary,heatmap --repeat 1
+    python -m core.benchmark --baseline benchmarks/이전결과.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.density import density_figure, precompute_density, pitch_type_density
+from core.export import EXPORT_FORMATS, export_bytes
+from core.figures import PITCH_COLORS, location_facets, movement_figure, plate_location_figure
+from core.filter import HAWKEYE_COLUMNS, PTS_COLUMNS, apply_filters
+from core.loader import load_hawkeye, load_pts, load_trajectories, load_trajectory_metrics
+from core.reclassify import reclassify_pitches
+from core.summary import pitch_summary, pts_summary
+from core.synthetic import SCALES, synthetic_dataset, write_dataset
+from core.trajectory import attach_pitch_metrics, pitch_metrics, prepare_trajectories
+from core.trend import trend_figure, trend_table, trend_title
+from core.zone import GRIDS, prepare_zone_arrays, zone_stats
+
+STAGES = ("load", "reclassify", "filter", "summary", "trend", "heatmap", "figure", "export")
+SLOWER_RATIO = 1.2  # 기준보다 이만큼 느리면 표시
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _timed(fn, repeat):
+    """fn 을 repeat 번 실행한 시간(초) 목록과 마지막 결과"""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - started)
+    return seconds, result
+
+
+def _in_memory(dataset):
+    """불러오기 단계 없이 쓸 데이터 (loader 와 같은 정리 과정)"""
+    hawkeye = pd.concat([dataset["hawkeye"][year] for year in sorted(dataset["hawkeye"], reverse=True)], ignore_index=True)
+    return dict(
+        hawkeye=reclassify_pitches(attach_pitch_metrics(hawkeye, pitch_metrics(dataset["trajectory"]))),
+        pts=dataset["pts"],
+        trajectory=prepare_trajectories(dataset["trajectory"]),
+    )
+
+
+def _load_tasks(paths):
+    """xlsx 로 저장할 수 있었던 데이터만 불러오기 작업 {단계 이름: 함수}"""
+    tasks = {}
+    if paths["trajectory"]:
+        tasks["load_trajectory"] = lambda: load_trajectories(paths["trajectory"])
+        if paths["hawkeye"]:
+            tasks["load_hawkeye"] = lambda: load_hawkeye(paths["hawkeye"], load_trajectory_metrics(paths["trajectory"]))
+    if paths["pts"]:
+        tasks["load_pts"] = lambda: load_pts(paths["pts"])
+    return tasks
+
+
+def stage_tasks(data, export_formats):
+    """단계별 측정 작업 {단계: {작업 이름: (입력 행 수, 함수)}} (페이지에서 쓰는 호출 그대로)"""
+    hawkeye, pts = data["hawkeye"], data["pts"]
+    pitcher = hawkeye['투수'].value_counts().index[0]
+    last_year = int(hawkeye['Date'].dt.year.max())
+    hawkeye_spec = dict(date_range=(f"{last_year}-04-01", f"{last_year}-09-30"), pitcher=pitcher, runner="주자무")
+    pts_spec = dict(year=int(pts['Date'].dt.year.max()), batter_side="좌타", pitch_types=["직구", "슬라"])
+    one_pitcher = apply_filters(hawkeye, dict(pitcher=pitcher), HAWKEYE_COLUMNS)
+
+    # 로케이션 그림은 페이지처럼 cm 로 바꾼 데이터 사용
+    located = hawkeye.assign(PlateLocSide=hawkeye['PlateLocSide'] * 100, PlateLocHeight=hawkeye['PlateLocHeight'] * 100)
+    zone_arrays = prepare_zone_arrays(hawkeye, "호크아이")
+    trend = trend_table(one_pitcher)
+    colors = PITCH_COLORS
+    order = list(colors.keys())
+
+    n, n_pitcher, n_pts = len(hawkeye), len(one_pitcher), len(pts)
+
+    return {
+        "reclassify": {
+            "hawkeye_all": (n, lambda: reclassify_pitches(hawkeye)),
+        },
+        "filter": {
+            "hawkeye_pitcher_period": (n, lambda: apply_filters(hawkeye, hawkeye_spec, HAWKEYE_COLUMNS)),
+            "pts_season_side_types": (n_pts, lambda: apply_filters(pts, pts_spec, PTS_COLUMNS)),
+        },
+        "summary": {
+            "hawkeye_all": (n, lambda: pitch_summary(hawkeye, order)),
+            "hawkeye_pitcher": (n_pitcher, lambda: pitch_summary(one_pitcher, order)),
+            "pts_all": (n_pts, lambda: pts_summary(pts, order)),
+        },
+        "trend": {
+            "hawkeye_all": (n, lambda: trend_table(hawkeye)),
+            "hawkeye_pitcher": (n_pitcher, lambda: trend_table(one_pitcher)),
+        },
+        "heatmap": {
+            "zone_arrays": (n, lambda: prepare_zone_arrays(hawkeye, "호크아이")),
+            "zone_stats_all_grids": (n, lambda: [zone_stats(zone_arrays, grid) for grid in GRIDS.values()]),
+            "density_precompute": (n, lambda: precompute_density(hawkeye, '투수', '구종', 'PlateLocSide', 'PlateLocHeight', scale=100)),
+            "density_all": (n, lambda: pitch_type_density(located, '구종', 'PlateLocSide', 'PlateLocHeight')),
+        },
+        "figure": {
+            "plate_location_all": (n, lambda: plate_location_figure(located, colors).to_json()),
+            "movement_all": (n, lambda: movement_figure(hawkeye, colors).to_json()),
+            "location_facets_pts": (n_pts, lambda: location_facets(
+                pts, "PTS_location_X", "PTS_location_Z", "PitchType", colors, order=order
+            ).to_json()),
+            "density_figure": (n, lambda: density_figure(
+                pitch_type_density(located, '구종', 'PlateLocSide', 'PlateLocHeight'), colors, order=order
+            ).to_json()),
+            "trend_pitcher": (n_pitcher, lambda: trend_figure(trend, "RelSpeed", colors, trend_title("RelSpeed", pitcher)).to_json()),
+        },
+        "export": {
+            f"hawkeye_all_{fmt}": (n, lambda fmt=fmt: export_bytes({"Filtered Data": hawkeye}, fmt, "filtered_data"))
+            for fmt in export_formats
+        },
+    }
+
+
+def run(scales=SCALES, stages=STAGES, repeat=3, seed=0, data_dir="bench_data", export_formats=tuple(EXPORT_FORMATS)):
+    """규모 × 단계별 측정. 반환값: 결과 dict (JSON 으로 저장 가능)"""
+    results = []
+
+    def record(scale, stage, task, rows, seconds, note=None):
+        entry = dict(
+            scale=scale, stage=stage, task=task, rows=rows,
+            seconds=[round(s, 4) for s in seconds],
+            median=round(statistics.median(seconds), 4) if seconds else None,
+            min=round(min(seconds), 4) if seconds else None,
+        )
+        if note:
+            entry["note"] = note
+        results.append(entry)
+        timing = f"{entry['median']:.3f}s" if seconds else note
+        print(f"[{scale}x] {stage:<8} {task:<28} {rows:>10,} rows  {timing}")
+
+    for scale in scales:
+        started = time.perf_counter()
+        dataset = synthetic_dataset(scale, seed)
+        record(scale, "generate", "synthetic_dataset", sum(len(df) for df in dataset["hawkeye"].values()),
+               [time.perf_counter() - started])
+        data = _in_memory(dataset)
+
+        if "load" in stages:
+            folder = os.path.join(data_dir, f"{scale}x-seed{seed}")
+            tasks = _load_tasks(write_dataset(dataset, folder, reuse=True))
+            for name in ("load_hawkeye", "load_pts", "load_trajectory"):
+                if name not in tasks:
+                    record(scale, "load", name, 0, [], note="엑셀 한 시트 행 수 초과로 건너뜀")
+                    continue
+                seconds, loaded = _timed(tasks[name], repeat)
+                record(scale, "load", name, len(loaded), seconds)
+        del dataset
+
+        for stage, tasks in stage_tasks(data, export_formats).items():
+            if stage not in stages:
+                continue
+            for name, (rows, task) in tasks.items():
+                seconds, _ = _timed(task, repeat)
+                record(scale, stage, name, rows, seconds)
+
+    return dict(
+        created=datetime.datetime.now().isoformat(timespec="seconds"),
+        commit=_git_commit(),
+        python=platform.python_version(),
+        pandas=pd.__version__,
+        numpy=np.__version__,
+        machine=platform.platform(),
+        repeat=repeat,
+        seed=seed,
+        results=results,
+    )
+
+
+def compare(result, baseline):
+    """기준 결과 대비 (규모, 단계, 작업) 별 중앙값 비율 목록"""
+    base = {(r["scale"], r["stage"], r["task"]): r["median"] for r in baseline["results"] if r["median"]}
+    rows = []
+    for r in result["results"]:
+        before = base.get((r["scale"], r["stage"], r["task"]))
+        if before and r["median"]:
+            rows.append(dict(scale=r["scale"], stage=r["stage"], task=r["task"], before=before, after=r["median"], ratio=round(r["median"] / before, 2)))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 데이터 규모별 성능 측정")
+    parser.add_argument("--scales", default=",".join(str(s) for s in SCALES), help="쉼표로 구분 (예: 1,10,100)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"쉼표로 구분 ({', '.join(STAGES)})")
+    parser.add_argument("--export-formats", default=",".join(EXPORT_FORMATS), help="내보내기 단계 형식 (xlsx, csv.gz, parquet)")
+    parser.add_argument("--repeat", type=int, default=3, help="작업별 반복 횟수 (중앙값 기록)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 시드")
+    parser.add_argument("--data", default="bench_data", help="불러오기 단계용 xlsx 저장 폴더")
+    parser.add_argument("--out", default="benchmarks", help="결과 JSON 저장 폴더")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+    formats = [f.strip() for f in args.export_formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown:
+        parser.error(f"지원하지 않는 형식: {', '.join(unknown)}")
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    result = run(scales, stages, args.repeat, args.seed, args.data, formats)
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"benchmark-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장 → {os.path.abspath(path)}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for row in compare(result, baseline):
+            flag = "  ← 느려짐" if row["ratio"] >= SLOWER_RATIO else ""
+            print(f"[{row['scale']}x] {row['stage']:<8} {row['task']:<28} {row['before']:.3f}s → {row['after']:.3f}s (x{row['ratio']}){flag}")
+
+
+if __name__ == "__main__":
+    main()
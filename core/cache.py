@@ -0,0 +1,275 @@
+"""크기 제한이 있는 캐시와 전체 메모리 예산
+
+값은 직렬화된 문자열 / 바이트로 저장하므로 항목마다 차지하는 바이트 수를 정확히 안다.
+캐시마다 상한이 있고, 모든 캐시는 REGISTRY 에 등록되어 합계가 전체 예산(PITCHER_CACHE_BUDGET_MB)을
+넘으면 캐시를 가리지 않고 '크기 × 안 쓴 시간' 이 가장 큰 항목부터 지운다.
+모듈 전역 객체라서 재실행 · 다른 세션 사이에서도 공유된다.
+
+데이터 불러오기 같은 함수 결과는 cached_stage 로 감싸 같은 방식으로 저장한다
+(st.cache_data 처럼 pickle 로 저장해서 꺼낼 때마다 복사본을 돌려줌).
+"""
+import datetime
+import functools
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from core.timing import cache_event, stage
+
+BUDGET_ENV = "PITCHER_CACHE_BUDGET_MB"
+DEFAULT_BUDGET_MB = 2048
+
+
+def spec_key(*parts):
+    """설정값(JSON 으로 직렬화 가능한 값들) → 짧은 해시 문자열"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _update_hash(h, value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        h.update(type(value).__name__.encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr(list(value.columns)).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=not isinstance(value, pd.Index)).to_numpy().tobytes())
+        except TypeError:  # 셀에 리스트 같은 해시할 수 없는 값
+            h.update(pickle.dumps(value))
+    elif isinstance(value, np.ndarray):
+        h.update(f"{value.dtype}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else pickle.dumps(value))
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value, key=repr):
+            _update_hash(h, k)
+            _update_hash(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[" if isinstance(value, list) else b"(")
+        for item in value:
+            _update_hash(h, item)
+        h.update(b"]")
+    elif value is None or isinstance(value, (str, int, float, bool, datetime.date, np.generic)):
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+    else:
+        h.update(pickle.dumps(value))
+
+
+def args_key(*args, **kwargs):
+    """함수 인자(데이터프레임 · 배열 · dict 포함) → 짧은 해시 문자열"""
+    h = hashlib.blake2b(digest_size=16)
+    _update_hash(h, args)
+    _update_hash(h, dict(kwargs))
+    return h.hexdigest()
+
+
+class CacheRegistry:
+    """모든 캐시의 크기 합계를 전체 예산 안으로 유지"""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.evictions = 0
+        self._caches = {}
+        self._ticks = itertools.count()
+        self._lock = threading.RLock()
+
+    def tick(self):
+        """항목을 마지막으로 쓴 시점 (모든 캐시에 공통인 순번)"""
+        return next(self._ticks)
+
+    def register(self, cache):
+        with self._lock:
+            self._caches[cache.name] = cache
+
+    def cache(self, name, max_bytes=None):
+        """이름으로 등록된 캐시 (없으면 새로 만듦). 페이지가 다시 실행돼도 같은 캐시를 씀"""
+        with self._lock:
+            existing = self._caches.get(name)
+            return existing if existing is not None else LRUCache(max_bytes, name=name, registry=self)
+
+    def total_bytes(self):
+        return sum(cache.total_bytes for cache in list(self._caches.values()))
+
+    def enforce(self):
+        """예산을 넘으면 '크기 × 안 쓴 시간' 이 가장 큰 항목부터 지움 (후보는 캐시별 가장 오래 안 쓴 항목)"""
+        with self._lock:
+            while self.total_bytes() > self.budget_bytes:
+                now = self.tick()
+                candidates = [(cache, cache.oldest()) for cache in self._caches.values()]
+                candidates = [(cache, item) for cache, item in candidates if item is not None]
+                if not candidates:
+                    break
+                cache, (key, size, last_used) = max(candidates, key=lambda c: c[1][1] * (now - c[1][2]))
+                cache.evict(key)
+                self.evictions += 1
+
+    def stats(self):
+        """캐시별 항목 수 · 바이트 · 적중률 목록"""
+        return [cache.stats() for cache in sorted(self._caches.values(), key=lambda c: -c.total_bytes)]
+
+    def clear(self):
+        for cache in list(self._caches.values()):
+            cache.clear()
+
+
+REGISTRY = CacheRegistry(int(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MB)) * 1024 * 1024)
+
+
+class LRUCache:
+    """바이트 상한이 있는 LRU 캐시 (스레드 안전). 만들 때 REGISTRY 에 등록됨"""
+
+    def __init__(self, max_bytes, name=None, registry=REGISTRY):
+        self.name = name or f"cache-{id(self):x}"
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()  # 키 → (값, 마지막 사용 순번)
+        self._lock = threading.Lock()
+        self._key_locks = {}  # 키 → [잠금, 잡았거나 기다리는 수]
+        self._registry = registry
+        if registry is not None:
+            registry.register(self)
+
+    def _tick(self):
+        return self._registry.tick() if self._registry is not None else 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items[key] = (item[0], self._tick())
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, payload):
+        size = len(payload)
+        limit = self.max_bytes if self.max_bytes is not None else float("inf")
+        if self._registry is not None:
+            limit = min(limit, self._registry.budget_bytes)
+        if size > limit:
+            return
+        with self._lock:
+            if key in self._items:
+                self.total_bytes -= len(self._items.pop(key)[0])
+            self._items[key] = (payload, self._tick())
+            self.total_bytes += size
+            while self.total_bytes > limit:
+                _, (evicted, _) = self._items.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.evictions += 1
+        if self._registry is not None:
+            self._registry.enforce()
+
+    def peek(self, key):
+        """적중 / 실패 집계 없이 값 확인"""
+        with self._lock:
+            item = self._items.get(key)
+            return None if item is None else item[0]
+
+    @contextmanager
+    def key_lock(self, key):
+        """같은 키를 여러 세션이 동시에 계산하지 않도록 잡는 잠금 (with 문으로 사용)
+
+        잠금은 잡았거나 기다리는 쪽이 하나도 없을 때만 지우므로, 기다리던 세션도 같은 잠금을 이어받는다.
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def oldest(self):
+        """가장 오래 안 쓴 항목 (키, 바이트, 마지막 사용 순번). 비어 있으면 None"""
+        with self._lock:
+            if not self._items:
+                return None
+            key, (payload, last_used) = next(iter(self._items.items()))
+            return key, len(payload), last_used
+
+    def evict(self, key):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is not None:
+                self.total_bytes -= len(item[0])
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                name=self.name, entries=len(self._items), bytes=self.total_bytes, max_bytes=self.max_bytes,
+                hits=self.hits, misses=self.misses, hit_rate=round(self.hits / lookups, 3) if lookups else None,
+                evictions=self.evictions,
+            )
+
+
+def code_key(fn):
+    """함수 본문이 바뀌면 달라지는 키 (주석은 제외, 데코레이터로 감싼 함수는 원래 함수 기준)"""
+    fn = inspect.unwrap(fn)
+    code = fn.__code__
+    return hashlib.blake2b(
+        code.co_code + repr((fn.__qualname__, code.co_consts, code.co_names)).encode(), digest_size=8
+    ).hexdigest()
+
+
+def cached_stage(name, cache_name=None, max_bytes=None, key=None):
+    """함수 결과를 인자별로 저장하고 호출을 한 단계로 측정 (st.cache_data 대신 사용)
+
+    결과는 pickle 바이트로 저장해서 꺼낼 때마다 복사본을 돌려준다. 같은 인자로 동시에 호출되면 한 번만 계산한다.
+    cache_name: 여러 페이지가 같은 데이터를 쓰면 같은 이름을 줘서 한 벌만 저장 (기본: 파일 · 함수 이름)
+    key: 인자 → 캐시 키로 쓸 설정값. 큰 데이터프레임을 매번 해시하는 대신 그 데이터를 만든 조건(필터 조건 등)으로 찾을 때
+    """
+    def decorate(fn):
+        cache = REGISTRY.cache(
+            cache_name or f"{os.path.basename(fn.__code__.co_filename)}:{fn.__qualname__}", max_bytes
+        )
+        fn_key = code_key(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            entry = (fn_key, spec_key(key(*args, **kwargs)) if key else args_key(*args, **kwargs))
+            with stage(name) as record:
+                payload = cache.get(entry)
+                if payload is None:
+                    with cache.key_lock(entry):
+                        payload = cache.peek(entry)  # 기다리는 동안 다른 세션이 계산했을 수 있음
+                        if payload is None:
+                            result = fn(*args, **kwargs)
+                            cache.put(entry, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+                            cache_event("data", hit=False)
+                if payload is not None:
+                    result = pickle.loads(payload)
+                    cache_event("data", hit=True)
+                shape = getattr(result, "shape", None)
+                record["rows"] = int(shape[0]) if shape else None
+            return result
+
+        wrapper.cache = cache
+        wrapper.clear = cache.clear
+        return wrapper
+    return decorate
@@ -0,0 +1,164 @@
+"""투구 로케이션 밀도 맵
+
+투구를 촘촘한 격자에 한 번 세고(np.bincount), 가우시안 커널을 FFT 로 곱해서 부드럽게 만든다.
+투구 수와 관계없이 격자 크기에만 비례하므로(O(grid log grid)) 시즌 단위 데이터도 바로 그린다.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from core.zone import ZONE_X, ZONE_Z
+
+# 밀도 격자 범위 (포수 시점, cm) 와 칸 크기
+EXTENT_X = (-70, 70)
+EXTENT_Z = (-10, 150)
+BIN_SIZE = 2
+BANDWIDTH = 6  # 가우시안 커널 표준편차 (cm)
+
+
+def grid_shape(bin_size=BIN_SIZE):
+    """밀도 격자의 (행, 열) 크기"""
+    nx = int(np.ceil((EXTENT_X[1] - EXTENT_X[0]) / bin_size))
+    nz = int(np.ceil((EXTENT_Z[1] - EXTENT_Z[0]) / bin_size))
+    return nz, nx
+
+
+def _smooth(counts, bandwidth, bin_size):
+    """(..., nz, nx) 격자들을 한꺼번에 가우시안 스무딩 (가장자리가 반대편으로 넘어가지 않도록 패딩)"""
+    nz, nx = counts.shape[-2:]
+    pad = int(np.ceil(3 * bandwidth / bin_size))
+    fz, fx = nz + 2 * pad, nx + 2 * pad
+
+    # 가우시안의 푸리에 변환은 해석적으로 계산 가능: exp(-2π²σ²f²)
+    sigma = bandwidth / bin_size
+    kernel = (
+        np.exp(-2 * (np.pi * sigma * np.fft.fftfreq(fz)) ** 2)[:, None]
+        * np.exp(-2 * (np.pi * sigma * np.fft.rfftfreq(fx)) ** 2)[None, :]
+    )
+    spectrum = np.fft.rfft2(counts, s=(fz, fx), axes=(-2, -1))
+    smoothed = np.fft.irfft2(spectrum * kernel, s=(fz, fx), axes=(-2, -1))
+
+    # 패딩 영역(경계 밖으로 번진 값)을 잘라내고 원래 격자만 남김
+    return np.clip(smoothed[..., :nz, :nx], 0, None).astype(np.float32)
+
+
+def density_maps(x, z, groups=None, bandwidth=BANDWIDTH, bin_size=BIN_SIZE, chunk=256):
+    """그룹별 밀도 맵을 한 번에 계산
+
+    x, z: 위치 배열 (cm), groups: 그룹 번호 배열 (0 ~ G-1, None 이면 전체 한 그룹)
+    반환값: (G, nz, nx) float32 배열, 각 칸 값은 스무딩된 투구 수
+    """
+    nz, nx = grid_shape(bin_size)
+    x = np.asarray(x, dtype=float)
+    z = np.asarray(z, dtype=float)
+    groups = np.zeros(len(x), dtype=int) if groups is None else np.asarray(groups)
+    n_groups = int(groups.max()) + 1 if len(groups) else 1
+
+    # 위치가 없는 투구는 칸 번호를 계산하기 전에 뺌 (NaN 을 정수로 바꾸면 경고)
+    located = np.isfinite(x) & np.isfinite(z)
+    x, z, groups = x[located], z[located], groups[located]
+    ix = np.floor((x - EXTENT_X[0]) / bin_size).astype(int, copy=False)
+    iz = np.floor((z - EXTENT_Z[0]) / bin_size).astype(int, copy=False)
+    inside = (ix >= 0) & (ix < nx) & (iz >= 0) & (iz < nz)
+    flat = (groups[inside] * nz + iz[inside]) * nx + ix[inside]
+    counts = np.bincount(flat, minlength=n_groups * nz * nx).reshape(n_groups, nz, nx).astype(float)
+
+    # FFT 는 그룹 묶음 단위로 (메모리 사용량 제한)
+    return np.concatenate([
+        _smooth(counts[i:i + chunk], bandwidth, bin_size) for i in range(0, n_groups, chunk)
+    ]) if n_groups else np.zeros((0, nz, nx), dtype=np.float32)
+
+
+def density_by(df, x_col, z_col, by, scale=1, bandwidth=BANDWIDTH, bin_size=BIN_SIZE):
+    """by 컬럼 조합별 밀도 맵 딕셔너리 {키: (nz, nx) 배열}
+
+    예) density_by(df, "PlateLocSide", "PlateLocHeight", ["구종"], scale=100)
+    """
+    df = df.dropna(subset=by)
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(df[by]))
+    maps = density_maps(
+        pd.to_numeric(df[x_col], errors="coerce").to_numpy(dtype=float) * scale,
+        pd.to_numeric(df[z_col], errors="coerce").to_numpy(dtype=float) * scale,
+        codes,
+        bandwidth=bandwidth,
+        bin_size=bin_size,
+    )
+    keys = list(uniques) if len(by) > 1 else [key[0] for key in uniques]
+    return {key: maps[i] for i, key in enumerate(keys)}
+
+
+def _located_counts(df, x_col, z_col, by):
+    """위치 값이 있는 투구 수 (by 조합별)"""
+    located = pd.to_numeric(df[x_col], errors="coerce").notna() & pd.to_numeric(df[z_col], errors="coerce").notna()
+    return df[located].groupby(by).size().to_dict()
+
+
+def precompute_density(df, pitcher_col, type_col, x_col, z_col, scale=1):
+    """적재 시점에 전체 투수 × 구종 밀도 맵을 한 번에 계산 (배치 모드)"""
+    by = [pitcher_col, type_col]
+    return dict(
+        maps=density_by(df, x_col, z_col, by, scale=scale),
+        counts=_located_counts(df, x_col, z_col, by),
+    )
+
+
+def pitch_type_density(df, type_col, x_col, z_col, scale=1, cache=None, pitcher=None):
+    """구종별 밀도 맵. 선택된 투구가 투수의 해당 구종 전체와 같으면 미리 계산한 맵을 그대로 사용"""
+    if cache is not None and pitcher is not None:
+        # 투수 필터가 걸린 부분집합이므로, 구종별 투구 수가 같으면 같은 투구 집합
+        counts = _located_counts(df, x_col, z_col, type_col)
+        if counts and all(cache["counts"].get((pitcher, t)) == n for t, n in counts.items()):
+            return {t: cache["maps"][(pitcher, t)] for t in counts}
+    return density_by(df, x_col, z_col, [type_col], scale=scale)
+
+
+def density_figure(maps, colors, order=None, bin_size=BIN_SIZE, n_cols=3):
+    """구종별 밀도 맵을 한 그림(공유 축)에 나란히 그림. maps: {구종: (nz, nx) 배열}"""
+    names = [name for name in (order or []) if name in maps] + [name for name in maps if name not in (order or [])]
+    n_rows = max(1, int(np.ceil(len(names) / n_cols)))
+    fig = make_subplots(
+        rows=n_rows, cols=n_cols,
+        subplot_titles=[f"{name} ({maps[name].sum():.0f})" for name in names],
+        shared_xaxes=True, shared_yaxes=True,
+        horizontal_spacing=0.02, vertical_spacing=0.06,
+    )
+
+    nz, nx = grid_shape(bin_size)
+    x_centers = EXTENT_X[0] + bin_size * (np.arange(nx) + 0.5)
+    z_centers = EXTENT_Z[0] + bin_size * (np.arange(nz) + 0.5)
+
+    for i, name in enumerate(names):
+        row, col = i // n_cols + 1, i % n_cols + 1
+        density = maps[name]
+        peak = density.max()
+        fig.add_trace(
+            go.Heatmap(
+                x=x_centers,
+                y=z_centers,
+                z=density / peak if peak > 0 else density,
+                zmin=0, zmax=1,
+                colorscale=[[0, "rgba(255,255,255,0)"], [1, colors.get(name, "black")]],
+                showscale=False,
+                name=name,
+                hovertemplate="x=%{x:.0f}, z=%{y:.0f}<br>상대 밀도=%{z:.2f}<extra>" + name + "</extra>",
+            ),
+            row=row, col=col,
+        )
+        fig.add_shape(
+            type="rect",
+            x0=ZONE_X[0], x1=ZONE_X[1],
+            y0=ZONE_Z[0], y1=ZONE_Z[1],
+            line=dict(color="gray", width=2),
+            row=row, col=col,
+        )
+
+    fig.update_xaxes(range=list(EXTENT_X), showgrid=False, zeroline=False, showticklabels=False)
+    fig.update_yaxes(range=list(EXTENT_Z), showgrid=False, zeroline=False, showticklabels=False)
+    fig.update_layout(
+        width=300 * n_cols,
+        height=340 * n_rows,
+        margin=dict(l=10, r=10, t=40, b=10),
+        plot_bgcolor="white",
+    )
+    return fig
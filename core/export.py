@@ -0,0 +1,181 @@
+"""데이터 내보내기 (Excel · gzip CSV · Parquet)
+
+행을 CHUNK_ROWS 개씩 잘라서 파일에 바로 써 내려가므로, 내보내는 동안 추가로 쓰는 메모리는
+데이터 크기와 관계없이 묶음 하나 분량이다. 결과 파일은 디스크 임시 파일에 만든다.
+시트가 여러 개인 CSV · Parquet 는 시트별 파일을 zip 으로 묶는다.
+
+페이지에서는 파일을 다운로드 버튼을 누를 때만 만들고(cached_export), 같은 필터 조건 ·
+형식 · 데이터의 파일은 필터 조건과 데이터 내용 해시를 키로 저장해 두었다가 그대로 돌려준다.
+"""
+import gzip
+import io
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+from core.cache import LRUCache, args_key, spec_key
+from core.timing import cache_event, stage
+
+CHUNK_ROWS = 50_000
+EXCEL_MAX_ROWS = 1_048_576  # 시트당 최대 행 수 (머리글 포함)
+
+EXPORT_FORMATS = {
+    "xlsx": dict(label="Excel (xlsx)", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv.gz": dict(label="CSV (gzip)", mime="application/gzip"),
+    "parquet": dict(label="Parquet", mime="application/vnd.apache.parquet"),
+}
+ZIP_MIME = "application/zip"
+
+EXPORT_CACHE = LRUCache(512 * 1024 * 1024, name="export")
+
+
+def _chunks(df, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _cell(value):
+    """xlsxwriter 에 바로 쓸 수 있는 값 (결측은 None: NaN · NaT · nullable 컬럼의 pd.NA 모두)"""
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_xlsx(sheets, target, chunk_rows=CHUNK_ROWS):
+    """{시트 이름: 데이터프레임} → xlsx (constant_memory: 쓴 행은 바로 임시 파일로 내려감)
+
+    시트 최대 행 수를 넘으면 '시트 이름 (2)' 처럼 이어지는 시트로 나눈다.
+    """
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "nan_inf_to_errors": True})
+    header_format = workbook.add_format({"bold": True})
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+
+    for name, df in sheets.items():
+        date_columns = [i for i, dtype in enumerate(df.dtypes) if pd.api.types.is_datetime64_any_dtype(dtype)]
+        for part, start in enumerate(range(0, max(len(df), 1), rows_per_sheet)):
+            worksheet = workbook.add_worksheet(name[:31] if part == 0 else f"{name[:26]} ({part + 1})")
+            worksheet.write_row(0, 0, [str(c) for c in df.columns], header_format)
+            for i in date_columns:
+                worksheet.set_column(i, i, 19, date_format)
+
+            row = 1
+            for chunk in _chunks(df.iloc[start:start + rows_per_sheet], chunk_rows):
+                for values in chunk.itertuples(index=False, name=None):
+                    worksheet.write_row(row, 0, [_cell(v) for v in values])
+                    row += 1
+    workbook.close()
+
+
+def write_csv_gz(df, target, chunk_rows=CHUNK_ROWS):
+    """데이터프레임 → gzip CSV (Excel 에서 한글이 깨지지 않도록 BOM 포함)"""
+    with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=6, mtime=0) as compressed:
+        text = io.TextIOWrapper(compressed, encoding="utf-8-sig", newline="")
+        for i, chunk in enumerate(_chunks(df, chunk_rows)):
+            chunk.to_csv(text, index=False, header=i == 0)
+        if len(df) == 0:
+            df.to_csv(text, index=False)
+        text.flush()
+        text.detach()
+
+
+def _arrow_safe(df):
+    """여러 타입이 섞인 object 컬럼은 문자열로 (Arrow 스키마를 하나로 고정하기 위해)"""
+    mixed = [c for c in df.columns if df[c].dtype == object]
+    if not mixed:
+        return df
+    return df.assign(**{c: df[c].astype(str).astype("string").mask(df[c].isna()) for c in mixed})
+
+
+def write_parquet(df, target, chunk_rows=CHUNK_ROWS):
+    """데이터프레임 → Parquet (묶음마다 row group 하나)"""
+    schema = pa.Schema.from_pandas(_arrow_safe(df.iloc[:0]), preserve_index=False)
+    with pq.ParquetWriter(target, schema, compression="zstd") as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(_arrow_safe(chunk), schema=schema, preserve_index=False))
+
+
+def arrow_stream_bytes(df):
+    """데이터프레임 → Arrow IPC 스트림 바이트 (API 응답용)"""
+    table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_export(sheets, fmt, target, chunk_rows=CHUNK_ROWS):
+    """{시트 이름: 데이터프레임} 을 fmt 형식으로 target(바이너리 파일 객체)에 씀. 반환값: 파일 확장자"""
+    if fmt == "xlsx":
+        write_xlsx(sheets, target, chunk_rows)
+        return "xlsx"
+
+    writer = {"csv.gz": write_csv_gz, "parquet": write_parquet}[fmt]
+    if len(sheets) == 1:
+        writer(next(iter(sheets.values())), target, chunk_rows)
+        return fmt
+
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, df in sheets.items():
+            with archive.open(f"{name}.{fmt}", "w", force_zip64=True) as member:
+                writer(df, member, chunk_rows)
+    return "zip"
+
+
+def export_file(sheets, fmt, path, chunk_rows=CHUNK_ROWS):
+    """디스크 파일로 내보내기 (확장자는 형식에 맞게 붙임). 반환값: 실제 파일 경로"""
+    partial_path = f"{path}.partial"
+    with open(partial_path, "wb") as target:
+        extension = write_export(sheets, fmt, target, chunk_rows)
+    final_path = f"{path}.{extension}"
+    os.replace(partial_path, final_path)
+    return final_path
+
+
+def export_name(sheet_names, fmt, base_name):
+    """내보낼 파일의 (파일 이름, MIME) — 파일을 만들기 전에 다운로드 버튼에 표시하기 위해"""
+    if fmt != "xlsx" and len(sheet_names) > 1:
+        return f"{base_name}.zip", ZIP_MIME
+    return f"{base_name}.{fmt}", EXPORT_FORMATS[fmt]["mime"]
+
+
+def export_bytes(sheets, fmt, base_name, chunk_rows=CHUNK_ROWS):
+    """다운로드 버튼용 (파일 내용, 파일 이름, MIME). 임시 파일에 쓴 뒤 한 번에 읽음"""
+    with tempfile.TemporaryFile() as target:
+        extension = write_export(sheets, fmt, target, chunk_rows)
+        target.seek(0)
+        data = target.read()
+    mime = ZIP_MIME if extension == "zip" else EXPORT_FORMATS[fmt]["mime"]
+    return data, f"{base_name}.{extension}", mime
+
+
+def cached_export(spec, fmt, build_sheets, base_name, cache=EXPORT_CACHE):
+    """필터 조건(spec) · 형식 · 데이터가 같으면 저장된 파일 내용을, 아니면 build_sheets() 로 만든 뒤 저장
+
+    spec: 내보낼 데이터를 결정하는 값들 (페이지 이름, 필터 선택값 등 JSON 으로 직렬화 가능한 dict)
+    build_sheets: {시트 이름: 데이터프레임} 을 돌려주는 함수 (파일은 캐시에 없을 때만 만듦)
+    원본 데이터가 바뀌면 (시즌 파일 교체 등) 필터 조건이 같아도 다시 만들도록 시트 내용 해시를 키에 넣는다.
+    """
+    with stage(f"내보내기 {fmt}"):
+        sheets = build_sheets()
+        key = spec_key(spec, fmt, base_name, args_key(sheets))
+        data = cache.get(key)
+        cache_event("export", data is not None)
+        if data is None:
+            # 여러 사람이 같은 파일을 동시에 요청하면 한 번만 만듦
+            with cache.key_lock(key):
+                data = cache.peek(key)
+                if data is None:
+                    data, _, _ = export_bytes(sheets, fmt, base_name)
+                    cache.put(key, data)
+    return data
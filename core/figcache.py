@@ -0,0 +1,61 @@
+"""Plotly 그림 캐시
+
+입력 데이터의 지문(인덱스 + 사용 컬럼 해시)과 그림 설정값을 키로, 직렬화된 그림 JSON 을 저장한다.
+모듈 전역 객체라서 재실행 · 다른 세션 사이에서도 공유되며, 용량 상한을 넘으면 가장 오래 안 쓴 것부터 지운다.
+"""
+import hashlib
+import json
+
+import pandas as pd
+import plotly.io as pio
+
+from core.cache import LRUCache
+from core.timing import cache_event, stage
+
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint(df, columns=None):
+    """데이터프레임(부분집합) 지문. 행 인덱스와 사용하는 컬럼 값만 해시"""
+    data = df if columns is None else df[list(columns)]
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(data.columns)).encode())
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class FigureCache(LRUCache):
+    """그림을 JSON 으로 저장하는 LRU 캐시"""
+
+    def __init__(self, max_bytes=MAX_BYTES, name="figure"):
+        super().__init__(max_bytes, name=name)
+
+    def get(self, key):
+        payload = super().get(key)
+        return None if payload is None else pio.from_json(payload)
+
+    def put(self, key, fig):
+        super().put(key, fig.to_json())
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def cached_figure(name, data, params, build, columns=None, cache=FIGURE_CACHE):
+    """(그림 이름, 데이터 지문, 설정값) 이 같으면 저장된 그림을, 아니면 build() 결과를 저장 후 반환
+
+    data: 그림에 쓰는 데이터프레임 (None 이면 설정값만으로 키 생성)
+    params: 그림 모양을 바꾸는 값들 (JSON 으로 직렬화 가능한 dict)
+    """
+    key = (
+        name,
+        fingerprint(data, columns) if data is not None else None,
+        json.dumps(params, sort_keys=True, ensure_ascii=False, default=str),
+    )
+    with stage(f"그림 {name}", rows=len(data) if data is not None else None):
+        fig = cache.get(key)
+        cache_event("figure", fig is not None)
+        if fig is None:
+            fig = build()
+            cache.put(key, fig)
+    return fig
@@ -0,0 +1,298 @@
+"""그림 만들기 (로케이션 산점도 · 무브먼트 · 평균 비교)
+
+구종별로 다시 필터링하지 않고 한 번의 정렬로 구종별 인덱스를 나눈 뒤,
+WebGL(Scattergl) 트레이스로 그린다. 구종별 그림은 축과 스트라이크 존을 공유하는
+하나의 패싯 그림으로 만든다. 투구가 아주 많으면 서버에서 픽셀 격자로 합성한 이미지만 보낸다.
+"""
+import base64
+import io
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from PIL import Image, ImageColor
+
+from core.zone import ZONE_X, ZONE_Z
+
+STRIKE_ZONE_SHAPE = dict(
+    type="rect",
+    x0=ZONE_X[0], x1=ZONE_X[1],
+    y0=ZONE_Z[0], y1=ZONE_Z[1],
+    line=dict(color="gray", width=2),
+    fillcolor="lightgray", opacity=0.2,
+    layer="below",
+)
+
+# 구종 색 (페이지의 cols 와 같은 값)
+PITCH_COLORS = {
+    "직구": "#4C569B",
+    "투심": "#B590C3",
+    "커터": "#45B0D8",
+    "슬라": "firebrick",
+    "스위퍼": "#00FF00",
+    "체인": "#FBE25E",
+    "포크": "MediumSeaGreen",
+    "커브": "orange",
+    "너클": "black",
+}
+
+# 이 투구 수를 넘으면 로케이션 산점도를 서버에서 이미지로 그려서 보냄
+RASTER_THRESHOLD = 5000
+
+
+def split_rows(values, order=None):
+    """한 번의 안정 정렬로 값별 행 위치를 나눔 {값: 위치 배열} (order 순서, 그 밖의 값은 뒤에)"""
+    codes, uniques = pd.factorize(pd.Series(values), sort=False)
+    rank = {name: i for i, name in enumerate(order or [])}
+    names = sorted(uniques, key=lambda name: rank.get(name, len(rank)))
+    sorter = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[sorter], np.arange(len(uniques) + 1))
+    positions = {uniques[i]: sorter[bounds[i]:bounds[i + 1]] for i in range(len(uniques))}
+    return {name: positions[name] for name in names}
+
+
+def location_scatter(df, x, y, color, colors, order=None, marker_size=10, opacity=0.7):
+    """전 구종 로케이션 (구종별 Scattergl 트레이스 하나씩)"""
+    x_values = df[x].to_numpy(dtype=float)
+    y_values = df[y].to_numpy(dtype=float)
+    fig = go.Figure()
+    for name, rows in split_rows(df[color].to_numpy(), order).items():
+        fig.add_trace(go.Scattergl(
+            x=x_values[rows],
+            y=y_values[rows],
+            mode="markers",
+            name=str(name),
+            marker=dict(size=marker_size, color=colors.get(name, "gray"), opacity=opacity),
+        ))
+    fig.add_shape(**STRIKE_ZONE_SHAPE)
+    return fig
+
+
+def location_facets(df, x, y, color, colors, order=None, n_cols=3, marker_size=12, opacity=0.7, panel_size=400):
+    """구종별 로케이션을 한 그림의 패싯으로 (축 범위와 스트라이크 존 공유)"""
+    x_values = df[x].to_numpy(dtype=float)
+    y_values = df[y].to_numpy(dtype=float)
+    groups = split_rows(df[color].to_numpy(), order)
+    total = max(len(df), 1)
+    n_rows = max(1, int(np.ceil(len(groups) / n_cols)))
+
+    fig = make_subplots(
+        rows=n_rows, cols=n_cols,
+        subplot_titles=[f"{name}  {len(rows)} Pitches ({len(rows) / total * 100:.1f}%)" for name, rows in groups.items()],
+        shared_xaxes="all", shared_yaxes="all",
+        horizontal_spacing=0.03, vertical_spacing=0.08,
+    )
+    for i, (name, rows) in enumerate(groups.items()):
+        row, col = i // n_cols + 1, i % n_cols + 1
+        fig.add_trace(
+            go.Scattergl(
+                x=x_values[rows],
+                y=y_values[rows],
+                mode="markers",
+                name=str(name),
+                marker=dict(size=marker_size, color=colors.get(name, "gray"), opacity=opacity),
+            ),
+            row=row, col=col,
+        )
+        fig.add_shape(**STRIKE_ZONE_SHAPE, row=row, col=col)
+
+    fig.update_xaxes(range=[-70, 70], showgrid=False, zeroline=False, showticklabels=False)
+    fig.update_yaxes(range=[0, 150], showgrid=False, zeroline=False, showticklabels=False)
+    fig.update_layout(
+        width=panel_size * n_cols,
+        height=panel_size * n_rows,
+        margin=dict(l=10, r=10, t=40, b=10),
+        showlegend=False,
+    )
+    return fig
+
+
+def _rgb(color):
+    """CSS 색 이름 / #hex → (r, g, b)"""
+    return ImageColor.getrgb(color)[:3]
+
+
+def raster_image(x, y, codes, rgb, extent_x, extent_y, pixel=1.0, radius=3.7):
+    """구종별 점을 픽셀 격자에 모아 RGBA 이미지로 합성 (행 0 = 위쪽)
+
+    codes: 점별 구종 번호 (0 ~ T-1, -1 은 제외), rgb: (T, 3) 구종 색
+    radius: 점 하나가 칠하는 원 반지름 (공 크기, cm)
+    """
+    nx = int(np.ceil((extent_x[1] - extent_x[0]) / pixel))
+    ny = int(np.ceil((extent_y[1] - extent_y[0]) / pixel))
+    n_types = len(rgb)
+
+    ix = np.floor((x - extent_x[0]) / pixel)
+    iy = np.floor((extent_y[1] - y) / pixel)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny) & (codes >= 0)
+    flat = (codes[inside] * ny + iy[inside].astype(int)) * nx + ix[inside].astype(int)
+    counts = np.bincount(flat, minlength=n_types * ny * nx).reshape(n_types, ny, nx).astype(float)
+
+    # 점을 공 크기 원으로 번지게 (원 안의 오프셋만큼 밀어서 더함)
+    r = max(int(radius / pixel), 0)
+    padded = np.pad(counts, ((0, 0), (r, r), (r, r)))
+    spread = np.zeros_like(counts)
+    for dy in range(-r, r + 1):
+        for dx in range(-r, r + 1):
+            if dx * dx + dy * dy <= r * r:
+                spread += padded[:, r + dy:r + dy + ny, r + dx:r + dx + nx]
+
+    # 픽셀 색 = 구종 색의 투구 수 가중 평균, 불투명도 = 로그 밀도
+    total = spread.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        color = np.einsum("tyx,tc->yxc", spread, np.asarray(rgb, dtype=float)) / total[..., None]
+        alpha = np.where(total > 0, 0.35 + 0.65 * np.log1p(total) / np.log1p(total.max()), 0)
+    image = np.dstack([np.nan_to_num(color), alpha * 255]).round().astype(np.uint8)
+    return image
+
+
+def location_raster(df, x, y, color, colors, order=None, extent_x=(-70, 70), extent_y=(-10, 150), pixel=1.0, radius=3.7):
+    """로케이션 산점도 대신 서버에서 합성한 이미지 한 장 (축 · 스트라이크 존 · 범례는 그대로)"""
+    groups = split_rows(df[color].to_numpy(), order)
+    names = list(groups.keys())
+    codes = np.full(len(df), -1)
+    for i, rows in enumerate(groups.values()):
+        codes[rows] = i
+
+    image = raster_image(
+        df[x].to_numpy(dtype=float),
+        df[y].to_numpy(dtype=float),
+        codes,
+        [_rgb(colors.get(name, "gray")) for name in names],
+        extent_x, extent_y, pixel, radius,
+    )
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG", optimize=True)
+
+    fig = go.Figure()
+    # 범례용 빈 트레이스 (구종별 투구 수 표시)
+    for name, rows in groups.items():
+        fig.add_trace(go.Scattergl(
+            x=[None], y=[None],
+            mode="markers",
+            name=f"{name} ({len(rows)})",
+            marker=dict(size=12, color=colors.get(name, "gray")),
+        ))
+    fig.add_layout_image(
+        source="data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode(),
+        xref="x", yref="y",
+        x=extent_x[0], y=extent_y[1],
+        sizex=extent_x[1] - extent_x[0], sizey=extent_y[1] - extent_y[0],
+        sizing="stretch",
+        layer="above",
+    )
+    fig.add_shape(**STRIKE_ZONE_SHAPE)
+    fig.update_xaxes(range=list(extent_x))
+    fig.update_yaxes(range=list(extent_y))
+    return fig
+
+
+def plate_location_figure(data, colors):
+    """호크아이 구종별 플레이트 위치 (cm 단위 입력, 투구가 많으면 이미지 모드)"""
+    if len(data) > RASTER_THRESHOLD:
+        # 투구가 많으면 서버에서 이미지로 합성 (전송량이 투구 수와 무관)
+        fig = location_raster(data, "PlateLocSide", "PlateLocHeight", "구종", colors, order=list(colors.keys()))
+        fig.update_layout(title=f"구종별 플레이트 위치 ({len(data)} Pitches, 이미지 모드)")
+    else:
+        fig = px.scatter(
+            data,
+            x="PlateLocSide",
+            y="PlateLocHeight",
+            color="구종",
+            title="구종별 플레이트 위치",
+            color_discrete_map=colors,
+            category_orders={"구종": list(colors.keys())},
+            labels={"PlateLocSide": "좌우 위치 (cm)", "PlateLocHeight": "상하 위치 (cm)"}
+        )
+        fig.update_traces(marker=dict(size=15))
+        fig.add_shape(**STRIKE_ZONE_SHAPE)
+    fig.update_layout(
+        width=700,  # 가로 크기
+        height=800,  # 세로 크기
+        xaxis=dict(range=[-70, 70], showline=False, title="좌우 위치 (cm)"),
+        yaxis=dict(range=[-10, 150], showline=False, title="상하 위치 (cm)")
+    )
+    return fig
+
+
+def movement_figure(data, colors):
+    """호크아이 구종별 수평/수직 무브먼트"""
+    fig = px.scatter(
+        data,
+        x="HorzBreak",
+        y="InducedVertBreak",
+        color="구종",
+        hover_data=["투수", "구속"],
+        title="구종별 수평/수직 무브먼트",
+        color_discrete_map=colors,
+        category_orders={"구종": list(colors.keys())},
+        labels={"HorzBreak": "수평 무브 (cm)", "InducedVertBreak": "수직 무브 (cm)"}
+    )
+    fig.update_traces(marker=dict(size=9))
+    fig.update_layout(
+        width=800,  # 가로 크기
+        height=750,  # 세로 크기
+        xaxis=dict(range=[-70, 70], linecolor="black"),
+        yaxis=dict(range=[-70, 70], linecolor="black")
+    )
+    fig.add_shape(type="line", x0=0, y0=-70, x1=0, y1=70, line=dict(color="black", width=2))
+    fig.add_shape(type="line", x0=-70, y0=0, x1=70, y1=0, line=dict(color="black", width=2))
+    return fig
+
+
+def mean_bar_figure(data, x, variable, title, pad):
+    """변수별 평균값 막대그래프 (data: x 컬럼 + 평균값)"""
+    fig = px.bar(
+        data,
+        x=x,
+        y="평균값",
+        title=title,
+        labels={"평균값": variable},
+        color="평균값",  # 값에 따라 색상 변화
+        color_continuous_scale="Viridis"  # 색상 스케일 적용
+    )
+
+    # y축 범위 조정
+    fig.update_layout(
+        yaxis=dict(
+            range=[
+                min(data["평균값"]) - pad,
+                max(data["평균값"]) + pad
+            ],
+            title=variable
+        ),
+        xaxis=dict(title=x),
+        title_font=dict(size=20),  # 제목 폰트 크기 조정
+        width=800,  # 그래프 넓이
+        height=600  # 그래프 높이
+    )
+    return fig
+
+
+def mean_movement_figure(data, color, title, hover_data, **color_kwargs):
+    """구종별 평균 수평/수직 무브먼트 (color 컬럼으로 선수 또는 기간 구분)"""
+    fig = px.scatter(
+        data,
+        x="HorzBreak",
+        y="InducedVertBreak",
+        color=color,
+        symbol="구종",
+        title=title,
+        hover_data=hover_data,
+        labels={"HorzBreak": "수평 무브 (cm)", "InducedVertBreak": "수직 무브 (cm)"},
+        **color_kwargs
+    )
+
+    # 축 및 레이아웃 설정
+    fig.update_traces(marker=dict(size=12))
+    fig.update_layout(
+        width=800,
+        height=750,
+        xaxis=dict(range=[-70, 70], linecolor="black"),
+        yaxis=dict(range=[-70, 70], linecolor="black"),
+    )
+    fig.add_shape(type="line", x0=0, y0=-70, x1=0, y1=70, line=dict(color="black", width=2))
+    fig.add_shape(type="line", x0=-70, y0=0, x1=70, y1=0, line=dict(color="black", width=2))
+    return fig
@@ -0,0 +1,88 @@
+"""필터 조건 적용
+
+페이지의 선택값을 dict(필터 조건)로 모아 한 번에 불리언 마스크를 만들어 거른다.
+같은 dict 를 내보내기 캐시 키로도 쓴다. 값이 '전체' · None · 빈 목록이면 그 조건은 건너뛴다.
+
+조건 키: date_range (시작, 종료), year, month, pitcher, batter, batter_side, pitcher_throw,
+        runner ('주자무' / '나머지'), bcount, pitch_types, hit_results
+
+시즌별 파일로 나뉜 데이터는 prune_seasons 로 year · date_range 에 걸리는 시즌만 골라 읽는다.
+"""
+import numpy as np
+import pandas as pd
+
+from core.timing import timed
+
+ALL = "전체"
+
+# 조건 키 → 데이터 컬럼
+PTS_COLUMNS = dict(
+    pitcher="Pitcher", batter="Batter", batter_side="BatterSide", pitcher_throw="PitcherThrows",
+    runner="Runners", bcount="BCOUNT", pitch_types="PitchType", hit_results="Result",
+)
+HAWKEYE_COLUMNS = dict(
+    pitcher="투수", batter_side="타자유형", runner="주자", pitch_types="구종", hit_results="타격결과",
+)
+
+
+def search_names(names, query):
+    """이름 목록에서 검색어가 들어간 이름 (대소문자 무시, 정렬). 검색어가 없으면 전체"""
+    names = sorted(pd.unique(pd.Series(names).dropna()))
+    query = (query or "").strip().lower()
+    return [name for name in names if query in name.lower()] if query else names
+
+
+def _selected(value):
+    if value is None or (isinstance(value, str) and value == ALL):
+        return False
+    if isinstance(value, (list, tuple, set)):
+        return len(value) > 0
+    return True
+
+
+def prune_seasons(seasons, spec):
+    """필터 조건(year, date_range)에 걸릴 수 있는 시즌만 (데이터를 읽기 전에 시즌 파일을 거름)"""
+    seasons = sorted(int(season) for season in seasons)
+    if _selected(spec.get("year")):
+        seasons = [season for season in seasons if season == int(spec["year"])]
+    date_range = spec.get("date_range")
+    if date_range is not None and len(date_range) == 2:
+        start, end = (pd.Timestamp(value).year for value in date_range)
+        seasons = [season for season in seasons if start <= season <= end]
+    return seasons
+
+
+def filter_mask(df, spec, columns, date_col="Date"):
+    """필터 조건 → 불리언 마스크 (numpy 배열)"""
+    mask = np.ones(len(df), dtype=bool)
+
+    date_range = spec.get("date_range")
+    if date_range is not None and len(date_range) == 2:
+        start, end = date_range
+        mask &= ((df[date_col] >= pd.Timestamp(start)) & (df[date_col] <= pd.Timestamp(end))).to_numpy()
+    if _selected(spec.get("year")):
+        mask &= (df[date_col].dt.year == spec["year"]).to_numpy()
+    if _selected(spec.get("month")):
+        mask &= (df[date_col].dt.month == spec["month"]).to_numpy()
+
+    for key in ("pitcher", "batter", "batter_side", "pitcher_throw", "bcount"):
+        if key in columns and _selected(spec.get(key)):
+            mask &= (df[columns[key]] == spec[key]).to_numpy()
+
+    runner = spec.get("runner")
+    if "runner" in columns and runner == "주자무":
+        mask &= (df[columns["runner"]] == "주자무").to_numpy()
+    elif "runner" in columns and runner == "나머지":
+        mask &= (df[columns["runner"]] != "주자무").to_numpy()
+
+    if _selected(spec.get("pitch_types")):
+        mask &= df[columns["pitch_types"]].isin(spec["pitch_types"]).to_numpy()
+    if "hit_results" in columns and _selected(spec.get("hit_results")):
+        mask &= df[columns["hit_results"]].astype(str).isin(spec["hit_results"]).to_numpy()
+    return mask
+
+
+@timed("필터")
+def apply_filters(df, spec, columns, date_col="Date"):
+    """필터 조건에 맞는 행만 (복사본)"""
+    return df[filter_mask(df, spec, columns, date_col)].copy()
@@ -0,0 +1,201 @@
+"""오래 걸리는 계산을 페이지 실행과 분리하는 백그라운드 작업
+
+페이지는 JOBS.submit 으로 계산을 맡기고 바로 다음 줄로 넘어가며, 끝났는지 · 얼마나 진행됐는지는
+다음 실행 때 작업 객체로 확인한다 (job_result 가 진행률 표시와 끝난 뒤 다시 실행까지 처리).
+같은 작업(함수 본문 + 인자)이 이미 대기 · 실행 중이면 새로 만들지 않고 그 작업을 돌려주므로
+여러 세션이 같은 계산을 동시에 요청해도 한 번만 계산한다. 끝난 결과는 pickle 바이트로
+'jobs' 캐시(core.cache.REGISTRY 예산 적용)에 남겨 다음 요청에 바로 돌려준다.
+
+스레드 작업 안에서 report_progress(비율, 메시지) 를 부르면 진행률이 갱신된다.
+processes=True 로 만든 실행기는 프로세스 풀을 쓰며, 함수가 모듈 최상위에 있어야 하고 진행률은 끝날 때만 바뀐다.
+"""
+import contextvars
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core.cache import REGISTRY, args_key, code_key
+from core.timing import stage
+
+WORKERS_ENV = "PITCHER_JOB_WORKERS"
+DEFAULT_WORKERS = 2
+RETRY_AFTER = 30  # 실패한 작업을 같은 요청으로 다시 실행하기까지 기다리는 시간 (초)
+POLL_SECONDS = 0.5  # 페이지에서 진행률을 다시 확인하는 간격
+
+PENDING, RUNNING, DONE, FAILED = "대기", "실행 중", "완료", "실패"
+
+_current = contextvars.ContextVar("current_job", default=None)
+
+
+class Job:
+    """작업 하나의 상태 · 진행률 · 결과 (pickle 바이트)"""
+
+    def __init__(self, key, name):
+        self.key = key
+        self.name = name
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = ""
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._payload = None
+        self._event = threading.Event()
+
+    @property
+    def done(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """끝날 때까지 기다림. 반환값: 끝났는지 여부"""
+        return self._event.wait(timeout)
+
+    def result(self, timeout=None):
+        """결과 (꺼낼 때마다 복사본). 실패한 작업이면 작업에서 난 오류를 다시 발생"""
+        if not self.wait(timeout):
+            raise TimeoutError(f"{self.name} 작업이 {timeout}초 안에 끝나지 않았습니다")
+        if self.status == FAILED:
+            raise self.error
+        return pickle.loads(self._payload)
+
+    def _start(self):
+        self.status = RUNNING
+        self.started = time.time()
+
+    def _finish(self, payload=None, error=None):
+        self._payload = payload
+        self.error = error
+        self.status = FAILED if error is not None else DONE
+        if error is None:
+            self.progress = 1.0
+        self.finished = time.time()
+        self._event.set()
+
+    def summary(self):
+        return dict(
+            name=self.name, status=self.status, progress=round(self.progress, 3), message=self.message,
+            seconds=round((self.finished or time.time()) - (self.started or self.submitted), 3),
+            error=None if self.error is None else f"{type(self.error).__name__}: {self.error}",
+        )
+
+
+def report_progress(fraction, message=""):
+    """실행 중인 작업의 진행률(0~1) · 메시지 갱신 (작업 밖에서 부르면 아무 일도 하지 않음)"""
+    job = _current.get()
+    if job is not None:
+        job.progress = min(max(float(fraction), 0.0), 1.0)
+        job.message = message
+
+
+def _run_in_thread(job, fn, args, kwargs):
+    _current.set(job)
+    with stage(f"작업 {job.name}"):
+        return pickle.dumps(fn(*args, **kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _run_in_process(fn, args, kwargs):
+    return pickle.dumps(fn(*args, **kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class JobExecutor:
+    """같은 작업은 한 번만 실행하고 결과를 캐시하는 스레드(또는 프로세스) 풀"""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, processes=False, cache_name="jobs", max_bytes=None):
+        self.max_workers = max_workers
+        self.processes = processes
+        self.cache = REGISTRY.cache(cache_name, max_bytes)
+        self._jobs = {}  # 키 → 대기 · 실행 중 · 실패한 작업 (끝난 작업은 결과를 캐시에 넣은 뒤 뺌)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            pool_type = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+            self._pool = pool_type(max_workers=self.max_workers)
+        return self._pool
+
+    def key(self, fn, *args, **kwargs):
+        return (code_key(fn), args_key(*args, **kwargs))
+
+    def submit(self, name, fn, *args, **kwargs):
+        """작업 맡기기. 같은 작업이 진행 중이면 그 작업을, 결과가 캐시에 있으면 끝난 작업을 바로 돌려줌"""
+        key = self.key(fn, *args, **kwargs)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and (job.status != FAILED or time.time() - job.finished < RETRY_AFTER):
+                return job
+            payload = self.cache.get(key)
+            job = Job(key, name)
+            if payload is not None:
+                job._finish(payload)
+                return job
+            self._jobs[key] = job
+
+        if self.processes:
+            future = self._executor().submit(_run_in_process, fn, args, kwargs)
+            job._start()
+        else:
+            def run():
+                job._start()
+                return _run_in_thread(job, fn, args, kwargs)
+            future = self._executor().submit(contextvars.Context().run, run)
+        future.add_done_callback(lambda f: self._finished(job, f))
+        return job
+
+    def _finished(self, job, future):
+        error = future.exception()
+        payload = None if error is not None else future.result()
+        if payload is not None:
+            self.cache.put(job.key, payload)
+        with self._lock:
+            job._finish(payload, error)
+            if error is None and self.cache.peek(job.key) is not None:
+                self._jobs.pop(job.key, None)  # 끝난 결과는 캐시에서 꺼냄 (캐시에 안 들어가는 큰 결과는 작업에 남김)
+
+    def get(self, name, fn, *args, timeout=None, **kwargs):
+        """작업을 맡기고 결과를 기다림 (페이지 밖 스크립트용)"""
+        return self.submit(name, fn, *args, **kwargs).result(timeout)
+
+    def active(self):
+        """대기 · 실행 중 · 최근 실패한 작업 목록"""
+        with self._lock:
+            return [job.summary() for job in self._jobs.values()]
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+JOBS = JobExecutor(int(os.environ.get(WORKERS_ENV, DEFAULT_WORKERS)))
+
+
+def job_result(job, label=None, show=True, interval=POLL_SECONDS):
+    """페이지에서 작업 결과 확인. 끝났으면 결과, 아니면 None
+
+    show: 진행 중이면 진행률 막대를 표시하고 interval 초마다 확인해서, 끝나면 페이지를 다시 실행
+    (show=False 면 표시 없이 None, 다음 실행 때 다시 확인)
+    """
+    import streamlit as st
+
+    label = label or job.name
+    if job.status == FAILED:
+        if show:
+            st.error(f"{label} 실패: {job.error}")
+        return None
+    if job.done:
+        return job.result()
+    if not show:
+        return None
+
+    @st.fragment(run_every=interval)
+    def poll():
+        if job.done:
+            st.rerun()
+        st.progress(job.progress, text=f"{label} {job.status}… {job.message}".rstrip())
+
+    poll()
+    return None
@@ -0,0 +1,171 @@
+"""데이터 불러오기 (Streamlit 없이도 사용 가능)
+
+페이지에서는 core.cache.cached_stage 로 감싸서 쓰고, 배치 리포트 같은 스크립트에서는 바로 호출한다.
+환경 변수 PITCHER_DATA_DIR 에 폴더를 주면 GitHub 대신 그 폴더의 같은 이름 파일을 읽는다 (부하 시험용 합성 데이터 등).
+
+호크아이 · PTS 는 시즌마다 파일이 하나씩 있다 (시즌 = 파일 이름의 연도). discover_seasons 로 파일 목록에서
+있는 시즌을 찾고, 페이지는 필터(core.filter.prune_seasons)에 걸리는 시즌 파일만 읽어서 이어 붙인다.
+호크아이 구종은 불러올 때 투수별로 다시 분류한다 (core.reclassify, PITCHER_RECLASSIFY=0 이면 건너뜀).
+"""
+import datetime
+import json
+import os
+import re
+import unicodedata
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import pandas as pd
+
+from core.reclassify import RECLASSIFY_ENV, reclassify_pitches
+from core.timing import stage
+from core.trajectory import attach_pitch_metrics, pitch_metrics, prepare_trajectories
+
+BASE_URL = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/"
+CONTENTS_URL = "https://api.github.com/repos/JUNG-PFe/pitcher-visualization_2/contents/?ref=main"
+DATA_DIR_ENV = "PITCHER_DATA_DIR"
+
+TRAJECTORY_FILE = "combined_pitch_data.xlsx"
+
+# 데이터 종류 → (시즌 → 파일 이름, 파일 이름에서 시즌을 찾는 패턴)
+SEASON_FILES = dict(
+    hawkeye=(lambda season: f"{season % 100:02d}_merged_data_수정.xlsx", re.compile(r"^(\d{2})_merged_data_수정\.xlsx$")),
+    pts=(lambda season: f"PTS {season} 전경기_수정.xlsx", re.compile(r"^PTS (\d{4}) 전경기_수정\.xlsx$")),
+)
+KNOWN_SEASONS = dict(hawkeye=[2023, 2024], pts=[2024])  # 파일 목록을 못 받을 때 쓰는 시즌
+
+
+def data_path(file_name, data_dir=None):
+    """파일 이름 → 읽을 위치 (PITCHER_DATA_DIR 가 있으면 로컬 경로, 아니면 GitHub URL)"""
+    data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+    return os.path.join(data_dir, file_name) if data_dir else BASE_URL + quote(file_name)
+
+
+def season_file(kind, season):
+    """데이터 종류 · 시즌 → 파일 이름"""
+    return SEASON_FILES[kind][0](int(season))
+
+
+def list_data_files(data_dir=None):
+    """데이터 폴더(없으면 GitHub 저장소)의 파일 이름 목록. 목록을 못 받으면 None"""
+    data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+    try:
+        if data_dir:
+            names = os.listdir(data_dir)
+        else:
+            with urlopen(CONTENTS_URL, timeout=10) as response:
+                names = [item["name"] for item in json.load(response)]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return [unicodedata.normalize("NFC", name) for name in names]  # macOS 에서 올린 한글 파일 이름 (NFD) 대비
+
+
+def discover_seasons(kind, data_dir=None):
+    """파일이 있는 시즌 목록 (오름차순, 데이터는 읽지 않음)"""
+    names = list_data_files(data_dir)
+    if names is None:
+        return list(KNOWN_SEASONS[kind])
+    pattern = SEASON_FILES[kind][1]
+    seasons = set()
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            year = int(match.group(1))
+            seasons.add(2000 + year if year < 100 else year)
+    return sorted(seasons)
+
+
+def season_range(seasons):
+    """시즌 목록 → 날짜 범위 (첫 시즌 1월 1일, 마지막 시즌 12월 31일). 날짜 필터 기본값용"""
+    return datetime.date(min(seasons), 1, 1), datetime.date(max(seasons), 12, 31)
+
+
+def concat_seasons(load_season, seasons):
+    """시즌별로 불러온 데이터를 최근 시즌부터 이어 붙임"""
+    if not seasons:
+        raise ValueError("불러올 시즌이 없습니다")
+    frames = [load_season(season) for season in sorted(seasons, reverse=True)]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def _read_pts(url):
+    with stage("read_excel PTS") as record:
+        df = pd.read_excel(url)
+        record["rows"] = len(df)
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    return df.dropna(subset=['Date'])
+
+
+def load_pts_season(season):
+    """PTS 한 시즌 (날짜 변환, 날짜 없는 행 제거)"""
+    return _read_pts(data_path(season_file("pts", season)))
+
+
+def load_pts(urls=None, seasons=None):
+    """PTS 데이터 (시즌별 파일 병합)
+
+    urls: 읽을 파일 목록 (벤치마크 등, None 이면 seasons 의 파일). seasons: 읽을 시즌 (None 이면 찾은 시즌 전체)
+    """
+    if urls:
+        frames = [_read_pts(url) for url in urls]
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return concat_seasons(load_pts_season, discover_seasons("pts") if seasons is None else seasons)
+
+
+def load_trajectories(url=None):
+    """궤적 샘플 (날짜 변환, cm 단위, 투구 번호 group)"""
+    url = url or data_path(TRAJECTORY_FILE)
+    with stage("read_excel 궤적") as record:
+        raw = pd.read_excel(url)
+        record["rows"] = len(raw)
+    return prepare_trajectories(raw)
+
+
+def load_trajectory_metrics(url=None):
+    """궤적 데이터로 투구별 진입각 · 홈플레이트 통과 지표를 한 번에 계산"""
+    url = url or data_path(TRAJECTORY_FILE)
+    with stage("read_excel 궤적") as record:
+        raw = pd.read_excel(url)
+        record["rows"] = len(raw)
+    with stage("궤적 지표 계산", rows=len(raw)):
+        return pitch_metrics(raw)
+
+
+def load_hawkeye_season(season, metrics=None):
+    """호크아이 한 시즌 (날짜 변환, 궤적 지표 연결, 구종 재분류)
+
+    metrics: 미리 계산한 궤적 지표 (None 이면 새로 계산). 여러 시즌을 읽을 때는 한 번 계산해서 넘긴다
+    """
+    return load_hawkeye([data_path(season_file("hawkeye", season))], metrics)
+
+
+def load_hawkeye(urls=None, metrics=None, seasons=None):
+    """호크아이 데이터 (날짜 변환, 시즌별 파일 병합, 궤적 지표 연결, 구종 재분류)
+
+    urls: 읽을 파일 목록 (None 이면 seasons 의 파일, 최근 시즌부터)
+    seasons: 읽을 시즌 (None 이면 찾은 시즌 전체)
+    metrics: 미리 계산한 궤적 지표 (None 이면 새로 계산)
+    """
+    if urls is None:
+        seasons = discover_seasons("hawkeye") if seasons is None else seasons
+        urls = [data_path(season_file("hawkeye", season)) for season in sorted(seasons, reverse=True)]
+    if not urls:
+        raise ValueError("불러올 시즌이 없습니다")
+    frames = []
+    for url in urls:
+        with stage("read_excel 호크아이") as record:
+            df = pd.read_excel(url)
+            record["rows"] = len(df)
+        df['Date'] = pd.to_datetime(df['Date'])  # 날짜 형식 통일
+        frames.append(df)
+    combined_df = pd.concat(frames, ignore_index=True)
+
+    # 궤적 지표 연결 (투수, 날짜, 구종 안의 투구 순번 기준, 궤적 없는 투구는 빈 값)
+    metrics = load_trajectory_metrics() if metrics is None else metrics
+    with stage("궤적 지표 연결", rows=len(combined_df)):
+        combined_df = attach_pitch_metrics(combined_df, metrics)
+
+    # 구종 재분류 (궤적 연결은 원래 표기 기준이라 그 뒤에, 원래 표기는 원래구종 컬럼)
+    if os.environ.get(RECLASSIFY_ENV, "1") == "0":
+        return combined_df
+    return reclassify_pitches(combined_df)
@@ -0,0 +1,346 @@
+"""여러 세션 동시 접속 부하 시험 (Streamlit AppTest 사용)
+
+합성 데이터(core.synthetic)를 실제와 같은 이름의 xlsx 로 저장하고 PITCHER_DATA_DIR 로 지정한 뒤,
+세션 N개가 동시에 페이지를 열고 · 투수를 골라 '검색 실행' 을 누르고 · 화면 설정을 바꾸는 과정을 되풀이한다.
+한 번의 조작(= 한 번의 rerun) 마다 걸린 시간을 재서 동시 세션 수별 p50 · p95 · p99 와
+그동안의 최대 메모리(RSS)를 출력하고 JSON 으로 저장한다.
+
+세션은 같은 프로세스 안의 스레드라서 캐시(core.cache.REGISTRY)는 실제 서버처럼 모든 세션이 공유한다.
+처음 한 번은 데이터 불러오기로 오래 걸리므로 측정 전에 한 세션으로 미리 실행해 둔다 (--cold 면 단계마다 캐시를 비움).
+
+예)
+    python -m core.loadtest --sessions 1,4,8
+    python -m core.loadtest --scenarios hawkeye,zone --sessions 1,2,4 --rounds 3
+    python -m core.loadtest --scale 10 --sessions 4 --cold
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+import numpy as np
+
+from core.benchmark import _git_commit
+from core.cache import REGISTRY
+from core.loader import DATA_DIR_ENV
+from core.synthetic import synthetic_dataset, write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PERCENTILES = (50, 95, 99)
+RSS_INTERVAL = 0.05  # 메모리 확인 간격 (초)
+
+
+def _widget(elements, label):
+    matches = [e for e in elements if e.label == label]
+    if not matches:
+        raise LookupError(f"위젯을 찾지 못함: {label}")
+    return matches[0]
+
+
+def _pick(label, start=0):
+    """세션 번호에 따라 다른 항목을 고르는 조작 (세션마다 다른 투수 · 설정)"""
+    def step(at, session, round_no):
+        box = _widget(at.selectbox, label)
+        options = box.options[start:] or box.options
+        box.set_value(options[(session + round_no) % len(options)])
+    return step
+
+
+def _search(label="투수 이름 선택", start=0):
+    """투수를 고르고 '검색 실행' 클릭"""
+    pick = _pick(label, start)
+
+    def step(at, session, round_no):
+        pick(at, session, round_no)
+        _widget(at.button, "검색 실행").click()
+    return step
+
+
+def _export_format(key):
+    def step(at, session, round_no):
+        radio = at.radio(key=key)
+        radio.set_value(radio.options[(session + round_no + 1) % len(radio.options)])
+    return step
+
+
+def _open(at, session, round_no):
+    pass
+
+
+# 시나리오: 페이지 파일과 조작 목록 (조작 하나 = rerun 하나). 첫 조작 open 은 첫 라운드에서만 실행
+SCENARIOS = {
+    "hawkeye": dict(
+        page="pages/호크아이 데이터_23-24.py",
+        steps=[
+            ("open", _open),
+            ("search", _search()),
+            ("grid", _pick("구역 나누기")),
+            ("metric", _pick("지표 선택")),
+            ("export_format", _export_format("hawkeye_export_format")),
+        ],
+    ),
+    "pts": dict(
+        page="pages/PTS_데이터_24.py",
+        steps=[
+            ("open", _open),
+            ("search", _search(start=1)),  # 0번은 '전체'
+            ("export_format", _export_format("pts_export_format")),
+        ],
+    ),
+    "zone": dict(
+        page="pages/PTS_데이터_존별_타구속도_24.py",
+        steps=[
+            ("open", _open),
+            ("search", _search()),
+            ("grid", _pick("구역 나누기")),
+            ("metric", _pick("지표 선택")),
+            ("export_format", _export_format("zone_export_format")),
+        ],
+    ),
+    "trend": dict(
+        page="pages/호크아이_트랜드_분석.py",
+        steps=[
+            ("open", _open),
+            ("search", _search()),
+            ("export_format", _export_format("trend_export_format")),
+        ],
+    ),
+}
+
+
+def prepare_data(scale=1, seed=0, data_dir=None):
+    """부하 시험용 xlsx 를 만들고(이미 있으면 다시 씀) PITCHER_DATA_DIR 로 지정. 반환값: 폴더 경로"""
+    data_dir = os.path.abspath(data_dir or os.path.join(ROOT, "bench_data", f"{scale}x-seed{seed}"))
+    paths = write_dataset(synthetic_dataset(scale, seed), data_dir, reuse=True)
+    if None in paths.values():
+        raise ValueError(f"{scale}× 규모는 엑셀 한 시트에 들어가지 않아 부하 시험 데이터로 쓸 수 없습니다")
+    os.environ[DATA_DIR_ENV] = data_dir
+    return data_dir
+
+
+class RSSMonitor:
+    """백그라운드 스레드로 현재 프로세스 RSS 를 주기적으로 확인해 최댓값 기록"""
+
+    def __init__(self, interval=RSS_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current():
+        """현재 RSS (바이트). /proc 이 없으면 지금까지의 최대 RSS"""
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _sample(self):
+        self.peak = max(self.peak, self.current())
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.peak = 0
+        self._sample()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+@contextmanager
+def _shared_apptest():
+    """AppTest 를 여러 스레드에서 동시에 쓰기 위한 준비
+
+    AppTest 는 실행할 때마다 설정(global.appTest) · 런타임 객체를 잠깐 바꿨다 되돌리고 스크립트를 새로 컴파일하는데,
+    스레드가 겹치면 다른 세션이 실행 중인데 되돌려 버리거나 동시에 컴파일하다 오류가 난다.
+    설정은 측정 내내 켜 두고, 런타임 객체는 마지막 것을 계속 쓰고,
+    스크립트 컴파일 결과는 실제 서버처럼 모든 세션이 함께 쓴다.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    script_cache = ScriptCache()
+    last_runtime = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime[:] = [cls._instance]
+        if not last_runtime:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last_runtime[0]
+
+    def exists(cls):
+        return cls._instance is not None or bool(last_runtime)
+
+    previous = config.get_option("global.appTest")
+    config.set_option("global.appTest", True)
+    try:
+        with mock.patch.object(app_test, "ScriptCache", lambda: script_cache), \
+                mock.patch.object(local_script_runner, "ScriptCache", lambda: script_cache), \
+                mock.patch.object(Runtime, "instance", classmethod(instance)), \
+                mock.patch.object(Runtime, "exists", classmethod(exists)):
+            yield
+    finally:
+        config.set_option("global.appTest", previous)
+
+
+def _session(scenario, session, rounds, timeout, barrier, out):
+    """한 세션: 조작마다 rerun 시간(초)과 오류를 out 에 추가"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, scenario["page"]), default_timeout=timeout)
+    at.session_state["logged_in"] = True
+    if barrier is not None:
+        barrier.wait()
+    for round_no in range(rounds):
+        for name, step in scenario["steps"]:
+            if name == "open" and round_no > 0:
+                continue
+            error = None
+            started = time.perf_counter()
+            try:
+                step(at, session, round_no)
+                at.run()
+                if at.exception:
+                    error = at.exception[0].value
+            except Exception as e:  # 위젯이 안 보이는 등 조작 실패도 오류로 집계
+                error = f"{type(e).__name__}: {e}"
+            out.append(dict(step=name, seconds=time.perf_counter() - started, error=error))
+            if error and name in ("open", "search"):
+                return  # 다음 조작을 할 화면이 없음
+
+
+def _percentiles(seconds):
+    if not seconds:
+        return {f"p{p}": None for p in PERCENTILES}
+    values = np.percentile(seconds, PERCENTILES)
+    return {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, values)}
+
+
+def _seconds(value):
+    return "-" if value is None else f"{value:.3f}s"
+
+
+def run_level(name, sessions, rounds=2, timeout=600):
+    """시나리오 하나를 세션 sessions 개로 동시에 실행. 반환값: 결과 dict"""
+    scenario = SCENARIOS[name]
+    outs = [[] for _ in range(sessions)]
+    barrier = threading.Barrier(sessions)
+    threads = [
+        threading.Thread(target=_session, args=(scenario, i, rounds, timeout, barrier, outs[i]), daemon=True)
+        for i in range(sessions)
+    ]
+    with _shared_apptest(), RSSMonitor() as rss:
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+    records = [r for out in outs for r in out]
+    seconds = [r["seconds"] for r in records]
+    errors = [r["error"] for r in records if r["error"]]
+    by_step = {}
+    for step, _ in scenario["steps"]:
+        step_seconds = [r["seconds"] for r in records if r["step"] == step]
+        if step_seconds:
+            by_step[step] = dict(reruns=len(step_seconds), **_percentiles(step_seconds))
+    return dict(
+        scenario=name, sessions=sessions, rounds=rounds, reruns=len(records), errors=len(errors),
+        error_samples=sorted(set(errors))[:5],
+        **_percentiles(seconds),
+        max=round(max(seconds), 4) if seconds else None,
+        mean=round(float(np.mean(seconds)), 4) if seconds else None,
+        wall_seconds=round(wall, 3),
+        reruns_per_second=round(len(records) / wall, 2) if wall else None,
+        peak_rss_mb=round(rss.peak / 1024 ** 2, 1),
+        by_step=by_step,
+    )
+
+
+def run(scenarios=tuple(SCENARIOS), levels=(1, 4, 8), rounds=2, scale=1, seed=0, data_dir=None, cold=False, timeout=600):
+    """시나리오 × 동시 세션 수별 측정. 반환값: 결과 dict (JSON 으로 저장 가능)"""
+    data_dir = prepare_data(scale, seed, data_dir)
+    print(f"데이터: {data_dir}")
+    results = []
+    for name in scenarios:
+        if not cold:
+            warmup = run_level(name, 1, rounds=1, timeout=timeout)  # 데이터 불러오기 · 첫 계산을 미리 해 둠
+            print(f"[{name}] 준비 실행 {warmup['wall_seconds']:.1f}s, 오류 {warmup['errors']}건")
+        for sessions in levels:
+            if cold:
+                REGISTRY.clear()
+            result = run_level(name, sessions, rounds, timeout)
+            results.append(result)
+            print(
+                f"[{name}] 세션 {sessions:>3}  rerun {result['reruns']:>4}  "
+                + "  ".join(f"{k} {_seconds(result[k])}" for k in ("p50", "p95", "p99", "max"))
+                + f"  RSS {result['peak_rss_mb']:.0f} MB  오류 {result['errors']}"
+            )
+
+    return dict(
+        created=datetime.datetime.now().isoformat(timespec="seconds"),
+        commit=_git_commit(),
+        python=platform.python_version(),
+        machine=platform.platform(),
+        cpus=os.cpu_count(),
+        scale=scale,
+        seed=seed,
+        rounds=rounds,
+        cold=cold,
+        cache_budget_mb=round(REGISTRY.budget_bytes / 1024 ** 2),
+        results=results,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit AppTest 로 여러 세션 동시 접속 부하 시험")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"쉼표로 구분 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--sessions", default="1,4,8", help="동시 세션 수, 쉼표로 구분 (예: 1,4,8)")
+    parser.add_argument("--rounds", type=int, default=2, help="세션마다 조작을 되풀이하는 횟수")
+    parser.add_argument("--scale", type=int, default=1, help="합성 데이터 규모 (엑셀 한 시트에 들어가는 크기까지)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 시드")
+    parser.add_argument("--data", help="xlsx 저장 폴더 (기본: bench_data/<규모>x-seed<시드>)")
+    parser.add_argument("--cold", action="store_true", help="준비 실행 없이, 동시 세션 수마다 캐시를 비우고 측정")
+    parser.add_argument("--timeout", type=float, default=600, help="rerun 한 번의 제한 시간(초)")
+    parser.add_argument("--out", default="benchmarks", help="결과 JSON 저장 폴더")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+    levels = [int(s) for s in args.sessions.split(",") if s.strip()]
+    if not levels or min(levels) < 1:
+        parser.error("세션 수는 1 이상이어야 합니다")
+
+    result = run(scenarios, levels, args.rounds, args.scale, args.seed, args.data, args.cold, args.timeout)
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"loadtest-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장 → {os.path.abspath(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""기간 간 비교
+
+투구마다 날짜 번호(고유 날짜 배열의 인덱스)만 붙여 한 번 groupby 하고,
+기간 × 날짜 소속 행렬을 곱해 K 개 기간의 값을 한꺼번에 구한다.
+기간이 서로 겹쳐도 데이터를 복사하지 않는다.
+"""
+import numpy as np
+import pandas as pd
+
+# 비교 변수 (화면 이름 → 데이터 컬럼)
+VARIABLES = {
+    "구속": "RelSpeed",
+    "회전수": "SpinRate",
+    "회전효율": "회전효율",
+    "회전축": "Tilt",
+    "수직무브먼트": "InducedVertBreak",
+    "수평무브먼트": "HorzBreak",
+    "릴리스높이": "RelHeight",
+    "릴리스사이드": "RelSide",
+    "익스텐션": "Extension",
+    "수직진입각": "VAA",
+    "수평진입각": "HAA",
+    "통과 구속": "PlateSpeed",
+    "도달시간": "TimeToPlate",
+}
+
+MOVEMENT_COLUMNS = ["HorzBreak", "InducedVertBreak"]
+
+
+def custom_periods(ranges):
+    """[(시작, 종료), ...] → [(라벨, 시작, 종료), ...]"""
+    return [(f"기간 {i + 1}", pd.Timestamp(start), pd.Timestamp(end)) for i, (start, end) in enumerate(ranges)]
+
+
+def monthly_periods(dates):
+    """데이터가 있는 달마다 한 기간"""
+    months = pd.to_datetime(dates).dt.to_period("M").dropna().unique()
+    return [(str(m), m.start_time, m.end_time.normalize()) for m in sorted(months)]
+
+
+def half_periods(dates):
+    """시즌(연도)별 전반기 / 후반기 (해당 연도 데이터 기간의 가운데 날짜 기준)"""
+    dates = pd.to_datetime(dates).dropna()
+    periods = []
+    for year, season in dates.groupby(dates.dt.year):
+        start, end = season.min().normalize(), season.max().normalize()
+        middle = start + (end - start) / 2
+        periods.append((f"{year} 전반기", start, middle.normalize()))
+        periods.append((f"{year} 후반기", middle.normalize() + pd.Timedelta(days=1), end))
+    return periods
+
+
+def compare_periods(df, periods, columns, date_col="Date", type_col="구종", tilt_col="Tilt"):
+    """기간별 변수 평균(회전축은 최빈값)과 기간 × 구종 무브먼트를 한 번의 groupby 로 계산
+
+    반환값: (summary, movement)
+      summary: 행 = 컬럼 (+ 투구수), 열 = 기간 라벨
+      movement: 기간, 구종, 투구수, HorzBreak, InducedVertBreak
+    """
+    labels = [label for label, _, _ in periods]
+    numeric = [c for c in dict.fromkeys(columns + MOVEMENT_COLUMNS) if c != tilt_col]
+
+    # 날짜 번호 부여 (고유 날짜 배열에 대한 인덱스)
+    day_index, days = pd.factorize(df[date_col].dt.normalize(), sort=True)
+    starts = np.array([pd.Timestamp(start) for _, start, _ in periods], dtype="datetime64[ns]")
+    ends = np.array([pd.Timestamp(end) for _, _, end in periods], dtype="datetime64[ns]")
+    day_values = days.to_numpy(dtype="datetime64[ns]")
+    membership = (day_values[None, :] >= starts[:, None]) & (day_values[None, :] <= ends[:, None])  # K × D
+
+    # 날짜 × 구종 × 회전축 부분합 (유일한 groupby)
+    keys = pd.DataFrame({"_day": day_index, "_type": df[type_col].to_numpy(), "_tilt": df[tilt_col].to_numpy()}, index=df.index)
+    values = df[numeric].apply(pd.to_numeric, errors="coerce")
+    grouped = pd.concat([keys, values], axis=1).groupby(["_day", "_type", "_tilt"], dropna=False, sort=False)
+    partial = grouped[numeric].agg(["sum", "count"])
+    sizes = grouped.size().to_numpy()
+
+    group_day = partial.index.get_level_values("_day").to_numpy()
+    weights = membership[:, group_day].astype(float)  # K × (부분합 행 수)
+    sums = weights @ partial.xs("sum", axis=1, level=1).to_numpy()
+    counts = weights @ partial.xs("count", axis=1, level=1).to_numpy()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summary = pd.DataFrame((sums / counts).T, index=numeric, columns=labels).round(2)
+
+    if tilt_col in columns:
+        # 정렬한 번호라 동률이면 가장 작은 값 (Series.mode().iloc[0] 와 같음)
+        tilt_codes, tilt_values = pd.factorize(partial.index.get_level_values("_tilt"), sort=True)
+        tilt_counts = (weights * sizes) @ _one_hot(tilt_codes, len(tilt_values))  # K × 회전축 종류
+        summary.loc[tilt_col] = [
+            tilt_values[i] if len(tilt_values) and tilt_counts[k, i] > 0 else "N/A"
+            for k, i in enumerate(tilt_counts.argmax(axis=1) if len(tilt_values) else np.zeros(len(periods), dtype=int))
+        ]
+    summary = summary.loc[[c for c in columns if c in summary.index]]
+    summary.loc["투구수"] = weights @ sizes
+
+    # 기간 × 구종 무브먼트
+    type_codes, type_values = pd.factorize(partial.index.get_level_values("_type"))
+    type_one_hot = _one_hot(type_codes, len(type_values))
+    n = (weights * sizes) @ type_one_hot  # K × 구종
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = {
+            c: (weights * partial[(c, "sum")].to_numpy()) @ type_one_hot / ((weights * partial[(c, "count")].to_numpy()) @ type_one_hot)
+            for c in MOVEMENT_COLUMNS
+        }
+    k_index, t_index = np.nonzero(n)
+    movement = pd.DataFrame({
+        "기간": np.array(labels, dtype=object)[k_index],
+        "구종": np.asarray(type_values, dtype=object)[t_index],
+        "투구수": n[k_index, t_index].astype(int),
+        **{c: means[c][k_index, t_index] for c in MOVEMENT_COLUMNS},
+    })
+
+    return summary, movement
+
+
+def _one_hot(codes, n):
+    """범주 번호 → (행 수 × n) 0/1 행렬 (번호가 -1 인 행은 모두 0)"""
+    matrix = np.zeros((len(codes), n))
+    valid = codes >= 0
+    matrix[np.nonzero(valid)[0], codes[valid]] = 1
+    return matrix
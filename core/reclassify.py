@@ -0,0 +1,136 @@
+"""구종 재분류 (데이터를 불러올 때 한 번)
+
+구종 표기는 미리 붙어 온 값이라 슬라이더 · 스위퍼 · 커터처럼 비슷한 구종이 잘못 붙은 투구가 섞여 있다.
+시즌 · 투수마다 원래 표기를 초기 군집으로 삼아 구속 · 회전수 · 무브먼트 · 회전축 공간에서
+대각 분산 가우시안 혼합을 hard EM (가장 가능성 높은 군집으로 배정 → 평균 · 분산 갱신) 으로 몇 번 다듬는다.
+
+- 다른 구종 군집의 로그 가능도가 원래 군집보다 RELABEL_MARGIN 이상 높으면 그 구종으로 바꾼다 ('변경').
+- 배정된 군집에서 표준화 거리² 가 OUTLIER_D2 를 넘으면 표기는 그대로 두고 표시만 한다 ('이상치').
+- 원래 표기는 원래구종 컬럼에 남긴다. 투구가 MIN_CLUSTER 개보다 적은 구종은 다른 투구를 받아 오지 않는다.
+
+모든 투수를 (투구 수 × 투수당 최대 구종 수 × 특성 수) 배열 연산으로 한 번에 처리한다.
+"""
+import numpy as np
+import pandas as pd
+
+from core.similarity import tilt_degrees
+from core.timing import timed
+
+RECLASSIFY_ENV = "PITCHER_RECLASSIFY"  # "0" 이면 불러올 때 재분류하지 않음
+FEATURES = ["RelSpeed", "SpinRate", "InducedVertBreak", "HorzBreak"]  # + 회전축 방향 (x, y)
+
+ORIGINAL_COLUMN = "원래구종"
+FLAG_COLUMN = "재분류"
+CHANGED, OUTLIER = "변경", "이상치"
+
+MIN_CLUSTER = 10
+MAX_ITER = 10
+RELABEL_MARGIN = 5.0  # 로그 가능도 차이 (약 e^5 ≈ 150 배)
+OUTLIER_D2 = 30.0  # 6 차원 카이제곱 분포의 99.99% 지점 근처
+VAR_FLOOR = 0.05  # 군집 표준편차 하한 (전체 표준편차 대비)
+
+
+def _features(df, tilt_col):
+    radians = np.radians(tilt_degrees(df[tilt_col].to_numpy()))
+    columns = [pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float) for column in FEATURES]
+    return np.column_stack(columns + [np.sin(radians), np.cos(radians)])
+
+
+def _cluster_stats(x, observed, assign, use, n_clusters, var_floor, previous=None):
+    """군집별 투구 수 · 평균 · 분산 (특성별로 값이 있는 투구만, 투구가 없는 군집은 이전 값 유지)"""
+    rows = assign[use]
+    weights = observed[use].astype(float)
+    values = x[use]
+    counts = np.bincount(rows, minlength=n_clusters).astype(float)
+    n = np.stack([np.bincount(rows, weights=weights[:, d], minlength=n_clusters) for d in range(x.shape[1])], axis=1)
+    s = np.stack([np.bincount(rows, weights=weights[:, d] * values[:, d], minlength=n_clusters) for d in range(x.shape[1])], axis=1)
+    ss = np.stack([np.bincount(rows, weights=weights[:, d] * values[:, d] ** 2, minlength=n_clusters) for d in range(x.shape[1])], axis=1)
+    mean = s / np.maximum(n, 1)
+    var = np.maximum(ss / np.maximum(n, 1) - mean ** 2, var_floor)
+    if previous is not None:
+        empty = n == 0
+        mean = np.where(empty, previous[1], mean)
+        var = np.where(empty, previous[2], var)
+    return counts, mean, var
+
+
+@timed("구종 재분류")
+def reclassify_pitches(df, type_col='구종', pitcher_col='투수', date_col='Date', tilt_col='Tilt'):
+    """구종 재분류 결과 (복사본): type_col 은 고친 표기, 원래구종 · 재분류('변경' / '이상치' / None) 컬럼 추가
+
+    이미 원래구종 컬럼이 있으면 그 값에서 다시 시작한다 (여러 번 불러도 결과가 같음).
+    """
+    original = df[ORIGINAL_COLUMN] if ORIGINAL_COLUMN in df.columns else df[type_col]
+    result = df.assign(**{ORIGINAL_COLUMN: original, type_col: original, FLAG_COLUMN: None})
+    if df.empty:
+        return result
+
+    x = _features(df, tilt_col)
+    observed = ~np.isnan(x)
+    x = np.where(observed, x, 0.0)
+    spread = np.nanstd(np.where(observed, x, np.nan), axis=0)
+    var_floor = (VAR_FLOOR * np.where(np.nan_to_num(spread) > 0, np.nan_to_num(spread), 1.0)) ** 2
+
+    # 군집 = (시즌, 투수, 원래 구종), 주인 = (시즌, 투수)
+    keys = pd.DataFrame({"season": df[date_col].dt.year.to_numpy(), "pitcher": df[pitcher_col].to_numpy(), "label": original.to_numpy()})
+    seeds = keys.groupby(["season", "pitcher", "label"], sort=False).ngroup().to_numpy()
+    valid = seeds >= 0
+    clusters = keys[valid].assign(cluster=seeds[valid]).drop_duplicates("cluster").sort_values("cluster")
+    n_clusters = len(clusters)
+    owner_of = clusters.groupby(["season", "pitcher"], sort=False).ngroup().to_numpy()
+    cluster_labels = clusters["label"].to_numpy()
+
+    # 투구마다 같은 주인의 군집 후보 (투구 수 × 최대 구종 수, 빈 칸은 -1)
+    slot = pd.Series(owner_of).groupby(owner_of).cumcount().to_numpy()
+    table = np.full((owner_of.max() + 1, slot.max() + 1), -1)
+    table[owner_of, slot] = np.arange(n_clusters)
+    seeds_valid = seeds[valid]
+    candidates = table[owner_of[seeds_valid]]
+    is_seed = candidates == seeds_valid[:, None]
+    xv, ov = x[valid], observed[valid]
+    weights = ov.astype(float)
+    rows = np.arange(len(seeds_valid))
+
+    assign = seeds_valid.copy()
+    inlier = np.ones(len(assign), dtype=bool)
+    stats = None
+    for _ in range(MAX_ITER):
+        stats = _cluster_stats(xv, ov, assign, inlier, n_clusters, var_floor, stats)
+        counts, mean, var = stats
+        totals = np.bincount(owner_of, weights=counts)[owner_of]
+        log_weight = np.log(np.maximum(counts, 1e-9) / np.maximum(totals, 1))
+
+        safe = np.maximum(candidates, 0)
+        d2 = np.einsum("nkd,nd->nk", (xv[:, None, :] - mean[safe]) ** 2 / var[safe], weights)  # 값이 없는 특성은 빼고 합
+        log_det = np.einsum("nkd,nd->nk", np.log(var)[safe], weights)
+        score = log_weight[safe] - 0.5 * (d2 + log_det)
+        allowed = (candidates >= 0) & ((counts[safe] >= MIN_CLUSTER) | is_seed)
+        score = np.where(allowed, score, -np.inf)
+
+        best = np.argmax(score, axis=1)
+        seed_slot = np.argmax(is_seed, axis=1)
+        move = score[rows, best] - score[rows, seed_slot] > RELABEL_MARGIN
+        chosen = np.where(move, best, seed_slot)
+        new_assign = candidates[rows, chosen]
+        inlier = d2[rows, chosen] <= OUTLIER_D2  # 다음 평균 · 분산 계산에서 이상치 제외
+        if np.array_equal(new_assign, assign):
+            break
+        assign = new_assign
+
+    labels = original.to_numpy(dtype=object).copy()
+    flags = np.full(len(df), None, dtype=object)
+    labels[valid] = cluster_labels[assign]
+    valid_flags = np.where(~inlier, OUTLIER, None).astype(object)
+    valid_flags[assign != seeds_valid] = CHANGED
+    flags[valid] = valid_flags
+    result[type_col] = labels
+    result[FLAG_COLUMN] = flags
+    return result
+
+
+def reclassify_summary(df, type_col='구종'):
+    """재분류 결과 표: 원래 구종 → 바뀐 구종별 투구 수 (이상치는 따로)"""
+    changed = df[df[FLAG_COLUMN] == CHANGED]
+    table = changed.groupby([ORIGINAL_COLUMN, type_col]).size().rename("투구수").reset_index()
+    outliers = df[df[FLAG_COLUMN] == OUTLIER].groupby(ORIGINAL_COLUMN).size().rename("이상치").reset_index()
+    return table, outliers
@@ -0,0 +1,169 @@
+"""투수별 리포트 묶음 일괄 생성 (Streamlit 없이 실행)
+
+페이지와 같은 계산 코드(core.summary · core.trend · core.figures)로 투수마다
+요약 표 · 로케이션 · 무브먼트 · 트렌드 그림을 만들어 HTML / xlsx / PNG 로 저장한다.
+투수별 작업은 프로세스 풀에서 나눠 실행한다.
+
+예)
+    python -m core.report --start 2024-04-01 --end 2024-09-30 양현종 네일
+    python -m core.report --all --workers 8 --formats html,xlsx,png --out reports
+"""
+import argparse
+import html
+import importlib.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from core.export import export_file
+from core.figures import PITCH_COLORS, movement_figure, plate_location_figure
+from core.filter import prune_seasons
+from core.loader import discover_seasons, load_hawkeye, season_range
+from core.summary import pitch_summary
+from core.trend import trend_figure, trend_table, trend_title
+
+FORMATS = ("html", "xlsx", "png")
+REPORT_TREND_VARIABLES = ["RelSpeed", "SpinRate", "InducedVertBreak", "HorzBreak"]
+
+
+def safe_name(name):
+    """파일 · 폴더 이름으로 쓸 수 없는 문자 제거"""
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(name)).strip("_") or "unknown"
+
+
+def report_figures(data, pitcher, colors=PITCH_COLORS):
+    """리포트에 넣을 그림 {이름: 그림} (페이지와 같은 그림 함수 사용)"""
+    located = data.assign(PlateLocSide=data['PlateLocSide'] * 100, PlateLocHeight=data['PlateLocHeight'] * 100)
+    figures = {
+        "location": plate_location_figure(located, colors),
+        "movement": movement_figure(data, colors),
+    }
+    aggregated = trend_table(data)
+    for variable in REPORT_TREND_VARIABLES:
+        figures[f"trend_{variable}"] = trend_figure(aggregated, variable, colors, trend_title(variable, pitcher))
+    return figures
+
+
+def _report_html(pitcher, start, end, summary, figures):
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{html.escape(pitcher)} 리포트</title></head><body>",
+        f"<h1>{html.escape(pitcher)}</h1><p>{start} ~ {end}, {int(summary['투구수'].sum())} Pitches</p>",
+        "<h2>기본 분석 값</h2>",
+        summary.to_html(index=False, na_rep=""),
+    ]
+    for i, fig in enumerate(figures.values()):
+        parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn" if i == 0 else False))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def build_report(pitcher, data, out_dir, formats, start, end):
+    """투수 한 명의 리포트 파일 생성 (프로세스 풀 작업 단위). 반환값: (투수, 투구 수, 파일 목록)"""
+    folder = os.path.join(out_dir, safe_name(pitcher))
+    os.makedirs(folder, exist_ok=True)
+    summary = pitch_summary(data, order=list(PITCH_COLORS.keys()))
+    figures = report_figures(data, pitcher)
+    files = []
+
+    if "html" in formats:
+        path = os.path.join(folder, "report.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(_report_html(pitcher, start, end, summary, figures))
+        files.append(path)
+
+    if "xlsx" in formats:
+        sheets = {"Summary": summary, "Trend": trend_table(data), "Filtered Data": data}
+        files.append(export_file(sheets, "xlsx", os.path.join(folder, "report")))
+
+    if "png" in formats:
+        for name, fig in figures.items():
+            path = os.path.join(folder, f"{name}.png")
+            fig.write_image(path)
+            files.append(path)
+
+    return pitcher, len(data), files
+
+
+def _index_html(results, start, end):
+    rows = "\n".join(
+        f"<tr><td><a href='{safe_name(p)}/report.html'>{html.escape(p)}</a></td><td>{n}</td></tr>"
+        for p, n, _ in sorted(results)
+    )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>투수 리포트</title></head><body>"
+        f"<h1>투수 리포트</h1><p>{start} ~ {end}</p>"
+        f"<table border='1'><tr><th>투수</th><th>투구수</th></tr>{rows}</table></body></html>"
+    )
+
+
+def run(pitchers, start, end, out_dir, formats, workers=None, df=None):
+    """리포트 묶음 생성. pitchers 가 비어 있으면 기간 안의 모든 투수. 반환값: 결과 목록"""
+    if "png" in formats and importlib.util.find_spec("kaleido") is None:
+        print("kaleido 가 설치되어 있지 않아 PNG 는 건너뜁니다 (pip install kaleido)")
+        formats = [f for f in formats if f != "png"]
+
+    if df is None:
+        seasons = prune_seasons(discover_seasons("hawkeye"), dict(date_range=(start, end)))  # 기간에 걸리는 시즌 파일만 읽음
+        if not seasons:
+            print(f"{start} ~ {end} 에 해당하는 시즌 데이터가 없습니다")
+            return []
+        df = load_hawkeye(seasons=seasons)
+    df = df[(df['Date'] >= pd.Timestamp(start)) & (df['Date'] <= pd.Timestamp(end))]
+    if pitchers:
+        missing = sorted(set(pitchers) - set(df['투수'].unique()))
+        if missing:
+            print(f"기간 안에 데이터가 없는 투수: {', '.join(missing)}")
+        df = df[df['투수'].isin(pitchers)]
+
+    os.makedirs(out_dir, exist_ok=True)
+    groups = list(df.groupby('투수', sort=True))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_report, name, part, out_dir, formats, start, end) for name, part in groups]
+        for done, future in enumerate(as_completed(futures), start=1):
+            pitcher, n, files = future.result()
+            results.append((pitcher, n, files))
+            print(f"[{done}/{len(futures)}] {pitcher} ({n} Pitches, 파일 {len(files)}개)")
+
+    if "html" in formats:
+        with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+            f.write(_index_html(results, start, end))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="투수별 리포트 묶음 일괄 생성")
+    parser.add_argument("pitchers", nargs="*", help="투수 이름 (--all 이면 생략)")
+    parser.add_argument("--all", action="store_true", help="기간 안의 모든 투수")
+    parser.add_argument("--start", help="시작 날짜 (YYYY-MM-DD, 기본: 첫 시즌 1월 1일)")
+    parser.add_argument("--end", help="종료 날짜 (YYYY-MM-DD, 기본: 마지막 시즌 12월 31일)")
+    parser.add_argument("--out", default="reports", help="저장 폴더")
+    parser.add_argument("--formats", default="html,xlsx", help="쉼표로 구분 (html, xlsx, png)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    args = parser.parse_args(argv)
+
+    if not args.pitchers and not args.all:
+        parser.error("투수 이름을 주거나 --all 을 지정하세요")
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        parser.error(f"지원하지 않는 형식: {', '.join(unknown)}")
+    if args.start is None or args.end is None:  # 기본 기간: 파일이 있는 모든 시즌
+        seasons = discover_seasons("hawkeye")
+        if not seasons:
+            parser.error("호크아이 시즌 파일이 없습니다")
+        first_day, last_day = season_range(seasons)
+        args.start = args.start or first_day.isoformat()
+        args.end = args.end or last_day.isoformat()
+
+    started = time.perf_counter()
+    results = run([] if args.all else args.pitchers, args.start, args.end, args.out, formats, args.workers)
+    print(f"투수 {len(results)}명, {time.perf_counter() - started:.1f}초 → {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
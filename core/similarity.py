@@ -0,0 +1,254 @@
+"""비슷한 구종 찾기 (투수 × 구종 프로필의 최근접 이웃)
+
+시즌 · 투수 · 구종마다 구속 · 회전수 · 무브먼트 · 릴리스 · 익스텐션 평균과 회전축 방향을 한 줄로 요약하고
+(pitch_profiles), 특성마다 표준화한 공간에서 KD-tree 로 가장 가까운 k 개를 찾는다.
+회전축은 시계 표기를 각도로 바꿔 (cos, sin) 두 축으로 넣으므로 12:00 과 11:45 가 가깝게 잡힌다.
+
+색인(PitchIndex)은 시즌 단위로 채운다. 새로 불러온 시즌은 버퍼에 붙이고 같은 시즌의 예전 행은 지움 표시만 하며,
+버퍼 · 지운 행이 전체의 REBUILD_FRACTION 을 넘으면 그때 트리를 (표준화 기준까지) 다시 만든다.
+검색은 트리와 버퍼를 함께 훑고, 조건(시즌 · 구종 · 제외할 투수)은 잎 노드에서 마스크로 거른다.
+"""
+import heapq
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.cache import args_key
+from core.timing import timed
+
+# 프로필 특성 (평균) + 회전축 방향 (tilt_x, tilt_y)
+PROFILE_COLUMNS = ["RelSpeed", "SpinRate", "InducedVertBreak", "HorzBreak", "RelHeight", "RelSide", "Extension"]
+TILT_COLUMNS = ["tilt_x", "tilt_y"]
+SIMILARITY_FEATURES = PROFILE_COLUMNS + TILT_COLUMNS
+
+MIN_PITCHES = 20  # 이보다 적게 던진 구종은 평균이 흔들려서 색인하지 않음
+LEAF_SIZE = 32
+REBUILD_FRACTION = 0.25
+
+
+def tilt_degrees(tilt):
+    """회전축 시계 표기('1:30', 시각 값 포함) → 각도 (12:00 = 0°, 시계 방향, 못 읽으면 NaN)"""
+    codes, uniques = pd.factorize(pd.Series(tilt))  # 표기 종류는 수십 개라 종류별로 한 번만 읽음
+    parts = pd.Series(uniques, dtype=object).astype("string").str.extract(r"(\d{1,2}):(\d{2})")
+    minutes = pd.to_numeric(parts[0]) % 12 * 60 + pd.to_numeric(parts[1])
+    degrees = (minutes * 0.5).to_numpy(dtype=float)  # 12시간 = 720분 = 360°
+    return np.where(codes >= 0, degrees[np.maximum(codes, 0)] if len(degrees) else np.nan, np.nan)
+
+
+def tilt_clock(degrees):
+    """각도 → 회전축 시계 표기 (15분 단위)"""
+    minutes = np.round(np.asarray(degrees, dtype=float) % 360 * 2 / 15) * 15 % 720
+    return [
+        None if np.isnan(m) else f"{int(m // 60) or 12}:{int(m % 60):02d}" for m in np.atleast_1d(minutes)
+    ]
+
+
+@timed("구종 프로필")
+def pitch_profiles(df, pitcher_col='투수', type_col='구종', date_col='Date', tilt_col='Tilt', min_pitches=MIN_PITCHES):
+    """투구 단위 표 → 시즌 · 투수 · 구종별 프로필 (특성 평균, 회전축 평균 방향, 투구수)"""
+    radians = np.radians(tilt_degrees(df[tilt_col].to_numpy()))
+    frame = pd.DataFrame({
+        "season": df[date_col].dt.year.to_numpy(),
+        "pitcher": df[pitcher_col].to_numpy(),
+        "pitch_type": df[type_col].to_numpy(),
+        **{column: pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float) for column in PROFILE_COLUMNS},
+        "tilt_x": np.sin(radians),
+        "tilt_y": np.cos(radians),
+    })
+    grouped = frame.groupby(["season", "pitcher", "pitch_type"], sort=True)
+    profiles = grouped[SIMILARITY_FEATURES].mean()
+    profiles.insert(0, "pitches", grouped.size())
+    profiles = profiles[profiles["pitches"] >= min_pitches].reset_index()
+    # 평균 방향 벡터 → 회전축 표기 (표시용), 방향 벡터는 단위 길이로
+    norm = np.hypot(profiles["tilt_x"], profiles["tilt_y"]).replace(0, np.nan)
+    profiles["tilt_x"] /= norm
+    profiles["tilt_y"] /= norm
+    profiles["Tilt"] = tilt_clock(np.degrees(np.arctan2(profiles["tilt_x"], profiles["tilt_y"])))
+    return profiles
+
+
+class KDTree:
+    """numpy 배열로 만든 KD-tree (가장 넓게 퍼진 축의 중앙값으로 나눔, 잎은 LEAF_SIZE 개 이하)
+
+    노드마다 경계 상자를 저장해서 질의점과 상자 사이 최소 거리로 가지치기한다.
+    """
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        points = np.asarray(points, dtype=float)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(points))
+        self.nodes = []  # [시작, 끝, 왼쪽 자식, 오른쪽 자식], 잎은 자식이 -1
+        self._lows, self._highs = [], []
+        if len(points):
+            self._build(points, 0, len(points))
+        self.points = points[self.order]
+        self.lows = np.array(self._lows).reshape(len(self.nodes), points.shape[1])
+        self.highs = np.array(self._highs).reshape(len(self.nodes), points.shape[1])
+
+    def _build(self, points, start, end):
+        node = len(self.nodes)
+        block = points[self.order[start:end]]
+        self._lows.append(block.min(axis=0))
+        self._highs.append(block.max(axis=0))
+        self.nodes.append([start, end, -1, -1])
+        if end - start > self.leaf_size:
+            axis = int(np.argmax(self._highs[node] - self._lows[node]))
+            middle = (start + end) // 2
+            part = np.argpartition(block[:, axis], middle - start)
+            self.order[start:end] = self.order[start:end][part]
+            self.nodes[node][2] = self._build(points, start, middle)
+            self.nodes[node][3] = self._build(points, middle, end)
+        return node
+
+    def _box_distance(self, node, point):
+        gap = np.maximum(self.lows[node] - point, 0) + np.maximum(point - self.highs[node], 0)
+        return float(gap @ gap)
+
+    def query(self, point, k, allowed=None):
+        """가장 가까운 k 개의 (원래 행 번호, 제곱 거리). allowed: 원래 행 순서의 불리언 마스크 (False 는 건너뜀)"""
+        point = np.asarray(point, dtype=float)
+        allowed = None if allowed is None else np.asarray(allowed, dtype=bool)[self.order]
+        best_rows = np.empty(0, dtype=int)
+        best_distances = np.empty(0)
+        heap = [(self._box_distance(0, point), 0)] if len(self.points) else []
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if len(best_distances) == k and bound > best_distances[-1]:
+                break
+            start, end, left, right = self.nodes[node]
+            if left >= 0:
+                for child in (left, right):
+                    heapq.heappush(heap, (self._box_distance(child, point), child))
+                continue
+            rows = np.arange(start, end)
+            if allowed is not None:
+                rows = rows[allowed[start:end]]
+            diff = self.points[rows] - point
+            best_rows = np.concatenate([best_rows, rows])
+            best_distances = np.concatenate([best_distances, np.einsum("ij,ij->i", diff, diff)])
+            keep = np.argsort(best_distances, kind="stable")[:k]
+            best_rows, best_distances = best_rows[keep], best_distances[keep]
+        return self.order[best_rows], best_distances
+
+
+class PitchIndex:
+    """구종 프로필 색인 (스레드 안전). update 로 시즌 단위 추가 · 교체, query 로 비슷한 구종 검색"""
+
+    def __init__(self, features=SIMILARITY_FEATURES, leaf_size=LEAF_SIZE, rebuild_fraction=REBUILD_FRACTION):
+        self.features = list(features)
+        self.leaf_size = leaf_size
+        self.rebuild_fraction = rebuild_fraction
+        self.profiles = pd.DataFrame()  # 색인한 모든 행 (지운 행 포함, 행 번호 = 위치)
+        self.live = np.empty(0, dtype=bool)
+        self.versions = {}  # 시즌 → 프로필 내용 해시 (같은 시즌을 다시 넣으면 건너뜀)
+        self.rebuilds = 0
+        self._tree = None
+        self._tree_rows = 0  # 트리에 들어간 행 수 (그 뒤 행은 버퍼)
+        self._mean = self._scale = None
+        self._vectors = np.empty((0, len(self.features)))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return int(self.live.sum())
+
+    def _standardize(self, profiles):
+        values = profiles[self.features].to_numpy(dtype=float)
+        values = np.where(np.isnan(values), self._mean, values)  # 빈 특성은 평균 (표준화 후 0)
+        return (values - self._mean) / self._scale
+
+    def _rebuild(self, profiles):
+        """live 행만으로 표준화 기준 · 트리를 새로 만들어 한꺼번에 교체 (잠금 안에서 호출)"""
+        profiles = profiles.reset_index(drop=True)
+        values = profiles[self.features].to_numpy(dtype=float)
+        mean = np.nan_to_num(np.nanmean(values, axis=0)) if len(profiles) else np.zeros(len(self.features))
+        scale = np.nanstd(values, axis=0) if len(profiles) else np.ones(len(self.features))
+        self._mean = mean
+        self._scale = np.where(np.nan_to_num(scale) > 0, np.nan_to_num(scale), 1.0)
+        vectors = self._standardize(profiles)
+        tree = KDTree(vectors, self.leaf_size)
+        self.profiles, self.live, self._vectors, self._tree, self._tree_rows = (
+            profiles, np.ones(len(profiles), dtype=bool), vectors, tree, len(profiles)
+        )
+        self.rebuilds += 1
+
+    @timed("유사 구종 색인")
+    def update(self, profiles):
+        """프로필(pitch_profiles 결과)을 시즌 단위로 넣음. 이미 있는 시즌은 새 값으로 교체, 내용이 같으면 건너뜀
+
+        검색 중인 쪽이 옛 배열을 계속 읽을 수 있도록 배열을 고치지 않고 새로 만들어 잠금 안에서 바꿔 끼운다.
+        """
+        with self._lock:
+            changed = []
+            for season, part in profiles.groupby("season", sort=True):
+                version = args_key(part.reset_index(drop=True))
+                if self.versions.get(season) != version:
+                    changed.append(part)
+                    self.versions[season] = version
+            if not changed:
+                return False
+            new = pd.concat(changed, ignore_index=True)
+            live = self.live
+            if len(self.profiles):
+                live = live & ~self.profiles["season"].isin(new["season"].unique()).to_numpy()
+            combined = pd.concat([self.profiles, new], ignore_index=True)
+            live = np.concatenate([live, np.ones(len(new), dtype=bool)])
+
+            stale = (~live[:self._tree_rows]).sum() + (len(combined) - self._tree_rows)
+            if self._tree is None or stale > self.rebuild_fraction * max(len(combined), 1):
+                self._rebuild(combined[live])
+            else:
+                vectors = np.vstack([self._vectors, self._standardize(new)])
+                self.profiles, self.live, self._vectors = combined, live, vectors
+            return True
+
+    def live_profiles(self):
+        """지금 색인에 들어 있는 (지우지 않은) 프로필"""
+        with self._lock:
+            profiles, live = self.profiles, self.live
+        return profiles[live] if len(profiles) else profiles
+
+    def query(self, pitcher, pitch_type, season=None, k=10, seasons=None, same_type=True, exclude_self=True):
+        """투수 · 구종과 가장 비슷한 k 개 구종 (distance: 표준화 공간의 거리, 작을수록 비슷). 기준 프로필이 없으면 None
+
+        season: 기준 프로필의 시즌 (None 이면 가장 최근), seasons: 찾을 시즌 (None 이면 전체)
+        same_type: 같은 구종 표기 안에서만, exclude_self: 기준 투수의 다른 시즌 · 구종은 빼기
+        """
+        with self._lock:
+            profiles, live, vectors, tree, tree_rows = (
+                self.profiles, self.live, self._vectors, self._tree, self._tree_rows
+            )
+        if not len(profiles):
+            return None
+        base = live & (profiles["pitcher"] == pitcher).to_numpy() & (profiles["pitch_type"] == pitch_type).to_numpy()
+        if season is not None:
+            base &= (profiles["season"] == season).to_numpy()
+        if not base.any():
+            return None
+        target_row = np.flatnonzero(base)[np.argmax(profiles["season"].to_numpy()[base])]
+        target = vectors[target_row]
+
+        allowed = live.copy()
+        allowed[target_row] = False
+        if seasons is not None:
+            allowed &= profiles["season"].isin(list(seasons)).to_numpy()
+        if same_type:
+            allowed &= (profiles["pitch_type"] == pitch_type).to_numpy()
+        if exclude_self:
+            allowed &= (profiles["pitcher"] != pitcher).to_numpy()
+
+        rows, distances = tree.query(target, k, allowed[:tree_rows])
+        pending = np.flatnonzero(allowed[tree_rows:]) + tree_rows  # 트리를 다시 만들기 전에 들어온 행
+        if len(pending):
+            diff = vectors[pending] - target
+            rows = np.concatenate([rows, pending])
+            distances = np.concatenate([distances, np.einsum("ij,ij->i", diff, diff)])
+            keep = np.argsort(distances, kind="stable")[:k]
+            rows, distances = rows[keep], distances[keep]
+
+        result = profiles.iloc[rows].reset_index(drop=True)
+        result.insert(0, "distance", np.sqrt(distances).round(3))
+        return result
+
+
+PITCH_INDEX = PitchIndex()
@@ -0,0 +1,86 @@
+"""구종별 기본 분석 값 (호크아이 데이터)"""
+import pandas as pd
+
+from core.timing import timed
+
+
+@timed("구종별 요약")
+def pitch_summary(df, order=None):
+    """구종별 투구수 · 비율 · 구속 · 회전 · 무브먼트 · 릴리스 · 진입각 요약 표 (order: 구종 표시 순서)"""
+    analysis = df.groupby('구종').agg(
+        투구수=('구종', 'count'),
+        투구_비율=('구종', lambda x: round((x.count() / len(df)) * 100, 1)),
+        스트라이크_비율=('심판콜', lambda x: round((x[x != 'B'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),
+        구속_평균=('RelSpeed', lambda x: round(x.mean(), 0)),
+        구속_최고=('RelSpeed', lambda x: round(x.max(), 0)),
+        회전수=('SpinRate', lambda x: round(x.mean(), 0)),
+        회전효율=('회전효율', lambda x: round(x.mean(), 0)),
+        Tilt=('Tilt', lambda x: x.mode().iloc[0] if not x.mode().empty else None),
+        수직무브_평균=('InducedVertBreak', lambda x: round(x.mean(), 1)),
+        수평무브_평균=('HorzBreak', lambda x: round(x.mean(), 1)),
+        타구속도=('ExitSpeed', lambda x: round(x.mean(), 0)),
+        높이=('RelHeight', lambda x: round(x.mean() * 100, 0)),
+        사이드=('RelSide', lambda x: round(x.mean() * 100, 0)),
+        익스텐션=('Extension', lambda x: round(x.mean() * 100, 0)),
+        수직진입각=('VAA', lambda x: round(x.mean(), 1)),
+        수평진입각=('HAA', lambda x: round(x.mean(), 1)),
+        통과구속=('PlateSpeed', lambda x: round(x.mean(), 0)),
+        도달시간=('TimeToPlate', lambda x: round(x.mean(), 3))
+    ).reset_index()
+
+    if order:
+        analysis['구종'] = pd.Categorical(analysis['구종'], categories=list(order), ordered=True)
+        analysis = analysis.sort_values('구종')
+    return analysis
+
+
+@timed("구종별 요약")
+def pts_summary(df, order=None):
+    """PTS 구종별 투구수 · 비율 · 구속 · 판정 비율 요약 표"""
+    analysis = df.groupby('PitchType').agg(
+        투구수=('PitchType', 'count'),
+        투구_비율=('PitchType', lambda x: round((x.count() / len(df)) * 100, 1)),
+        스트라이크_비율=('PitchCall', lambda x: round((x[x != 'B'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),
+        구속_평균=('PTS_Speed', lambda x: round(x.mean(), 0)),
+        구속_최고=('PTS_Speed', lambda x: round(x.max(), 0)),
+        헛스윙S_비율=('PitchCall', lambda x: round((x[x == 'S'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),  # S 비율
+        루킹S_비율=('PitchCall', lambda x: round((x[x == 'T'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),  # T 비율
+        파울_비율=('PitchCall', lambda x: round((x[x == 'F'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),  # F 비율
+        안타_비율=('PitchCall', lambda x: round((x[x == 'H'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),
+        볼_비율=('PitchCall', lambda x: round((x[x == 'B'].count() / x.count()) * 100, 1) if x.count() > 0 else 0)  # B 비율
+    ).reset_index()
+
+    if order:
+        analysis['PitchType'] = pd.Categorical(analysis['PitchType'], categories=list(order), ordered=True)
+        analysis = analysis.sort_values('PitchType')
+    return analysis
+
+
+def pitcher_comparison(data1, data2, variables):
+    """두 선수의 변수별 평균 (회전축은 최빈값) 과 차이 표. variables: {화면 이름: 컬럼}"""
+    comparison_results = []
+    for variable, column in variables.items():
+        if column == "Tilt":
+            value1 = data1[column].mode().iloc[0] if not data1[column].mode().empty else "N/A"
+            value2 = data2[column].mode().iloc[0] if not data2[column].mode().empty else "N/A"
+        else:
+            value1 = round(data1[column].mean(), 2)
+            value2 = round(data2[column].mean(), 2)
+
+        comparison_results.append({
+            "변수": variable,
+            "선수 1 평균": value1,
+            "선수 2 평균": value2,
+            "차이": abs(value1 - value2) if column != "Tilt" else "N/A"
+        })
+    return pd.DataFrame(comparison_results)
+
+
+def movement_means(data, label_col, label):
+    """구종별 평균 수평/수직 무브먼트 (label_col 컬럼에 label 표시)"""
+    return (
+        data.groupby("구종")[["HorzBreak", "InducedVertBreak"]]
+        .mean()
+        .reset_index()
+        .assign(**{label_col: label})
+    )
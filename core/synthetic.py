@@ -0,0 +1,317 @@
+"""가짜(합성) 데이터 생성
+
+실제 워크북 없이도 성능을 재고, 여러 시즌 규모에서도 시험할 수 있도록
+호크아이 병합 데이터 · PTS 데이터 · 궤적 샘플과 같은 컬럼 구성의 데이터를 만든다.
+
+투수마다 구종 구성과 구종별 구속 · 회전 · 무브먼트 · 릴리스 특성을 정해 두고 투구를 뽑으므로
+구종별 요약 · 트렌드 · 히트맵이 실제 데이터와 비슷한 모양이 된다.
+궤적 샘플은 호크아이 투구 일부(투수 · 경기 단위)의 릴리스 → 플레이트 값으로 등가속도 궤적을 만들어
+(투수, 날짜, 구종, 순번) 으로 다시 연결된다.
+
+규모: 1× 는 한 팀 두 시즌 정도 (호크아이 시즌당 22,000 구, PTS 한 시즌 44,000 구, 궤적 600 구).
+규모를 키우면 시즌 수를 최대 MAX_SEASONS 까지 늘리고, 그 뒤로는 투수(팀) 수를 늘린다.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.export import EXCEL_MAX_ROWS, export_file
+from core.trajectory import PLATE_Y
+
+SCALES = (1, 10, 100)
+
+HAWKEYE_ROWS_PER_SEASON = 22_000
+HAWKEYE_SEASONS = 2
+PTS_ROWS_PER_SEASON = 44_000
+PTS_SEASONS = 1
+TRAJECTORY_PITCHES = 600
+PITCHERS_PER_TEAM = 30
+LAST_SEASON = 2024
+MAX_SEASONS = 10
+
+RUBBER_Y = 18.44  # 투수판 → 홈플레이트 끝 (m)
+PLATE_FRONT_Y = 0.43  # 플레이트 앞면 (로케이션 측정 위치, m)
+SAMPLE_INTERVAL = 0.01  # 궤적 샘플 간격 (초)
+
+# 구종별 특성 (우투 기준 평균, 표준편차). 무브먼트는 cm, 구속은 km/h
+PITCH_PROFILES = {
+    "직구": dict(speed=(145, 3), spin=(2300, 120), efficiency=(95, 3), ivb=(42, 5), hb=(-18, 6), height=(0.85, 0.28), usage=1.0),
+    "투심": dict(speed=(142, 3), spin=(2200, 120), efficiency=(92, 4), ivb=(25, 5), hb=(-35, 6), height=(0.70, 0.27), usage=0.35),
+    "커터": dict(speed=(137, 3), spin=(2350, 130), efficiency=(45, 10), ivb=(20, 5), hb=(8, 5), height=(0.75, 0.27), usage=0.35),
+    "슬라": dict(speed=(132, 3), spin=(2450, 150), efficiency=(35, 10), ivb=(5, 6), hb=(20, 7), height=(0.60, 0.28), usage=0.8),
+    "스위퍼": dict(speed=(128, 3), spin=(2500, 150), efficiency=(55, 10), ivb=(0, 6), hb=(38, 8), height=(0.60, 0.28), usage=0.25),
+    "체인": dict(speed=(130, 3), spin=(1700, 150), efficiency=(85, 6), ivb=(18, 6), hb=(-30, 7), height=(0.55, 0.27), usage=0.5),
+    "포크": dict(speed=(131, 3), spin=(1300, 200), efficiency=(70, 10), ivb=(8, 6), hb=(-15, 7), height=(0.50, 0.27), usage=0.5),
+    "커브": dict(speed=(118, 4), spin=(2550, 180), efficiency=(75, 8), ivb=(-30, 7), hb=(22, 7), height=(0.55, 0.30), usage=0.6),
+}
+PITCH_TYPES = list(PITCH_PROFILES)
+
+RUNNERS = ["주자무", "1루", "2루", "3루", "1,2루", "1,3루", "2,3루", "만루"]
+RUNNER_WEIGHTS = [0.55, 0.17, 0.08, 0.03, 0.08, 0.03, 0.03, 0.03]
+BCOUNTS = [f"{b}-{s}" for b in range(4) for s in range(3)]
+HIT_RESULTS = ["땅볼아웃", "뜬공아웃", "직선타아웃", "안타", "2루타", "3루타", "홈런", "실책"]
+HIT_RESULT_WEIGHTS = [0.30, 0.27, 0.08, 0.22, 0.07, 0.01, 0.03, 0.02]
+
+# 판정 (B: 볼, T: 루킹 스트라이크, S: 헛스윙, F: 파울, H: 인플레이) 확률 — 존 안 / 존 밖
+CALLS = np.array(list("BTSFH"))
+CALL_WEIGHTS_IN_ZONE = [0.12, 0.28, 0.15, 0.25, 0.20]
+CALL_WEIGHTS_OUT_ZONE = [0.62, 0.05, 0.14, 0.11, 0.08]
+ZONE_SIDE = 0.23  # 스트라이크 존 (m)
+ZONE_HEIGHT = (0.46, 1.05)
+
+
+def layout(scale, rows_per_season, base_seasons):
+    """규모 → (시즌 수, 시즌당 행 수, 팀 수)"""
+    total = rows_per_season * base_seasons * scale
+    seasons = min(base_seasons * scale, MAX_SEASONS)
+    per_season = int(math.ceil(total / seasons))
+    teams = max(1, int(round(per_season / rows_per_season)))
+    return seasons, per_season, teams
+
+
+def _pitchers(rng, n_pitchers, prefix):
+    """투수별 이름 · 투구 손 · 구종 구성(사용 비율) · 구종별 개인 편차"""
+    names = np.array([f"{prefix}{i + 1:03d}" for i in range(n_pitchers)], dtype=object)
+    left = rng.random(n_pitchers) < 0.3
+
+    n_types = len(PITCH_TYPES)
+    base_usage = np.array([PITCH_PROFILES[t]["usage"] for t in PITCH_TYPES])
+    usage = np.zeros((n_pitchers, n_types))
+    usage[:, 0] = 1.0  # 직구는 모두 던짐
+    for p in range(n_pitchers):
+        k = rng.integers(2, 5)
+        others = rng.choice(np.arange(1, n_types), size=k, replace=False, p=base_usage[1:] / base_usage[1:].sum())
+        usage[p, others] = rng.dirichlet(np.ones(k)) * rng.uniform(0.6, 1.4)
+    usage /= usage.sum(axis=1, keepdims=True)
+
+    return dict(
+        name=names,
+        left=left,
+        usage=usage,
+        workload=rng.gamma(2.0, 1.0, n_pitchers),  # 선발 · 불펜 투구 수 차이
+        speed=rng.normal(0, 2.5, (n_pitchers, n_types)),
+        spin=rng.normal(0, 150, (n_pitchers, n_types)),
+        ivb=rng.normal(0, 4, (n_pitchers, n_types)),
+        hb=rng.normal(0, 4, (n_pitchers, n_types)),
+        rel_height=rng.normal(1.75, 0.12, n_pitchers),
+        rel_side=rng.normal(0.55, 0.15, n_pitchers),
+        extension=rng.normal(1.9, 0.12, n_pitchers),
+    )
+
+
+def _tilt(ivb, hb):
+    """무브먼트 방향 → 회전축 시계 표기 (15분 단위, 예: '1:30')"""
+    minutes = np.round((np.degrees(np.arctan2(-hb, ivb)) % 360) * 2 / 15).astype(int) * 15 % 720
+    hours = minutes // 60
+    hours = np.where(hours == 0, 12, hours)
+    return np.array([f"{h}:{m:02d}" for h, m in zip(hours, minutes % 60)], dtype=object)
+
+
+def _season_dates(rng, n, year):
+    start = pd.Timestamp(f"{year}-03-23")
+    days = rng.integers(0, (pd.Timestamp(f"{year}-09-30") - start).days + 1, n)
+    return start + pd.to_timedelta(days, unit="D")
+
+
+def _pitch_rows(rng, n, pitchers, year):
+    """투구 n 개 (공용 컬럼). 날짜 · 투수 순으로 정렬"""
+    p = rng.choice(len(pitchers["name"]), size=n, p=pitchers["workload"] / pitchers["workload"].sum())
+    cum = pitchers["usage"].cumsum(axis=1)[p]
+    t = np.minimum((rng.random(n)[:, None] > cum).sum(axis=1), len(PITCH_TYPES) - 1)
+
+    def draw(key, offset=None):
+        mean = np.array([PITCH_PROFILES[name][key][0] for name in PITCH_TYPES])[t]
+        sd = np.array([PITCH_PROFILES[name][key][1] for name in PITCH_TYPES])[t]
+        value = mean + sd * rng.standard_normal(n)
+        return value + offset[p, t] if offset is not None else value
+
+    hand = np.where(pitchers["left"][p], -1.0, 1.0)  # 좌투는 좌우 반전
+    ivb = draw("ivb", pitchers["ivb"])
+    hb = draw("hb", pitchers["hb"]) * hand
+    plate_z = draw("height")
+    plate_x = rng.normal(0, 0.28, n) + 0.05 * hand
+    in_zone = (np.abs(plate_x) <= ZONE_SIDE) & (plate_z >= ZONE_HEIGHT[0]) & (plate_z <= ZONE_HEIGHT[1])
+
+    u = rng.random(n)[:, None]
+    call = np.where(
+        in_zone,
+        CALLS[np.minimum((u > np.cumsum(CALL_WEIGHTS_IN_ZONE)).sum(axis=1), 4)],
+        CALLS[np.minimum((u > np.cumsum(CALL_WEIGHTS_OUT_ZONE)).sum(axis=1), 4)],
+    )
+    in_play = call == "H"
+    result = np.where(in_play, rng.choice(HIT_RESULTS, size=n, p=HIT_RESULT_WEIGHTS), None).astype(object)
+    exit_speed = np.where(in_play, rng.normal(135, 15, n), np.nan)
+
+    rows = pd.DataFrame({
+        "date": _season_dates(rng, n, year),
+        "pitcher": pitchers["name"][p],
+        "throws": np.where(pitchers["left"][p], "좌투", "우투"),
+        "batter": np.array([f"타자{i:03d}" for i in range(1, 301)], dtype=object)[rng.integers(0, 300, n)],
+        "batter_side": np.where(rng.random(n) < 0.45, "좌타", "우타"),
+        "runner": rng.choice(RUNNERS, size=n, p=RUNNER_WEIGHTS),
+        "bcount": rng.choice(BCOUNTS, size=n),
+        "pitch_type": np.array(PITCH_TYPES, dtype=object)[t],
+        "result": result,
+        "call": call,
+        "speed": draw("speed", pitchers["speed"]),
+        "spin": draw("spin", pitchers["spin"]),
+        "efficiency": np.clip(draw("efficiency"), 5, 100),
+        "tilt": _tilt(ivb, hb),
+        "ivb": ivb,
+        "hb": hb,
+        "exit_speed": exit_speed,
+        "rel_height": pitchers["rel_height"][p] + rng.normal(0, 0.04, n),
+        "rel_side": pitchers["rel_side"][p] * hand + rng.normal(0, 0.04, n),
+        "extension": pitchers["extension"][p] + rng.normal(0, 0.05, n),
+        "plate_x": plate_x,
+        "plate_z": plate_z,
+    })
+    return rows.sort_values(["date", "pitcher"], kind="stable", ignore_index=True)
+
+
+def hawkeye_frame(rows):
+    """공용 컬럼 → 호크아이 병합 데이터 컬럼"""
+    return pd.DataFrame({
+        "Date": rows["date"],
+        "투수": rows["pitcher"],
+        "타자": rows["batter"],
+        "타자유형": rows["batter_side"],
+        "주자": rows["runner"],
+        "구종": rows["pitch_type"],
+        "타격결과": rows["result"],
+        "심판콜": rows["call"],
+        "RelSpeed": rows["speed"].round(1),
+        "구속": rows["speed"].round(0),
+        "SpinRate": rows["spin"].round(0),
+        "회전효율": rows["efficiency"].round(0),
+        "Tilt": rows["tilt"],
+        "InducedVertBreak": rows["ivb"].round(1),
+        "HorzBreak": rows["hb"].round(1),
+        "ExitSpeed": rows["exit_speed"].round(1),
+        "RelHeight": rows["rel_height"].round(3),
+        "RelSide": rows["rel_side"].round(3),
+        "Extension": rows["extension"].round(3),
+        "PlateLocSide": rows["plate_x"].round(3),
+        "PlateLocHeight": rows["plate_z"].round(3),
+    })
+
+
+def pts_frame(rows):
+    """공용 컬럼 → PTS 데이터 컬럼 (위치는 cm)"""
+    return pd.DataFrame({
+        "Date": rows["date"],
+        "Pitcher": rows["pitcher"],
+        "Batter": rows["batter"],
+        "PitcherThrows": rows["throws"],
+        "BatterSide": rows["batter_side"],
+        "Runners": rows["runner"],
+        "BCOUNT": rows["bcount"],
+        "PitchType": rows["pitch_type"],
+        "Result": rows["result"],
+        "PitchCall": rows["call"],
+        "PTS_Speed": rows["speed"].round(1),
+        "PTS_location_X": (rows["plate_x"] * 100).round(1),
+        "PTS_location_Z": (rows["plate_z"] * 100).round(1),
+        "PTS_ExitSpeed": rows["exit_speed"].round(1),
+    })
+
+
+def _plate_zone(x, z):
+    """3x3 존 번호 (1~9, 존 밖은 11~14 사분면)"""
+    col = np.clip(((x + ZONE_SIDE) / (2 * ZONE_SIDE) * 3).astype(int), 0, 2)
+    row = np.clip(((ZONE_HEIGHT[1] - z) / (ZONE_HEIGHT[1] - ZONE_HEIGHT[0]) * 3).astype(int), 0, 2)
+    inside = (np.abs(x) <= ZONE_SIDE) & (z >= ZONE_HEIGHT[0]) & (z <= ZONE_HEIGHT[1])
+    outside = 11 + (x > 0).astype(int) + 2 * (z < sum(ZONE_HEIGHT) / 2).astype(int)
+    return np.where(inside, row * 3 + col + 1, outside)
+
+
+def trajectory_frame(hawkeye, n_pitches, rng):
+    """호크아이 투구 중 앞쪽 경기부터 n_pitches 개 정도를 골라 등가속도 궤적 샘플 생성 (m 단위)"""
+    games = hawkeye.groupby(["투수", "Date"], sort=False).ngroup().to_numpy()
+    sizes = np.bincount(games)
+    chosen_games = np.flatnonzero(np.cumsum(sizes) - sizes < n_pitches)
+    pitches = hawkeye[np.isin(games, chosen_games)]
+
+    x_plate = pitches["PlateLocSide"].to_numpy(dtype=float)
+    z_plate = pitches["PlateLocHeight"].to_numpy(dtype=float)
+    x0 = pitches["RelSide"].to_numpy(dtype=float)
+    z0 = pitches["RelHeight"].to_numpy(dtype=float)
+    y0 = RUBBER_Y - pitches["Extension"].to_numpy(dtype=float)
+    v0 = pitches["RelSpeed"].to_numpy(dtype=float) / 3.6
+
+    # 공기 저항으로 플레이트 앞에서 처음 속도의 약 90%
+    distance = y0 - PLATE_FRONT_Y
+    ay = (1 - 0.9 ** 2) * v0 ** 2 / (2 * distance)
+    flight = (v0 - np.sqrt(v0 ** 2 - 2 * ay * distance)) / ay
+    ax = 2 * pitches["HorzBreak"].to_numpy(dtype=float) / 100 / flight ** 2
+    az = -9.81 + 2 * pitches["InducedVertBreak"].to_numpy(dtype=float) / 100 / flight ** 2
+    vx0 = (x_plate - x0 - 0.5 * ax * flight ** 2) / flight
+    vz0 = (z_plate - z0 - 0.5 * az * flight ** 2) / flight
+
+    # 플레이트 앞 PLATE_Y 까지 SAMPLE_INTERVAL 간격 샘플
+    end_y = PLATE_Y / 100
+    end_time = (v0 - np.sqrt(v0 ** 2 - 2 * ay * (y0 - end_y))) / ay
+    counts = np.floor(end_time / SAMPLE_INTERVAL).astype(int) + 1
+    pitch = np.repeat(np.arange(len(pitches)), counts)
+    t = (np.arange(len(pitch)) - np.repeat(np.cumsum(counts) - counts, counts)) * SAMPLE_INTERVAL
+    noise = rng.normal(0, 0.005, (len(pitch), 3))
+
+    return pd.DataFrame({
+        "date": pitches["Date"].dt.strftime("%Y-%m-%d").to_numpy()[pitch],
+        "pitcher": pitches["투수"].to_numpy()[pitch],
+        "pitch_type": pitches["구종"].to_numpy()[pitch],
+        "zone": _plate_zone(x_plate, z_plate)[pitch],
+        "time": t.round(3),
+        "ball_pos_X": (x0[pitch] + vx0[pitch] * t + 0.5 * ax[pitch] * t ** 2 + noise[:, 0]).round(4),
+        "ball_pos_Y": (y0[pitch] - v0[pitch] * t + 0.5 * ay[pitch] * t ** 2 + noise[:, 1]).round(4),
+        "ball_pos_Z": (z0[pitch] + vz0[pitch] * t + 0.5 * az[pitch] * t ** 2 + noise[:, 2]).round(4),
+    })
+
+
+def synthetic_dataset(scale=1, seed=0):
+    """규모별 합성 데이터 {hawkeye: {시즌: 데이터프레임}, pts: 데이터프레임, trajectory: 궤적 원본}"""
+    rng = np.random.default_rng(seed)
+
+    seasons, per_season, teams = layout(scale, HAWKEYE_ROWS_PER_SEASON, HAWKEYE_SEASONS)
+    pitchers = _pitchers(rng, PITCHERS_PER_TEAM * teams, "투수")
+    years = range(LAST_SEASON - seasons + 1, LAST_SEASON + 1)
+    hawkeye = {year: hawkeye_frame(_pitch_rows(rng, per_season, pitchers, year)) for year in years}
+
+    seasons, per_season, teams = layout(scale, PTS_ROWS_PER_SEASON, PTS_SEASONS)
+    pts_pitchers = _pitchers(rng, 2 * PITCHERS_PER_TEAM * teams, "PTS투수")
+    pts = pd.concat(
+        [pts_frame(_pitch_rows(rng, per_season, pts_pitchers, year))
+         for year in range(LAST_SEASON - seasons + 1, LAST_SEASON + 1)],
+        ignore_index=True,
+    )
+
+    trajectory = trajectory_frame(hawkeye[LAST_SEASON], TRAJECTORY_PITCHES * scale, rng)
+    return dict(hawkeye=hawkeye, pts=pts, trajectory=trajectory)
+
+
+def write_dataset(dataset, out_dir, reuse=False):
+    """합성 데이터를 실제 워크북과 같은 파일 구성(xlsx, 시즌별 파일)으로 저장. 반환값: {hawkeye: [경로], pts: [경로], trajectory: 경로}
+
+    엑셀 한 시트에 들어가지 않는 데이터는 쓰지 않고 경로를 None 으로 돌려준다.
+    reuse: 같은 이름의 파일이 이미 있으면 다시 쓰지 않음 (같은 규모 · 시드로 만든 폴더에서만 사용)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    def write(df, name):
+        if len(df) >= EXCEL_MAX_ROWS:
+            return None
+        path = os.path.join(out_dir, name)
+        if reuse and os.path.exists(f"{path}.xlsx"):
+            return f"{path}.xlsx"
+        return export_file({"Sheet1": df}, "xlsx", path)
+
+    hawkeye = [write(df, f"{year % 100:02d}_merged_data_수정") for year, df in sorted(dataset["hawkeye"].items(), reverse=True)]
+    pts_seasons = dataset["pts"].groupby(dataset["pts"]["Date"].dt.year, sort=True)
+    pts = [write(df.reset_index(drop=True), f"PTS {year} 전경기_수정") for year, df in reversed(list(pts_seasons))]
+    return dict(
+        hawkeye=None if None in hawkeye else hawkeye,
+        pts=None if None in pts else pts,
+        trajectory=write(dataset["trajectory"], "combined_pitch_data"),
+    )
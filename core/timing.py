@@ -0,0 +1,269 @@
+"""실행 단계별 시간 측정
+
+페이지가 한 번 다시 실행될 때(rerun)마다 단계별 걸린 시간 · 행 수 · 캐시 적중 여부를 모은다.
+단계는 끝나는 즉시 구조화 로그(JSON 한 줄)로 남기고, 실행이 끝나면 관리자에게만 사이드바 패널로 보여 준다.
+관리자는 다음 한 번의 실행을 cProfile 로 기록할 수 있다.
+
+로그는 환경 변수 PITCHER_TIMING_LOG 에 파일 경로('-' 이면 표준 오류)를 주면 남긴다.
+측정 코드는 Streamlit 없이도 동작한다 (배치 리포트 · 벤치마크에서는 로그만 남음).
+캐시된 함수의 적중 여부는 core.cache.cached_stage 가 기록한다.
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+LOGGER = logging.getLogger("pitcher.timing")
+LOG_ENV = "PITCHER_TIMING_LOG"
+HISTORY_SIZE = 10  # 패널에 보여 줄 최근 실행 수
+PROFILE_LINES = 40
+
+_run = contextvars.ContextVar("timing_run", default=None)
+_stack = contextvars.ContextVar("timing_stack", default=())
+_profiling = []  # cProfile 을 켠 채 아직 끝나지 않은 실행 (모든 세션 공용, 프로파일러는 한 번에 하나만 켤 수 있음)
+_profiling_lock = threading.Lock()
+
+
+def configure_log(path=None):
+    """구조화 로그 출력 위치 설정 (path 가 '-' 이면 표준 오류). 같은 위치는 한 번만 추가"""
+    path = path or os.environ.get(LOG_ENV)
+    if not path:
+        return
+    target = "<stderr>" if path == "-" else os.path.abspath(path)
+    if any(getattr(h, "_timing_target", None) == target for h in LOGGER.handlers):
+        return
+    handler = logging.StreamHandler(sys.stderr) if path == "-" else logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._timing_target = target
+    LOGGER.addHandler(handler)
+    LOGGER.setLevel(logging.INFO)
+    LOGGER.propagate = False
+
+
+def _log(event, **fields):
+    if LOGGER.isEnabledFor(logging.INFO):
+        LOGGER.info(json.dumps(dict(event=event, time=round(time.time(), 3), **fields), ensure_ascii=False, default=str))
+
+
+class Run:
+    """한 번의 실행 기록 (페이지 이름, 단계 목록, cProfile 결과)"""
+
+    def __init__(self, page, profile=False):
+        self.page = page
+        self.run_id = uuid.uuid4().hex[:8]
+        self.stages = []
+        self.seconds = None
+        self.profile_text = None
+        self.profile_data = None
+        self.profile_error = None
+        self._started = time.perf_counter()
+        self._profiler = None
+        self.thread = threading.current_thread()
+        if profile:
+            profiler = cProfile.Profile()
+            with _profiling_lock:
+                try:
+                    profiler.enable()
+                    self._profiler = profiler
+                    _profiling.append(self)
+                except ValueError as error:  # 다른 프로파일러가 이미 동작 중
+                    self.profile_error = str(error)
+
+    def finish(self):
+        """실행 종료 (여러 번 불러도 처음 한 번만 기록)"""
+        if self.seconds is not None:
+            return
+        self.seconds = time.perf_counter() - self._started
+        with _profiling_lock:
+            if self in _profiling:
+                _profiling.remove(self)
+        if self._profiler is not None:
+            self._profiler.disable()
+            stats = pstats.Stats(self._profiler)
+            self.profile_data = marshal.dumps(stats.stats)  # .prof 파일과 같은 형식
+            text = io.StringIO()
+            stats.stream = text
+            stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+            self.profile_text = text.getvalue()
+            self._profiler = None
+
+    def summary(self):
+        return dict(page=self.page, run=self.run_id, seconds=round(self.seconds or 0, 4), stages=len(self.stages))
+
+
+def begin_run(page, profile=False):
+    """새 실행 기록 시작 (이전 기록은 버림)
+
+    st.stop() · 예외로 end_run 까지 가지 못한 이전 실행(같은 스레드)은 여기서 끝내고,
+    프로파일을 요청하면 아직 켜져 있는 다른 실행의 프로파일러도 먼저 끈다.
+    """
+    previous = _run.get()
+    if previous is not None:
+        previous.finish()
+    current = threading.current_thread()
+    with _profiling_lock:
+        leftover = [run for run in _profiling if profile or run.thread is current]
+    for run in leftover:
+        run.finish()
+    run = Run(page, profile)
+    _run.set(run)
+    _stack.set(())
+    return run
+
+
+def end_run():
+    """실행 기록 종료 후 반환 (시작한 기록이 없으면 None)"""
+    run = _run.get()
+    if run is None:
+        return None
+    run.finish()
+    _run.set(None)
+    _log("run", **run.summary())
+    return run
+
+
+def _rows(result):
+    shape = getattr(result, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+@contextmanager
+def stage(name, rows=None):
+    """단계 시간 측정. 넘겨받는 기록(dict)의 rows 를 바꿔 결과 행 수를 남길 수 있음"""
+    stack = _stack.get()
+    record = dict(stage=name, depth=len(stack), rows=rows, seconds=None, cache={})
+    run = _run.get()
+    if run is not None:
+        run.stages.append(record)  # 시작 순서대로 (안쪽 단계는 바깥 단계 다음)
+    token = _stack.set(stack + (record,))
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - started
+        _stack.reset(token)
+        _log(
+            "stage", page=run.page if run else None, run=run.run_id if run else None,
+            stage=name, depth=record["depth"], seconds=round(record["seconds"], 4), rows=record["rows"],
+            cache=record["cache"] or None,
+        )
+
+
+def cache_event(kind, hit):
+    """진행 중인 가장 안쪽 단계에 캐시 적중 / 실패 기록 (kind: 'data', 'figure', 'export' 등)"""
+    stack = _stack.get()
+    if stack:
+        stack[-1]["cache"][kind] = "hit" if hit else "miss"
+
+
+def timed(name):
+    """함수 호출을 한 단계로 측정하는 데코레이터 (결과의 행 수도 기록)"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name) as record:
+                result = fn(*args, **kwargs)
+                record["rows"] = _rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def _finish_with_thread(thread, run):
+    """실행 스레드가 끝나면 (end_page 를 못 거쳤어도) 실행을 끝내서 프로파일러를 끔"""
+    thread.join()
+    if run.seconds is None:
+        run.finish()
+        _log("run", stopped=True, **run.summary())
+
+
+def begin_page(page):
+    """페이지 실행 기록 시작. 관리자가 프로파일을 요청했으면 이번 실행을 cProfile 로 기록
+
+    Streamlit 은 실행마다 스크립트 스레드를 새로 띄우고 실행이 끝나면 스레드도 끝난다.
+    프로파일을 켠 실행은 그 스레드가 끝나길 기다리는 감시 스레드를 함께 띄워서,
+    st.stop() · 예외로 end_page 까지 오지 못해도 프로파일러가 켜진 채 남지 않게 한다.
+    """
+    import streamlit as st
+
+    profile = bool(st.session_state.get("is_admin")) and st.session_state.pop("timing_profile_next", False)
+    run = begin_run(page, profile=profile)
+    if run._profiler is not None:
+        threading.Thread(
+            target=_finish_with_thread, args=(threading.current_thread(), run), name="timing-profile", daemon=True
+        ).start()
+    return run
+
+
+def end_page():
+    """페이지 실행 기록 종료. 관리자면 사이드바에 단계별 시간 패널 표시"""
+    import streamlit as st
+
+    run = end_run()
+    if run is None or not st.session_state.get("is_admin"):
+        return run
+
+    history = st.session_state.setdefault("timing_history", [])
+    history.append(run.summary())
+    del history[:-HISTORY_SIZE]
+
+    with st.sidebar.expander(f"⏱ 실행 시간 {run.seconds:.2f}초 (관리자)"):
+        st.dataframe(
+            [
+                {
+                    "단계": "  " * s["depth"] + s["stage"],
+                    "시간(ms)": round((s["seconds"] or 0) * 1000, 1),
+                    "행 수": s["rows"],
+                    "캐시": ", ".join(f"{k} {'적중' if v == 'hit' else '실패'}" for k, v in s["cache"].items()),
+                }
+                for s in run.stages
+            ],
+            hide_index=True,
+        )
+        st.caption("최근 실행")
+        st.dataframe(history[::-1], hide_index=True)
+
+        # 캐시별 크기 · 적중률 (모든 세션 공용)
+        from core.cache import REGISTRY
+        st.caption(f"캐시 {REGISTRY.total_bytes() / 1024 ** 2:.1f} / {REGISTRY.budget_bytes / 1024 ** 2:.0f} MB, 예산 초과로 지운 항목 {REGISTRY.evictions}개")
+        st.dataframe(
+            [
+                {
+                    "캐시": c["name"], "항목": c["entries"], "MB": round(c["bytes"] / 1024 ** 2, 1),
+                    "적중률": c["hit_rate"], "적중": c["hits"], "실패": c["misses"], "지움": c["evictions"],
+                }
+                for c in REGISTRY.stats()
+            ],
+            hide_index=True,
+        )
+
+        # 대기 · 실행 중인 백그라운드 작업 (모든 세션 공용)
+        from core.jobs import JOBS
+        jobs = JOBS.active()
+        if jobs:
+            st.caption("백그라운드 작업")
+            st.dataframe(jobs, hide_index=True)
+
+        st.checkbox("다음 실행을 cProfile 로 기록", key="timing_profile_next")
+        if run.profile_error:
+            st.warning(f"프로파일을 기록하지 못했습니다: {run.profile_error}")
+        if run.profile_text:
+            st.code(run.profile_text)
+            st.download_button(
+                "프로파일 다운로드 (.prof)", run.profile_data, file_name=f"{run.run_id}.prof",
+                mime="application/octet-stream", on_click="ignore"
+            )
+    return run
+
+
+configure_log()
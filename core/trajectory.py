@@ -0,0 +1,300 @@
+"""3D 피칭 궤적
+
+궤적 샘플은 투구별로 연속된 행으로 들어온다(time 이 줄어드는 지점에서 새 투구).
+모든 계산은 투구 경계 위치 배열로 한 번에 처리하고, 구종마다 Scatter3d 트레이스 하나에
+투구 사이를 NaN 으로 끊어서 담는다.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+POSITION_COLUMNS = ["ball_pos_X", "ball_pos_Y", "ball_pos_Z"]
+PLATE_Y = 150  # 익스텐션 선을 연장할 y 위치 (cm)
+REFERENCE_Y = 1524  # 도달시간을 재기 시작하는 y 위치 (50 ft, cm). 투구마다 첫 샘플 위치가 달라서 고정값으로 맞춤
+
+# 등가속도 모델 계수 (축별 시작 위치, 시작 속도, 가속도)
+FIT_COLUMNS = ["x0", "vx0", "ax", "y0", "vy0", "ay", "z0", "vz0", "az"]
+
+
+def assign_pitch_ids(df, time_col="time"):
+    """time 값이 줄어드는 순간마다 새 투구 번호 부여"""
+    return (df[time_col].diff() < 0).cumsum()
+
+
+def prepare_trajectories(raw):
+    """궤적 원본 정리: 날짜 변환, 위치 m → cm, 투구 번호(group) 부여"""
+    df = raw.copy()
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df = df.dropna(subset=['date'])  # 날짜 없는 데이터 제거
+    df[POSITION_COLUMNS] = df[POSITION_COLUMNS] * 100
+    df['group'] = assign_pitch_ids(df)
+    return df
+
+
+def pitch_bounds(pitch_ids):
+    """연속된 투구 번호 배열 → (시작 위치, 끝 위치+1) 배열"""
+    pitch_ids = np.asarray(pitch_ids)
+    if len(pitch_ids) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    starts = np.flatnonzero(np.r_[True, pitch_ids[1:] != pitch_ids[:-1]])
+    ends = np.r_[starts[1:], len(pitch_ids)]
+    return starts, ends
+
+
+def extend_to_plate(positions, starts, ends, plate_y=PLATE_Y):
+    """각 투구의 마지막 두 점 기울기로 y=plate_y 까지 연장한 점 (연장할 수 없으면 NaN)
+
+    positions: (n, 3) 배열, 반환값: (투구 수, 3) 배열
+    """
+    last = positions[ends - 1]
+    prev = positions[np.maximum(ends - 2, starts)]
+    delta = last - prev
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        factor = (plate_y - last[:, 1]) / delta[:, 1]
+    extended = last + delta * factor[:, None]
+    extended[:, 1] = plate_y
+
+    ok = (ends - starts > 1) & (last[:, 1] > plate_y) & np.isfinite(factor)
+    extended[~ok] = np.nan
+    return extended
+
+
+def fit_pitches(times, positions, starts, ends):
+    """모든 투구의 등가속도 모델 p(t) = p0 + v0·t + a·t²/2 을 한 번에 최소제곱 적합
+
+    t 는 투구 첫 샘플 기준 시간. 반환값: (계수 (투구 수, 9), 잔차 RMSE (투구 수,), 마지막 샘플 시간 (투구 수,))
+    샘플이 3개 미만인 투구는 NaN.
+    """
+    lengths = ends - starts
+    n_pitches = len(starts)
+    coefficients = np.full((n_pitches, 9), np.nan)
+    rmse = np.full(n_pitches, np.nan)
+    if n_pitches == 0:
+        return coefficients, rmse, np.zeros(0)
+
+    t = times - np.repeat(times[starts], lengths)
+    basis = np.column_stack([np.ones_like(t), t, 0.5 * t ** 2])  # (샘플 수, 3)
+
+    # 투구별 정규방정식 (BᵀB) c = Bᵀp 를 reduceat 으로 한꺼번에 구성
+    normal = np.add.reduceat(basis[:, :, None] * basis[:, None, :], starts)  # (투구 수, 3, 3)
+    rhs = np.add.reduceat(basis[:, :, None] * positions[:, None, :], starts)  # (투구 수, 3, 축)
+
+    ok = lengths >= 3
+    ok[ok] = np.abs(np.linalg.det(normal[ok])) > 1e-12
+    solved = np.linalg.solve(normal[ok], rhs[ok])  # (투구 수, 3 기저, 3 축)
+    coefficients[ok] = solved.transpose(0, 2, 1).reshape(-1, 9)
+
+    # 투구별 잔차 RMSE
+    per_sample = coefficients.reshape(-1, 3, 3)[np.repeat(np.arange(n_pitches), lengths)]  # (샘플 수, 축, 기저)
+    predicted = np.einsum("nb,nab->na", basis, per_sample)
+    squared = np.einsum("na,na->n", positions - predicted, positions - predicted)
+    rmse = np.sqrt(np.add.reduceat(squared, starts) / lengths)
+
+    return coefficients, rmse, t[ends - 1]
+
+
+def position_at_time(coefficients, t):
+    """계수와 시간 (투구 수,) 또는 (투구 수, k) → 위치 (..., 3)"""
+    c = coefficients.reshape(-1, 3, 3)
+    t = np.asarray(t, dtype=float)
+    if t.ndim == 1:
+        t = t[:, None]
+    return c[:, None, :, 0] + c[:, None, :, 1] * t[..., None] + 0.5 * c[:, None, :, 2] * t[..., None] ** 2
+
+
+def time_at_y(coefficients, y):
+    """y 좌표에 도달하는 시간 (없으면 NaN)
+
+    y(t) 는 포물선이라 해가 둘인데, 꼭짓점(t = -vy0/ay, 공이 멈췄다 되돌아오는 시점)을 지난 해는 버리고
+    첫 샘플과 같은 쪽 가지의 해 하나만 쓴다. 첫 샘플보다 릴리스 쪽 y 는 뒤로 연장한 음수 시간이 된다.
+    y 가 스칼라면 (투구 수,), 배열 (k,) 이면 (투구 수, k)
+    """
+    y0, vy, ay = coefficients[:, 3], coefficients[:, 4], coefficients[:, 5]
+    y = np.asarray(y, dtype=float)
+    if y.ndim:
+        y0, vy, ay = y0[:, None], vy[:, None], ay[:, None]
+    a, b, c = 0.5 * ay, vy, y0 - y
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 그 지점의 속도 부호가 vy0 와 같은 해 = c / q (a → 0 이면 직선 해 -c/b 와 같아짐)
+        q = -0.5 * (b + np.sign(b) * np.sqrt(b ** 2 - 4 * a * c))
+        return c / q
+
+
+def position_at_y(coefficients, y):
+    """y 좌표를 지날 때의 위치 (투구 수, 3)"""
+    return position_at_time(coefficients, time_at_y(coefficients, y))[:, 0]
+
+
+def fit_table(df, pitch_col="pitch_id", time_col="time", meta_cols=("pitcher", "date", "pitch_type", "zone")):
+    """투구별 등가속도 모델 계수 표 (적재 시점에 한 번 계산해 원본과 함께 보관)"""
+    starts, ends = pitch_bounds(df[pitch_col].to_numpy())
+    coefficients, rmse, t_end = fit_pitches(
+        df[time_col].to_numpy(dtype=float), df[POSITION_COLUMNS].to_numpy(dtype=float), starts, ends
+    )
+    table = df.iloc[starts][[pitch_col] + [c for c in meta_cols if c in df.columns]].reset_index(drop=True)
+    table[FIT_COLUMNS] = coefficients
+    table["t_end"] = t_end
+    table["n_samples"] = ends - starts
+    table["rmse"] = rmse
+    return table
+
+
+def approach_metrics(fits, plate_y=PLATE_Y, reference_y=REFERENCE_Y):
+    """계수 표 → y=plate_y 통과 시점의 진입각 · 속도 · 도달시간 (투구별, 한 번에 계산)
+
+    VAA/HAA: 수직/수평 진입각 (도, 아래/3루 방향이 음수), PlateSpeed: 통과 속도 (km/h),
+    TimeToPlate: y=reference_y 부터 통과까지 시간 (s, 적합한 모델로 계산)
+    """
+    coefficients = fits[FIT_COLUMNS].to_numpy(dtype=float)
+    t = time_at_y(coefficients, plate_y)
+    c = coefficients.reshape(-1, 3, 3)
+    velocity = c[:, :, 1] + c[:, :, 2] * t[:, None]  # (투구 수, 3), cm/s
+    vx, vy, vz = velocity.T
+
+    return pd.DataFrame({
+        "VAA": np.degrees(np.arctan2(vz, -vy)).round(2),
+        "HAA": np.degrees(np.arctan2(vx, -vy)).round(2),
+        "PlateSpeed": (np.linalg.norm(velocity, axis=1) * 0.036).round(1),
+        "TimeToPlate": (t - time_at_y(coefficients, reference_y)).round(3),
+    }, index=fits.index)
+
+
+APPROACH_COLUMNS = ["VAA", "HAA", "PlateSpeed", "TimeToPlate"]
+
+
+def pitch_metrics(raw, meta_cols=("pitcher", "date", "pitch_type", "zone")):
+    """궤적 원본 → 투구별 (메타 정보 + 진입각 · 통과 지표) 표 (적재 시점 배치 계산)"""
+    fits = fit_table(prepare_trajectories(raw), pitch_col="group", meta_cols=meta_cols)
+    return pd.concat([fits[["group", *meta_cols]], approach_metrics(fits)], axis=1)
+
+
+def attach_pitch_metrics(pitches, metrics, left_on=("투수", "Date", "구종"), right_on=("pitcher", "date", "pitch_type")):
+    """투구 단위 표에 궤적 지표를 붙임
+
+    두 데이터에 공통 투구 ID 가 없어서 (투수, 날짜, 구종) 안에서의 투구 순번까지 맞춰 연결한다.
+    궤적이 없는 투구는 NaN.
+    """
+    left_on, right_on = list(left_on), list(right_on)
+    left = pitches.assign(_date=pitches[left_on[1]].dt.normalize())
+    right = metrics.assign(_date=pd.to_datetime(metrics[right_on[1]]).dt.normalize())
+    left_keys = [left_on[0], "_date", left_on[2]]
+    right_keys = [right_on[0], "_date", right_on[2]]
+    left["_seq"] = left.groupby(left_keys, sort=False).cumcount()
+    right["_seq"] = right.groupby(right_keys, sort=False).cumcount()
+
+    joined = left.merge(
+        right[right_keys + ["_seq"] + APPROACH_COLUMNS].rename(columns=dict(zip(right_keys, left_keys))),
+        on=left_keys + ["_seq"],
+        how="left",
+    )
+    joined.index = pitches.index
+    return joined.drop(columns=["_date", "_seq"])
+
+
+def sample_fits(fits, n_points=30, y_end=PLATE_Y, pitch_col="pitch_id", meta_cols=("pitch_type", "zone")):
+    """계수 표 → 첫 샘플 시점부터 y_end 도달까지 n_points 개로 다시 만든 궤적 (trajectory_traces 입력 형식)"""
+    coefficients = fits[FIT_COLUMNS].to_numpy(dtype=float)
+    t_stop = time_at_y(coefficients, y_end)
+    t_stop = np.where(np.isnan(t_stop), fits["t_end"].to_numpy(dtype=float), t_stop)
+    t = t_stop[:, None] * np.linspace(0, 1, n_points)[None, :]
+    positions = position_at_time(coefficients, t).reshape(-1, 3)
+
+    sampled = pd.DataFrame(positions, columns=POSITION_COLUMNS)
+    sampled.insert(0, "time", t.ravel())
+    for c in [pitch_col] + [c for c in meta_cols if c in fits.columns]:
+        sampled.insert(0, c, np.repeat(fits[c].to_numpy(), n_points))
+    return sampled[~np.isnan(positions).any(axis=1)].reset_index(drop=True)
+
+
+def simplify_mask(positions, starts, ends, tolerance):
+    """모든 투구를 한꺼번에 Ramer–Douglas–Peucker 단순화한 결과 (남길 점 True)
+
+    각 구간(남긴 두 점 사이)에서 선분과 가장 먼 점이 tolerance 보다 멀면 그 점을 남기는 과정을
+    모든 투구 · 모든 구간에 대해 동시에 반복한다. 투구의 첫 점과 마지막 점은 항상 남긴다.
+    """
+    n = len(positions)
+    keep = np.zeros(n, dtype=bool)
+    keep[starts] = True
+    keep[ends - 1] = True
+    if n == 0:
+        return keep
+
+    while True:
+        kept = np.flatnonzero(keep)
+        seg = np.searchsorted(kept, np.arange(n), side="right") - 1
+        a = positions[kept[seg]]
+        b = positions[kept[np.minimum(seg + 1, len(kept) - 1)]]
+
+        # 점과 선분 AB 사이 거리
+        ab = b - a
+        length2 = np.einsum("ij,ij->i", ab, ab)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.clip(np.einsum("ij,ij->i", positions - a, ab) / length2, 0, 1)
+        t = np.where(length2 > 0, t, 0)
+        distance = np.linalg.norm(positions - (a + ab * t[:, None]), axis=1)
+        distance[keep | np.isnan(distance)] = 0
+
+        # 구간별 최대 거리 점 중 허용 오차를 넘는 것만 추가
+        seg_max = np.maximum.reduceat(distance, kept)
+        candidates = np.flatnonzero((distance > tolerance) & (distance == seg_max[seg]))
+        if len(candidates) == 0:
+            return keep
+        _, first = np.unique(seg[candidates], return_index=True)
+        keep[candidates[first]] = True
+
+
+def trajectory_traces(df, colors, pitch_col="pitch_id", type_col="pitch_type", label_cols=("zone",), width=4, plate_y=PLATE_Y, keep=None, extended=None):
+    """구종별 Scatter3d 트레이스 (투구 사이는 NaN 으로 끊고 익스텐션 선을 이어 붙임)
+
+    df 는 투구 번호 순서대로 정렬되어 있어야 한다. customdata 에 투구 번호와 label_cols 값을 담는다.
+    keep(simplify_mask 결과)을 주면 익스텐션은 원본 샘플로 계산하고 선은 남긴 점만 그린다.
+    extended: 투구별 익스텐션 끝점 (투구 수, 3). 없거나 NaN 이면 마지막 두 샘플로 연장.
+    """
+    positions = df[POSITION_COLUMNS].to_numpy(dtype=float)
+    starts, ends = pitch_bounds(df[pitch_col].to_numpy())
+    two_point = extend_to_plate(positions, starts, ends, plate_y)
+    if extended is None:
+        extended = two_point
+    else:
+        # 이미 plate_y 를 지난 투구는 연장하지 않음 (마지막 두 점 연장과 같은 조건)
+        extended = np.where(np.isnan(two_point[:, :1]), np.nan, np.where(np.isnan(extended), two_point, extended))
+    if keep is not None:
+        keep = np.asarray(keep, dtype=bool)
+        df = df[keep]
+        positions = positions[keep]
+        starts, ends = pitch_bounds(df[pitch_col].to_numpy())
+    n_pitches = len(starts)
+
+    # 출력 배열: 각 투구 뒤에 [익스텐션 끝점, NaN] 두 칸을 끼워 넣음
+    ordinal = np.repeat(np.arange(n_pitches), ends - starts)
+    out_len = len(positions) + 2 * n_pitches
+    out = np.full((out_len, 3), np.nan)
+    out[np.arange(len(positions)) + 2 * ordinal] = positions
+    ext_pos = ends + 2 * np.arange(n_pitches)
+    out[ext_pos] = np.where(np.isnan(extended), positions[ends - 1], extended)
+
+    # 출력 행별 투구 순번과 구종
+    out_pitch = np.repeat(np.arange(n_pitches), ends - starts + 2)
+    pitch_types = df[type_col].to_numpy()[starts]
+    pitch_numbers = df[pitch_col].to_numpy()[starts]
+    labels = [df[c].to_numpy()[starts] for c in label_cols]
+    customdata = np.column_stack([pitch_numbers] + labels)[out_pitch] if n_pitches else np.zeros((0, 1 + len(label_cols)))
+
+    hover = "투구 #%{customdata[0]}" + "".join(f"<br>{c}: %{{customdata[{i + 1}]}}" for i, c in enumerate(label_cols))
+    traces = []
+    for pitch_type in pd.unique(pitch_types):
+        rows = np.flatnonzero(pitch_types[out_pitch] == pitch_type)
+        traces.append(go.Scatter3d(
+            x=out[rows, 0],
+            y=out[rows, 1],
+            z=out[rows, 2],
+            customdata=customdata[rows],
+            mode="lines",
+            line=dict(width=width, color=colors.get(pitch_type, "gray")),  # 구종별 선 색상 적용
+            name=f"{pitch_type} ({int((pitch_types == pitch_type).sum())})",
+            legendgroup=str(pitch_type),
+            connectgaps=False,
+            hovertemplate=hover + f"<extra>{pitch_type}</extra>",
+        ))
+    return traces
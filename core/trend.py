@@ -0,0 +1,37 @@
+"""15일 간격 구종별 트렌드"""
+import plotly.express as px
+
+from core.timing import timed
+
+TREND_VARIABLES = ["RelSpeed", "SpinRate", "회전효율", "InducedVertBreak", "HorzBreak", "RelHeight", "RelSide", "Extension"]
+
+
+# 변수별 반올림 자릿수 (릴리스 높이 · 사이드 · 익스텐션은 m → cm 로 바꾼 뒤)
+TREND_DIGITS = dict(RelSpeed=0, SpinRate=0, 회전효율=0, InducedVertBreak=1, HorzBreak=1, RelHeight=0, RelSide=0, Extension=0)
+CM_COLUMNS = ["RelHeight", "RelSide", "Extension"]
+
+
+@timed("트렌드 집계")
+def trend_table(df):
+    """15일 간격 × 구종 평균 (릴리스 높이 · 사이드 · 익스텐션은 cm)"""
+    df = df.assign(**{'15_day_interval': df['Date'].dt.to_period('15D').dt.start_time})
+    aggregated = df.groupby(['15_day_interval', '구종']).agg(**{column: (column, 'mean') for column in TREND_VARIABLES})
+    aggregated[CM_COLUMNS] *= 100
+    return aggregated.round(TREND_DIGITS).reset_index()
+
+
+def trend_title(variable, pitcher_name=None):
+    return f"{pitcher_name}의 15일 간격 투구 유형별 {variable} 트렌드" if pitcher_name else f"15일 간격 투구 유형별 {variable} 트렌드"
+
+
+def trend_figure(aggregated_df, variable, colors, title):
+    """구종별 트렌드 선 그래프"""
+    return px.line(
+        aggregated_df,
+        x='15_day_interval',
+        y=variable,
+        color='구종',
+        color_discrete_map=colors,  # 색상 매핑 적용
+        title=title,
+        labels={"15_day_interval": "날짜", variable: variable, "구종": "구종"}
+    )
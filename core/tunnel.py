@@ -0,0 +1,124 @@
+"""피칭 터널링
+
+투구별 등가속도 모델 계수로 모든 투구를 같은 y 격자(홈플레이트에서 TUNNEL_STEP 간격)에서 다시 샘플링한 뒤,
+두 궤적의 (x, z) 간격이 처음 TUNNEL_WIDTH 를 넘는 지점을 분리 지점으로 본다.
+격자는 투구마다 첫 샘플(y0) 아래만 쓰므로, 쌍의 비교는 두 궤적이 모두 추적된 min(y0) 부근에서 시작한다.
+구종 평균 궤적 쌍과 연속 투구 쌍 모두 (쌍 수, 격자 수, 2) 배열 연산 한 번으로 계산한다.
+"""
+import numpy as np
+import pandas as pd
+
+from core.trajectory import FIT_COLUMNS, PLATE_Y, position_at_time, time_at_y
+
+TUNNEL_STEP = 25  # 다시 샘플링할 y 간격 (cm)
+TUNNEL_WIDTH = 15  # 두 궤적이 이 간격(cm)을 넘으면 분리된 것으로 봄
+
+TUNNEL_COLUMNS = ["release_gap", "plate_gap", "split_y", "split_to_plate", "tunnel_length"]
+
+
+def tunnel_grid(fits, step=TUNNEL_STEP):
+    """계수 표의 가장 먼 첫 샘플 y 부터 홈플레이트까지 내려가는 y 격자 (홈플레이트 기준 step 간격)"""
+    top = np.nanmax(fits["y0"].to_numpy(dtype=float), initial=PLATE_Y)
+    return PLATE_Y + step * np.arange(int((top - PLATE_Y) // step), -1, -1, dtype=float)
+
+
+def resample_fits(fits, y_grid):
+    """계수 표 → 각 y 위치를 지날 때의 (x, z) (투구 수, 격자 수, 2)
+
+    첫 샘플보다 릴리스 쪽(추적 전) 격자와 도달하지 못하는 격자는 NaN
+    """
+    coefficients = fits[FIT_COLUMNS].to_numpy(dtype=float)
+    positions = position_at_time(coefficients, time_at_y(coefficients, y_grid))[..., [0, 2]]
+    positions[y_grid[None, :] > coefficients[:, 3:4]] = np.nan
+    return positions
+
+
+def divergence(a, b, y_grid, width=TUNNEL_WIDTH):
+    """궤적 쌍 (쌍 수, 격자 수, 2) 두 배열 → 간격 · 분리 지점 지표 딕셔너리 (쌍마다 한 값)
+
+    쌍마다 두 궤적이 모두 값이 있는 첫 격자(릴리스 쪽)부터 비교한다.
+    release_gap: 그 첫 격자의 간격, split_y: 간격이 처음 width 를 넘는 y (끝까지 안 넘으면 NaN)
+    split_to_plate: 분리 지점에서 홈플레이트까지 거리, tunnel_length: 첫 격자부터 같이 간 거리
+    """
+    gap = np.linalg.norm(a - b, axis=-1)  # (쌍 수, 격자 수), 어느 한쪽이 NaN 이면 NaN
+    tracked = ~np.isnan(gap)
+    first = tracked.argmax(axis=1)
+    rows = np.arange(len(gap))
+    start_y = np.where(tracked.any(axis=1), y_grid[first], np.nan)
+    with np.errstate(invalid="ignore"):
+        apart = gap > width
+    split = apart.any(axis=1)
+    split_y = np.where(split, y_grid[apart.argmax(axis=1)], np.nan)
+    return dict(
+        release_gap=gap[rows, first].round(1),
+        plate_gap=gap[:, -1].round(1),
+        split_y=split_y,
+        split_to_plate=split_y - y_grid[-1],
+        tunnel_length=np.where(split, start_y - split_y, start_y - y_grid[-1]),
+    )
+
+
+def _same_key_pairs(keys, max_offset):
+    """키 순으로 정렬된 행에서 같은 키끼리의 모든 (i, j), i < j 쌍"""
+    first, second = [], []
+    for offset in range(1, max_offset + 1):
+        i = np.flatnonzero(keys[:-offset] == keys[offset:])
+        first.append(i)
+        second.append(i + offset)
+    if not first:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def type_tunnels(fits, by=("pitcher", "date"), type_col="pitch_type", step=TUNNEL_STEP, width=TUNNEL_WIDTH):
+    """by 조합(투수 · 날짜 또는 시즌)마다 구종 평균 궤적의 모든 구종 쌍 터널링 지표"""
+    by = list(by)
+    fits = fits.dropna(subset=by + [type_col])
+    y_grid = tunnel_grid(fits, step)
+    paths = resample_fits(fits, y_grid)
+
+    # (by + 구종) 별 평균 궤적 (그 구종의 모든 투구가 추적된 격자만)
+    group_codes, groups = pd.factorize(pd.MultiIndex.from_frame(fits[by + [type_col]]), sort=True)
+    n_groups = len(groups)
+    valid = ~np.isnan(paths)
+    sums = np.zeros((n_groups,) + paths.shape[1:])
+    counts = np.zeros((n_groups,) + paths.shape[1:])
+    np.add.at(sums, group_codes, np.where(valid, paths, 0))
+    np.add.at(counts, group_codes, valid)
+    sizes = np.bincount(group_codes, minlength=n_groups)
+    with np.errstate(invalid="ignore"):
+        means = np.where(counts == sizes[:, None, None], sums / counts, np.nan)
+
+    # 같은 by 조합 안의 구종 쌍 (정렬되어 있으므로 이웃한 행끼리 비교)
+    group_frame = pd.DataFrame(list(groups), columns=by + [type_col])
+    key_codes = pd.MultiIndex.from_frame(group_frame[by]).factorize()[0] if n_groups else np.zeros(0, dtype=int)
+    max_types = int(np.bincount(key_codes).max()) if n_groups else 0
+    i, j = _same_key_pairs(key_codes, max_types - 1)
+
+    table = group_frame.iloc[i][by].reset_index(drop=True)
+    table["type_a"] = group_frame[type_col].to_numpy()[i]
+    table["type_b"] = group_frame[type_col].to_numpy()[j]
+    table["n_a"] = sizes[i]
+    table["n_b"] = sizes[j]
+    for name, values in divergence(means[i], means[j], y_grid, width).items():
+        table[name] = values
+    return table
+
+
+def consecutive_tunnels(fits, by=("pitcher", "date"), pitch_col="pitch_id", type_col="pitch_type", step=TUNNEL_STEP, width=TUNNEL_WIDTH):
+    """같은 투수 · 날짜 안에서 연이어 던진 모든 투구 쌍의 터널링 지표 (투구 번호 순서 기준)"""
+    by = list(by)
+    ordered = fits.dropna(subset=by).sort_values(by + [pitch_col], kind="stable")
+    y_grid = tunnel_grid(ordered, step)
+    paths = resample_fits(ordered, y_grid)
+    key_codes = pd.MultiIndex.from_frame(ordered[by]).factorize()[0] if len(ordered) else np.zeros(0, dtype=int)
+    i, j = _same_key_pairs(key_codes, 1)
+
+    table = ordered.iloc[i][by].reset_index(drop=True)
+    table["pitch_a"] = ordered[pitch_col].to_numpy()[i]
+    table["pitch_b"] = ordered[pitch_col].to_numpy()[j]
+    table["type_a"] = ordered[type_col].to_numpy()[i]
+    table["type_b"] = ordered[type_col].to_numpy()[j]
+    for name, values in divergence(paths[i], paths[j], y_grid, width).items():
+        table[name] = values
+    return table
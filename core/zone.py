@@ -0,0 +1,181 @@
+"""존(구역)별 히트맵 엔진
+
+투구 위치를 한 번만 숫자 배열로 꺼내 두고, 격자별 구역 번호는 np.searchsorted 로,
+지표는 np.bincount 로 한 번에 집계한다. 지표를 바꿔도 다시 계산하지 않고,
+격자를 바꿔도 원본 데이터프레임을 다시 훑지 않는다.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# 스트라이크 존 (포수 시점, cm)
+ZONE_X = (-23, 23)
+ZONE_Z = (46, 105)
+
+# 데이터 종류별 컬럼 매핑 (호크아이 위치는 m 단위라 cm 로 변환)
+SCHEMAS = {
+    "PTS": dict(x="PTS_location_X", z="PTS_location_Z", call="PitchCall", exit_speed="PTS_ExitSpeed", scale=1),
+    "호크아이": dict(x="PlateLocSide", z="PlateLocHeight", call="심판콜", exit_speed="ExitSpeed", scale=100),
+}
+
+# 스윙으로 보는 판정 (헛스윙, 파울, 인플레이)
+SWING_CALLS = ["S", "F", "H"]
+
+METRICS = {
+    "투구수": "투구수",
+    "스트라이크 비율": "스트라이크 비율 (%)",
+    "헛스윙률": "헛스윙률 (스윙 대비 %)",
+    "평균 타구속도": "Exit Speed (km/h)",
+}
+
+
+def make_grid(nx, nz, ring=0):
+    """스트라이크 존을 nx × nz 로 나눈 격자. ring(cm) > 0 이면 바깥에 체이스 구역 4개를 붙인다."""
+    zone_x_edges = np.linspace(ZONE_X[0], ZONE_X[1], nx + 1)
+    zone_z_edges = np.linspace(ZONE_Z[0], ZONE_Z[1], nz + 1)
+    x_edges, z_edges = zone_x_edges, zone_z_edges
+    n_regions = nx * nz
+
+    if ring:
+        # 체이스 구역이 존 중심에서 나뉘도록 중심선을 경계에 추가 (안쪽 칸이 둘로 나뉘어도 같은 구역으로 묶임)
+        z_center = np.mean(ZONE_Z)
+        x_edges = np.unique(np.concatenate([[ZONE_X[0] - ring, 0, ZONE_X[1] + ring], zone_x_edges]))
+        z_edges = np.unique(np.concatenate([[ZONE_Z[0] - ring, z_center, ZONE_Z[1] + ring], zone_z_edges]))
+        n_regions += 4
+
+    # 각 칸 중심이 속한 존 번호 (존 밖이면 좌하/우하/좌상/우상 체이스 구역)
+    x_mid = (x_edges[:-1] + x_edges[1:]) / 2
+    z_mid = (z_edges[:-1] + z_edges[1:]) / 2
+    ix = np.searchsorted(zone_x_edges, x_mid) - 1
+    iz = np.searchsorted(zone_z_edges, z_mid) - 1
+    inner = ((ix >= 0) & (ix < nx))[None, :] & ((iz >= 0) & (iz < nz))[:, None]
+    quadrant = (x_mid > 0)[None, :].astype(int) + 2 * (z_mid > np.mean(ZONE_Z))[:, None].astype(int)
+    regions = np.where(inner, iz[:, None] * nx + ix[None, :], nx * nz + quadrant).ravel()
+
+    return dict(
+        x_edges=x_edges, z_edges=z_edges, shape=(len(z_edges) - 1, len(x_edges) - 1), zone_shape=(nz, nx),
+        regions=regions, n_regions=n_regions,
+    )
+
+
+GRIDS = {
+    "3x3": make_grid(3, 3),
+    "5x5": make_grid(5, 5),
+    "3x3 + 체이스": make_grid(3, 3, ring=20),
+}
+
+
+def prepare_zone_arrays(df, schema):
+    """히트맵 집계에 필요한 값만 numpy 배열로 추출 (데이터프레임은 여기서 한 번만 읽음)"""
+    s = SCHEMAS[schema]
+    call = df[s["call"]]
+    exit_speed = pd.to_numeric(df[s["exit_speed"]], errors="coerce").to_numpy(dtype=float)
+    is_hit = (call == "H").to_numpy()
+
+    return dict(
+        x=pd.to_numeric(df[s["x"]], errors="coerce").to_numpy(dtype=float) * s["scale"],
+        z=pd.to_numeric(df[s["z"]], errors="coerce").to_numpy(dtype=float) * s["scale"],
+        has_call=call.notna().to_numpy(),
+        is_strike=(call.notna() & (call != "B")).to_numpy(),
+        is_whiff=(call == "S").to_numpy(),
+        is_swing=call.isin(SWING_CALLS).to_numpy(),
+        has_exit_speed=is_hit & ~np.isnan(exit_speed),
+        exit_speed=np.where(is_hit, np.nan_to_num(exit_speed), 0.0),
+    )
+
+
+def bin_cells(arrays, grid):
+    """각 투구의 격자 칸 번호 (격자 밖이거나 위치가 없으면 -1). 경계는 pd.cut 과 같이 (a, b]"""
+    x_edges, z_edges = grid["x_edges"], grid["z_edges"]
+    nz, nx = grid["shape"]
+
+    ix = np.searchsorted(x_edges, arrays["x"], side="left") - 1
+    iz = np.searchsorted(z_edges, arrays["z"], side="left") - 1
+    inside = (ix >= 0) & (ix < nx) & (iz >= 0) & (iz < nz)
+    return np.where(inside, iz * nx + ix, -1)
+
+
+def zone_stats(arrays, grid):
+    """모든 지표를 격자 모양 행렬로 계산 (행: 아래 → 위, 열: 왼쪽 → 오른쪽)"""
+    cells = bin_cells(arrays, grid)
+    valid = cells >= 0
+    region = grid["regions"][cells[valid]]
+    n = grid["n_regions"]
+
+    def total(key=None):
+        return np.bincount(region, weights=arrays[key][valid] if key else None, minlength=n)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        per_region = {
+            "투구수": total(),
+            "스트라이크 비율": np.round(total("is_strike") / total("has_call") * 100, 1),
+            "헛스윙률": np.round(total("is_whiff") / total("is_swing") * 100, 1),
+            "평균 타구속도": np.round(total("exit_speed") / total("has_exit_speed"), 1),
+        }
+
+    return {name: values[grid["regions"]].reshape(grid["shape"]) for name, values in per_region.items()}
+
+
+def zone_table(stats, grid):
+    """히트맵 행렬을 구역별 표로 변환 (다운로드용, 구역마다 한 줄)
+
+    여러 칸으로 된 구역(체이스 구역, 중심선으로 나뉜 안쪽 칸)은 한 줄로 묶고 범위는 칸들을 감싸는 범위로 적는다.
+    x_bin · z_bin 은 존 안쪽 구역의 위치 (체이스 구역은 빈 값)
+    """
+    nz, nx = grid["shape"]
+    zone_nz, zone_nx = grid["zone_shape"]
+    iz, ix = np.divmod(np.arange(nx * nz), nx)
+    x_edges, z_edges = grid["x_edges"], grid["z_edges"]
+    cells = pd.DataFrame({
+        "region": grid["regions"],
+        "x_low": x_edges[ix], "x_high": x_edges[ix + 1], "z_low": z_edges[iz], "z_high": z_edges[iz + 1],
+    })
+    bounds = cells.groupby("region").agg(
+        x_low=("x_low", "min"), x_high=("x_high", "max"), z_low=("z_low", "min"), z_high=("z_high", "max")
+    )
+    regions = bounds.index.to_numpy()
+    first = np.unique(grid["regions"], return_index=True)[1]  # 구역마다 첫 칸 (칸 값은 구역 값과 같음)
+    inner = regions < zone_nx * zone_nz
+
+    table = pd.DataFrame({
+        "구역": regions + 1,
+        "x_bin": pd.Series(regions % zone_nx + 1).where(inner).astype("Int64"),
+        "z_bin": pd.Series(regions // zone_nx + 1).where(inner).astype("Int64"),
+        "x_범위": [f"{low:.0f}~{high:.0f}" for low, high in zip(bounds["x_low"], bounds["x_high"])],
+        "z_범위": [f"{low:.0f}~{high:.0f}" for low, high in zip(bounds["z_low"], bounds["z_high"])],
+    })
+    for name, matrix in stats.items():
+        table[name] = matrix.ravel()[first]
+    return table
+
+
+def zone_heatmap_figure(stats, grid, metric, title=""):
+    """실제 좌표(cm) 위에 그린 존 히트맵"""
+    matrix = stats[metric]
+    fmt = "{:.0f}" if metric == "투구수" else "{:.1f}"
+    fig = go.Figure(go.Heatmap(
+        x=grid["x_edges"],
+        y=grid["z_edges"],
+        z=matrix,
+        text=[["" if np.isnan(v) else fmt.format(v) for v in row] for row in matrix],
+        texttemplate="%{text}",
+        colorscale="RdYlBu",
+        colorbar=dict(title=METRICS[metric]),
+        hoverongaps=False,
+    ))
+
+    # 스트라이크 존 외곽선
+    fig.add_shape(
+        type="rect",
+        x0=ZONE_X[0], x1=ZONE_X[1],
+        y0=ZONE_Z[0], y1=ZONE_Z[1],
+        line=dict(color="black", width=3),
+    )
+    fig.update_layout(
+        title=title,
+        width=700,
+        height=700,
+        xaxis=dict(title="좌우 위치 (cm)", range=[-70, 70], showgrid=False, zeroline=False),
+        yaxis=dict(title="상하 위치 (cm)", range=[-10, 150], showgrid=False, zeroline=False),
+    )
+    return fig
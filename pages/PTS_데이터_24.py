@@ -1,33 +1,153 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import io
+from core.figcache import cached_figure
+from core.export import EXPORT_FORMATS, cached_export, export_name
+from core.figures import PITCH_COLORS, location_scatter, location_facets
+from core.density import precompute_density, pitch_type_density, density_figure
+from core.filter import PTS_COLUMNS, apply_filters, prune_seasons, search_names
+from core.loader import concat_seasons, discover_seasons, load_pts_season, season_range
+from core.summary import pts_summary
+from core.cache import cached_stage
+from core.jobs import JOBS, job_result
+from core.timing import begin_page, end_page
 
+# 데이터 컬러 설정
+cols = PITCH_COLORS
+
+@cached_stage("시즌 찾기", cache_name="seasons")
+def load_seasons():
+    # 파일이 있는 시즌 목록 (데이터는 읽지 않음)
+    return discover_seasons("pts")
+
+@cached_stage("데이터 불러오기", cache_name="pts")  # 같은 데이터를 쓰는 페이지끼리 한 벌만 저장 (시즌별)
+def load_season(season):
+    return load_pts_season(season)
+
+def load_density_cache(seasons):
+    # 선택한 시즌의 투수 × 구종 로케이션 밀도 맵을 미리 계산 (백그라운드 작업)
+    return precompute_density(concat_seasons(load_season, seasons), 'Pitcher', 'PitchType', 'PTS_location_X', 'PTS_location_Z')
+
+def build_all_pitch_figure(data):
+    # 전체 데이터 산점도 생성 (WebGL)
+    fig_all = location_scatter(
+        data,
+        "PTS_location_X",
+        "PTS_location_Z",
+        "PitchType",
+        cols,  # 색상 매핑
+        order=list(cols.keys()),
+        marker_size=10,
+        opacity=0.7,  # 점의 투명도 설정
+    )
 
+    # 산점도 레이아웃 조정
+    fig_all.update_layout(
+        title=" ",
+        width=800,  # 산점도 너비
+        height=750,  # 산점도 높이
+        margin=dict(l=10, r=10, t=30, b=10),  # 여백 조정
+        xaxis=dict(
+            range=[-70, 70],  # X축 범위 고정
+            showgrid=False,
+            zeroline=False,
+            visible=True,
+            title="PTS Location X"
+        ),
+        yaxis=dict(
+            range=[-10, 150],  # Y축 범위 고정
+            showgrid=False,
+            zeroline=False,
+            visible=True,
+            title="PTS Location Z"
+        )
+    )
+    return fig_all
+
+@cached_stage("요약 표")
+def cached_summary(data):
+    # 구종별 기본 분석 값
+    return pts_summary(data, order=list(cols.keys()))
+
+@st.fragment
+def summary_section(data):
+    # 기본 분석 (가장 먼저 표시)
+    st.subheader("기본 분석 값")
+    st.dataframe(cached_summary(data))
+
+@st.fragment
+def plot_section(data, pitcher_name):
+    # 로케이션 그림 (보기 선택을 바꾸면 이 조각만 다시 실행)
+    views = st.multiselect(
+        "표시할 그림", ["전 구종", "구종별 밀도", "구종별"], default=["전 구종", "구종별 밀도", "구종별"], key="pts_plot_views"
+    )
+    location_columns = ["PTS_location_X", "PTS_location_Z", "PitchType"]
 
-# 데이터 컬러 설정
-cols = {
-    "직구": "#4C569B",
-    "투심": "#B590C3",
-    "커터": "#45B0D8",
-    "슬라": "firebrick",
-    "스위퍼": "#00FF00",
-    "체인": "#FBE25E",
-    "포크": "MediumSeaGreen",
-    "커브": "orange",
-    "너클": "black"
-}
-
-@st.cache_data
-def load_new_data():
-    data_url = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/PTS%202024%20%EC%A0%84%EA%B2%BD%EA%B8%B0_%EC%88%98%EC%A0%95.xlsx"
-    df = pd.read_excel(data_url)
-    return df
-
-df = load_new_data()
-
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-df = df.dropna(subset=['Date'])
+    if "전 구종" in views:
+        fig_all = cached_figure(
+            "pts_location_all", data, {"colors": cols},
+            lambda: build_all_pitch_figure(data),
+            columns=location_columns
+        )
+
+        # 전체 구종 산점도 출력
+        st.subheader("전 구종 로케이션_포수시점")
+        st.plotly_chart(fig_all)
+        st.markdown(f"**{len(data)} Pitches**")
+        st.markdown("---")  # 구분선 추가
+
+    if "구종별 밀도" in views:
+        # 구종별 로케이션 밀도 (투구가 많아도 읽을 수 있도록 스무딩)
+        st.subheader("구종별 로케이션 밀도_포수시점")
+        st.plotly_chart(cached_figure(
+            "pts_density", data, {"colors": cols},
+            lambda: density_figure(
+                pitch_type_density(
+                    data, 'PitchType', 'PTS_location_X', 'PTS_location_Z',
+                    cache=density_cache, pitcher=pitcher_name if pitcher_name != "전체" else None
+                ),
+                cols, order=list(cols.keys())
+            ),
+            columns=location_columns
+        ))
+        st.markdown("---")  # 구분선 추가
+
+    if "구종별" in views:
+        # 구종별 산점도 (한 번에 나눠서 축과 스트라이크 존을 공유하는 하나의 그림으로)
+        st.subheader("구종별 로케이션")
+        fig = cached_figure(
+            "pts_location_facets", data, {"colors": cols},
+            lambda: location_facets(
+                data,
+                "PTS_location_X",
+                "PTS_location_Z",
+                "PitchType",
+                cols,
+                order=list(cols.keys()),
+            ),
+            columns=location_columns
+        )
+        st.plotly_chart(fig)
+        st.markdown("---")  # 구분선 추가
+
+@st.fragment
+def export_section(data, filter_spec):
+    # 데이터 다운로드 (파일은 다운로드를 누를 때 만들고, 같은 필터 조건이면 저장된 파일 사용)
+    st.subheader("결과 다운로드")
+    export_format = st.radio(
+        "파일 형식", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f]["label"], horizontal=True, key="pts_export_format"
+    )
+    file_name, mime = export_name(['Filtered Data'], export_format, 'filtered_data')
+    st.download_button(
+        label=f"필터링된 데이터 다운로드 ({EXPORT_FORMATS[export_format]['label']})",
+        data=lambda: cached_export(filter_spec, export_format, lambda: {'Filtered Data': data}, 'filtered_data'),
+        file_name=file_name,
+        mime=mime,
+        on_click="ignore"
+    )
+
+# 시즌 목록 (실행 단계별 시간 측정 시작, 관리자는 사이드바에서 확인)
+begin_page("PTS 24")
+seasons = load_seasons()
 
 # 앱 제목
 
@@ -60,7 +180,7 @@ st.subheader("데이터 필터링")
 st.subheader("연도 및 달 필터")
 col1, col2 = st.columns(2)
 with col1:
-    unique_years = sorted(df['Date'].dt.year.unique())
+    unique_years = seasons  # 데이터를 읽기 전에 파일 목록의 시즌으로
     selected_year = st.selectbox("연도 선택", ["전체"] + unique_years)
 with col2:
     unique_months = ["전체"] + list(range(1, 13))
@@ -72,12 +192,21 @@ with col2:
 st.subheader("날짜 범위 필터")
 date_range = st.date_input(
     "날짜 범위",
-    [df['Date'].min(), df['Date'].max()],  # 기본값 설정
+    list(season_range(seasons)),  # 기본값 설정 (시즌 전체)
     key="date_range",
     label_visibility="visible",
     help="필터링에 사용할 시작 날짜와 종료 날짜를 선택하세요."
 )
 
+# 데이터 로드: 연도 · 기간에 걸리는 시즌 파일만 읽음
+selected_seasons = prune_seasons(seasons, dict(year=selected_year, date_range=date_range))
+if not selected_seasons:
+    st.warning("선택한 연도 · 기간에 해당하는 시즌 데이터가 없습니다.")
+    st.stop()
+df = concat_seasons(load_season, selected_seasons)
+# 밀도 맵 미리 계산은 백그라운드 작업으로 (끝나기 전에는 선택한 투구로 바로 계산)
+density_cache = job_result(JOBS.submit("밀도 맵 미리 계산", load_density_cache, selected_seasons), show=False)
+
 # -------------------
 # 투수 및 타자 검색 및 유형 필터 (3x2 레이아웃)
 # -------------------
@@ -92,10 +221,7 @@ with col1:
 
     # 투수 이름 검색
     pitcher_search_query = st.text_input("투수 이름 검색", "").strip()
-    if pitcher_search_query:
-        pitcher_suggestions = [name for name in sorted(df['Pitcher'].unique()) if pitcher_search_query.lower() in name.lower()]
-    else:
-        pitcher_suggestions = sorted(df['Pitcher'].unique())
+    pitcher_suggestions = search_names(df['Pitcher'], pitcher_search_query)
 
     # 투수 이름 선택
     if pitcher_suggestions:
@@ -111,10 +237,7 @@ with col2:
 
     # 타자 이름 검색
     batter_search_query = st.text_input("타자 이름 검색", "").strip()
-    if batter_search_query:
-        batter_suggestions = [name for name in sorted(df['Batter'].unique()) if batter_search_query.lower() in name.lower()]
-    else:
-        batter_suggestions = sorted(df['Batter'].unique())
+    batter_suggestions = search_names(df['Batter'], batter_search_query)
 
     # 타자 이름 선택
     if batter_suggestions:
@@ -151,207 +274,35 @@ if st.button("검색 실행"):
 
 # 필터 적용 로직
 if st.session_state.filter_applied:
-    filtered_df = df.copy()
-
-    # 날짜 필터
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_df = filtered_df[(filtered_df['Date'] >= pd.Timestamp(start_date)) & (filtered_df['Date'] <= pd.Timestamp(end_date))]
-
-    if selected_year != "전체":
-        filtered_df = filtered_df[filtered_df['Date'].dt.year == selected_year]
-    if selected_month != "전체":
-        filtered_df = filtered_df[filtered_df['Date'].dt.month == selected_month]
-
-    # 투수 이름 필터
-    if pitcher_name != "전체":  # 투수 이름이 선택된 경우에만 필터 적용
-        filtered_df = filtered_df[filtered_df['Pitcher'] == pitcher_name]
-
-    # 타자 이름 필터
-    if Batter_name != "전체":
-        filtered_df = filtered_df[filtered_df['Batter'] == Batter_name]
-
-    # 구종 필터
-    if pitch_type:
-        filtered_df = filtered_df[filtered_df['PitchType'].isin(pitch_type)]
-
-    # 주자 상황 필터
-    if runner_status == "주자무":
-        filtered_df = filtered_df[filtered_df['Runners'] == "주자무"]
-    elif runner_status == "나머지":
-        filtered_df = filtered_df[filtered_df['Runners'] != "주자무"]
-
-    # 볼 카운트 필터
-    if selected_bcount != "전체":
-        filtered_df = filtered_df[filtered_df['BCOUNT'] == selected_bcount]
-    # 타격결과 필터 적용
-    if selected_hit_results:
-        filtered_df = filtered_df[filtered_df['Result'].astype(str).isin(selected_hit_results)]
-
-    # 타자 유형 필터
-    if selected_batter_side != "전체":
-        filtered_df = filtered_df[filtered_df['BatterSide'] == selected_batter_side]
-
-    # 투수 유형 필터
-    if selected_pitcher_throw != "전체":
-        filtered_df = filtered_df[filtered_df['PitcherThrows'] == selected_pitcher_throw]
-
-    # PTS 데이터 전처리
-    filtered_df['PTS_location_X'] = pd.to_numeric(filtered_df['PTS_location_X'], errors='coerce')
-    filtered_df['PTS_location_Z'] = pd.to_numeric(filtered_df['PTS_location_Z'], errors='coerce')
-    filtered_df = filtered_df.dropna(subset=['PTS_location_X', 'PTS_location_Z'])
-
-    # 기본 분석
-    if not filtered_df.empty:
-        st.subheader("기본 분석 값")
-        analysis = filtered_df.groupby('PitchType').agg(
-            투구수=('PitchType', 'count'),
-            투구_비율=('PitchType', lambda x: round((x.count() / len(filtered_df)) * 100, 1)),
-            스트라이크_비율=('PitchCall', lambda x: round((x[x != 'B'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),
-            구속_평균=('PTS_Speed', lambda x: round(x.mean(), 0)),
-            구속_최고=('PTS_Speed', lambda x: round(x.max(), 0)),
-            헛스윙S_비율=('PitchCall', lambda x: round((x[x == 'S'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),  # S 비율
-            루킹S_비율=('PitchCall', lambda x: round((x[x == 'T'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),  # T 비율
-            파울_비율=('PitchCall', lambda x: round((x[x == 'F'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),  # F 비율
-            안타_비율=('PitchCall', lambda x: round((x[x == 'H'].count() / x.count()) * 100, 1) if x.count() > 0 else 0) , 
-            볼_비율=('PitchCall', lambda x: round((x[x == 'B'].count() / x.count()) * 100, 1) if x.count() > 0 else 0)  # B 비율
-            
-        ).reset_index()
-        analysis['PitchType'] = pd.Categorical(analysis['PitchType'], categories=list(cols.keys()), ordered=True)
-        analysis = analysis.sort_values('PitchType')
-
-        st.dataframe(analysis)
-
-
-    # 전체 데이터 산점도 생성
-    if not filtered_df.empty:
-        # 전체 데이터 투구 수 계산
-        total_pitch_count = len(filtered_df)
-
-        # 전체 데이터 산점도 생성
-        fig_all = px.scatter(
-            filtered_df,
-            x="PTS_location_X",
-            y="PTS_location_Z",
-            color="PitchType",
-            title=" ",
-            color_discrete_map=cols,  # 색상 매핑
-            category_orders={"PitchType": list(cols.keys())},
-            labels={"PTS_location_X": "좌우 위치 (cm)", "PTS_location_Z": "상하 위치 (cm)"},
-            opacity=0.7,  # 점의 투명도 설정
-        )
-        fig_all.update_traces(marker=dict(size=10))
-
-        # 산점도 레이아웃 조정
-        fig_all.update_layout(
-            width=800,  # 산점도 너비
-            height=750,  # 산점도 높이
-            margin=dict(l=10, r=10, t=30, b=10),  # 여백 조정
-            xaxis=dict(
-                range=[-70, 70],  # X축 범위 고정
-                showgrid=False,
-                zeroline=False,
-                visible=True,
-                title="PTS Location X"
-            ),
-            yaxis=dict(
-                range=[-10, 150],  # Y축 범위 고정
-                showgrid=False,
-                zeroline=False,
-                visible=True,
-                title="PTS Location Z"
-            )
-        )
-
-        # 스트라이크 존 추가
-        fig_all.add_shape(
-            type="rect",
-            x0=-23, x1=23,
-            y0=46, y1=105,
-            line=dict(color="gray", width=2),
-            fillcolor="lightgray", opacity=0.2
-        )
-
-        # 전체 구종 산점도 출력
-        st.subheader("전 구종 로케이션_포수시점")
-        st.plotly_chart(fig_all)
-        st.markdown(f"**{total_pitch_count} Pitches**")
-        st.markdown("---")  # 구분선 추가
-
-    # 구종별 데이터 추출
-    pitch_types = filtered_df['PitchType'].unique()
-
-    # 구종별 산점도 생성
-    for pitch_type in pitch_types:
-        # 구종별 데이터 필터링
-        filtered_data = filtered_df[filtered_df['PitchType'] == pitch_type]
-
-        # 구종별 투구 수 및 비율 계산
-        pitch_count = len(filtered_data)
-        pitch_percentage = (pitch_count / len(filtered_df)) * 100  # 필터링된 데이터 기준으로 비율 계산
-
-        # 산점도 생성
-        fig = px.scatter(
-            filtered_data,
-            x="PTS_location_X",
-            y="PTS_location_Z",
-            color="PitchType",
-            title="",
-            color_discrete_map=cols,  # 색상 매핑
-            category_orders={"PitchType": list(cols.keys())},
-            labels={"PTS_location_X": "좌우 위치 (cm)", "PTS_location_Z": "상하 위치 (cm)"},
-            opacity=0.7,  # 점의 투명도 설정
-        )
-        fig.update_traces(marker=dict(size=15))
-
-        # 산점도 레이아웃 조정
-        fig.update_layout(
-            width=400,  # 산점도 너비
-            height=400,  # 산점도 높이
-            margin=dict(l=10, r=10, t=10, b=10),  # 여백 최소화
-            xaxis=dict(
-                range=[-70, 70],  # X축 범위 고정
-                showgrid=False,
-                zeroline=False,
-                visible=False
-            ),
-            yaxis=dict(
-                range=[0, 150],  # Y축 범위 고정
-                showgrid=False,
-                zeroline=False,
-                visible=False
-            )
-        )
-
-        # 스트라이크 존 추가
-        fig.add_shape(
-            type="rect",
-            x0=-23, x1=23,
-            y0=46, y1=105,
-            line=dict(color="gray", width=2),
-            fillcolor="lightgray", opacity=0.2
-        )
-
-        # 산점도 출력
-        st.subheader(f"{pitch_type}")  # 구종 이름 표시
-        st.plotly_chart(fig)
+    # 필터 조건 (내보내기 캐시 키로도 사용)
+    filter_spec = dict(
+        page="pts_24", date_range=date_range, year=selected_year, month=selected_month,
+        pitcher=pitcher_name, batter=Batter_name, pitch_types=pitch_type, runner=runner_status,
+        bcount=selected_bcount, hit_results=selected_hit_results, batter_side=selected_batter_side,
+        pitcher_throw=selected_pitcher_throw
+    )
+    filtered_df = apply_filters(df, filter_spec, PTS_COLUMNS)
 
-        # 구종 정보 표시
-        st.markdown(f"**{pitch_count} Pitches** ({pitch_percentage:.1f}%)")
-        st.markdown("---")  # 구분선 추가
+    # PTS 데이터 전처리 (위치 없는 투구 제외)
+    filtered_df = filtered_df.assign(
+        PTS_location_X=pd.to_numeric(filtered_df['PTS_location_X'], errors='coerce'),
+        PTS_location_Z=pd.to_numeric(filtered_df['PTS_location_Z'], errors='coerce'),
+    ).dropna(subset=['PTS_location_X', 'PTS_location_Z'])
 
-    # 데이터 다운로드
-    st.subheader("결과 다운로드")
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        filtered_df.to_excel(writer, index=False, sheet_name='Filtered Data')
-    output.seek(0)
+    # 결과 영역: 요약 표 → 그림 → 다운로드 순서로 자리를 먼저 잡고 각 조각을 따로 그림
+    summary_area = st.container()
+    plots_area = st.container()
+    export_area = st.container()
 
-    st.download_button(
-        label="필터링된 데이터 다운로드 (Excel)",
-        data=output,
-        file_name='filtered_data.xlsx',
-        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    if not filtered_df.empty:
+        with summary_area:
+            summary_section(filtered_df)
+        with plots_area:
+            plot_section(filtered_df, pitcher_name)
+    with export_area:
+        export_section(filtered_df, filter_spec)
 else:
     st.info("필터링 조건에 맞는 데이터가 없습니다. 조건을 수정해주세요.")
+
+# 실행 단계별 시간 측정 종료
+end_page()
@@ -1,33 +1,33 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import numpy as np
-import io
-
-# 데이터 컬러 설정
-cols = {
-    "직구": "#4C569B",
-    "투심": "#B590C3",
-    "커터": "#45B0D8",
-    "슬라": "firebrick",
-    "스위퍼": "#00FF00",
-    "체인": "#FBE25E",
-    "포크": "MediumSeaGreen",
-    "커브": "orange",
-    "너클": "black"
-}
-
-@st.cache_data
-def load_new_data():
-    data_url = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/PTS%202024%20%EC%A0%84%EA%B2%BD%EA%B8%B0_%EC%88%98%EC%A0%95.xlsx"
-    df = pd.read_excel(data_url)
-    return df
-
-df = load_new_data()
-
-# 날짜 처리
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-df = df.dropna(subset=['Date'])
+from core.filter import PTS_COLUMNS, apply_filters, prune_seasons, search_names
+from core.loader import concat_seasons, discover_seasons, load_pts_season, season_range
+from core.zone import GRIDS, METRICS, prepare_zone_arrays, zone_stats, zone_table, zone_heatmap_figure
+from core.export import EXPORT_FORMATS, cached_export, export_name
+from core.cache import cached_stage
+from core.timing import begin_page, end_page
+
+@cached_stage("시즌 찾기", cache_name="seasons")
+def load_seasons():
+    # 파일이 있는 시즌 목록 (데이터는 읽지 않음)
+    return discover_seasons("pts")
+
+@cached_stage("데이터 불러오기", cache_name="pts")  # 같은 데이터를 쓰는 페이지끼리 한 벌만 저장 (시즌별)
+def load_season(season):
+    return load_pts_season(season)
+
+# 존 캐시는 필터 조건 + 시즌 목록으로 찾음 (필터된 데이터를 매번 해시하지 않음)
+@cached_stage("존 위치 배열", key=lambda spec, seasons, filtered_df: (spec, seasons))
+def cached_zone_arrays(spec, seasons, filtered_df):
+    return prepare_zone_arrays(filtered_df, "PTS")
+
+@cached_stage("존 집계", key=lambda spec, seasons, arrays, grid_name: (spec, seasons, grid_name))
+def cached_zone_stats(spec, seasons, arrays, grid_name):
+    return zone_stats(arrays, GRIDS[grid_name])
+
+# 시즌 목록 (실행 단계별 시간 측정 시작, 관리자는 사이드바에서 확인)
+begin_page("PTS 존별 타구속도 24")
+seasons = load_seasons()
 
 # 페이지 설정 (스크립트의 맨 위에 위치해야 함)
 st.set_page_config(
@@ -58,7 +58,7 @@ st.subheader("데이터 필터링")
 st.subheader("연도 및 월 필터")
 col1, col2 = st.columns(2)
 with col1:
-    unique_years = sorted(df['Date'].dt.year.unique())
+    unique_years = seasons  # 데이터를 읽기 전에 파일 목록의 시즌으로
     selected_year = st.selectbox("연도 선택", ["전체"] + unique_years)
 with col2:
     unique_months = ["전체"] + list(range(1, 13))
@@ -70,12 +70,19 @@ with col2:
 st.subheader("날짜 범위 필터")
 date_range = st.date_input(
     "날짜 범위",
-    [df['Date'].min(), df['Date'].max()],  # 기본값 설정
+    list(season_range(seasons)),  # 기본값 설정 (시즌 전체)
     key="date_range",
     label_visibility="visible",
     help="필터링에 사용할 시작 날짜와 종료 날짜를 선택하세요."
 )
 
+# 데이터 로드: 연도 · 기간에 걸리는 시즌 파일만 읽음
+selected_seasons = prune_seasons(seasons, dict(year=selected_year, date_range=date_range))
+if not selected_seasons:
+    st.warning("선택한 연도 · 기간에 해당하는 시즌 데이터가 없습니다.")
+    st.stop()
+df = concat_seasons(load_season, selected_seasons)
+
 # -------------------
 # 투수 이름 검색 및 선택 가로 배치
 # -------------------
@@ -83,13 +90,7 @@ st.subheader("투수 이름 필터")
 col3, col4 = st.columns(2)
 with col3:
     pitcher_search_query = st.text_input("투수 이름 검색", "").strip()
-    if pitcher_search_query:
-        pitcher_suggestions = [
-            name for name in sorted(df['Pitcher'].unique()) 
-            if pitcher_search_query.lower() in name.lower()
-        ]
-    else:
-        pitcher_suggestions = sorted(df['Pitcher'].unique())
+    pitcher_suggestions = search_names(df['Pitcher'], pitcher_search_query)
 with col4:
     if pitcher_suggestions:
         pitcher_name = st.selectbox("투수 이름 선택", pitcher_suggestions)
@@ -112,86 +113,53 @@ if st.button("검색 실행"):
 
 # 필터 적용 로직
 if st.session_state.filter_applied:
-    filtered_df = df.copy()
-
-    # 날짜 필터
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_df = filtered_df[(filtered_df['Date'] >= pd.Timestamp(start_date)) & (filtered_df['Date'] <= pd.Timestamp(end_date))]
-
-    if selected_year != "전체":
-        filtered_df = filtered_df[filtered_df['Date'].dt.year == selected_year]
-    if selected_month != "전체":
-        filtered_df = filtered_df[filtered_df['Date'].dt.month == selected_month]
-
-    # 투수 이름 필터
-    if pitcher_name:
-        filtered_df = filtered_df[filtered_df['Pitcher'] == pitcher_name]
-
-    # 구종 필터
-    if pitch_type:
-        filtered_df = filtered_df[filtered_df['PitchType'].isin(pitch_type)]
-
-    # PTS 데이터 전처리
-    filtered_df['PTS_location_X'] = pd.to_numeric(filtered_df['PTS_location_X'], errors='coerce')
-    filtered_df['PTS_location_Z'] = pd.to_numeric(filtered_df['PTS_location_Z'], errors='coerce')
-    filtered_df = filtered_df.dropna(subset=['PTS_location_X', 'PTS_location_Z'])
-
-    if not filtered_df.empty:
-        # H 데이터 필터링
-        filtered_h = filtered_df[filtered_df['PitchCall'] == 'H']
-        filtered_h = filtered_h.dropna(subset=['PTS_location_X', 'PTS_location_Z', 'PTS_ExitSpeed'])
-
-        if filtered_h.empty:
-            st.warning("H 데이터가 없습니다.")
-        else:
-            st.subheader("타구 데이터 분석 및 시각화")
-
-            # 스트라이크 존 9등분
-            strike_zone_x_edges = np.linspace(-23, 23, 4)  # X축 경계선
-            strike_zone_z_edges = np.linspace(46, 105, 4)  # Z축 경계선
-
-            # 9등분 영역 계산
-            filtered_h['x_bin'] = pd.cut(filtered_h['PTS_location_X'], bins=strike_zone_x_edges, labels=[1, 2, 3])
-            filtered_h['z_bin'] = pd.cut(filtered_h['PTS_location_Z'], bins=strike_zone_z_edges, labels=[1, 2, 3])
-
-            # 평균 ExitSpeed 계산
-            heatmap_data = (
-                filtered_h.groupby(['x_bin', 'z_bin'])
-                .agg({'PTS_ExitSpeed': 'mean'})
-                .reset_index()
-            )
-            heatmap_data['PTS_ExitSpeed'] = heatmap_data['PTS_ExitSpeed'].round(1)  # 소수점 한 자리로 반올림
-
-            # 9등분 시각화
-            heatmap_pivot = heatmap_data.pivot(index='z_bin', columns='x_bin', values='PTS_ExitSpeed')
-            fig_heatmap = px.imshow(
-                heatmap_pivot,
-                text_auto=True,
-                labels=dict(x="X 구역 (좌우)", y="Z 구역 (상하)", color="Exit Speed (km/h)"),
-                title="스트라이크 존 9등분 Exit Speed 평균",
-                color_continuous_scale="RdYlBu",
-            )
-            fig_heatmap.update_layout(
-                xaxis=dict(side="top"),  # X축 레이블을 위쪽으로 배치
-                width=700,
-                height=700,
-            )
-
-            st.plotly_chart(fig_heatmap)
-
-            # 스트라이크 존 내 각 영역 데이터 다운로드
-            output_heatmap = io.BytesIO()
-            with pd.ExcelWriter(output_heatmap, engine='xlsxwriter') as writer:
-                heatmap_data.to_excel(writer, index=False, sheet_name='Heatmap Data')
-            output_heatmap.seek(0)
-
-            st.download_button(
-                label="H 데이터 Heatmap 다운로드 (Excel)",
-                data=output_heatmap,
-                file_name='heatmap_data.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-
-
-
+    # 필터 조건 (내보내기 캐시 키로도 사용)
+    filter_spec = dict(
+        page="pts_zone_24", date_range=date_range, year=selected_year, month=selected_month,
+        pitcher=pitcher_name, pitch_types=pitch_type
+    )
+    filtered_df = apply_filters(df, filter_spec, PTS_COLUMNS)
+
+    # PTS 데이터 전처리 (위치 없는 투구 제외)
+    filtered_df = filtered_df.assign(
+        PTS_location_X=pd.to_numeric(filtered_df['PTS_location_X'], errors='coerce'),
+        PTS_location_Z=pd.to_numeric(filtered_df['PTS_location_Z'], errors='coerce'),
+    ).dropna(subset=['PTS_location_X', 'PTS_location_Z'])
+
+    if filtered_df.empty:
+        st.warning("조건에 맞는 데이터가 없습니다.")
+    else:
+        st.subheader("존별 데이터 분석 및 시각화")
+
+        # 격자 및 지표 선택 (바꿔도 필터링된 데이터를 다시 집계하지 않음)
+        col5, col6 = st.columns(2)
+        with col5:
+            grid_name = st.selectbox("구역 나누기", list(GRIDS.keys()))
+        with col6:
+            metric = st.selectbox("지표 선택", list(METRICS.keys()), index=list(METRICS.keys()).index("평균 타구속도"))
+
+        arrays = cached_zone_arrays(filter_spec, selected_seasons, filtered_df)
+        stats = cached_zone_stats(filter_spec, selected_seasons, arrays, grid_name)
+
+        fig_heatmap = zone_heatmap_figure(stats, GRIDS[grid_name], metric, title=f"스트라이크 존 {grid_name} {metric}")
+        st.plotly_chart(fig_heatmap)
+
+        # 구역별 데이터 다운로드
+        heatmap_data = zone_table(stats, GRIDS[grid_name])
+        export_format = st.radio(
+            "파일 형식", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f]["label"], horizontal=True, key="zone_export_format"
+        )
+        export_spec = dict(filter_spec, grid=grid_name)
+        file_name, mime = export_name(['Heatmap Data'], export_format, 'heatmap_data')
+
+        # 파일은 다운로드를 누를 때 만들고, 같은 조건이면 저장된 파일 사용
+        st.download_button(
+            label=f"존별 Heatmap 다운로드 ({EXPORT_FORMATS[export_format]['label']})",
+            data=lambda: cached_export(export_spec, export_format, lambda: {'Heatmap Data': heatmap_data}, 'heatmap_data'),
+            file_name=file_name,
+            mime=mime,
+            on_click="ignore"
+        )
+
+# 실행 단계별 시간 측정 종료
+end_page()
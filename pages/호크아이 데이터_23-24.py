@@ -1,41 +1,50 @@
-import pandas as pd
 import streamlit as st
-import plotly.express as px
-import io
+from core.figcache import cached_figure
+from core.export import EXPORT_FORMATS, cached_export, export_name
+from core.figures import PITCH_COLORS, RASTER_THRESHOLD, movement_figure, plate_location_figure
+from core.filter import HAWKEYE_COLUMNS, apply_filters, prune_seasons, search_names
+from core.loader import concat_seasons, discover_seasons, load_hawkeye_season, load_trajectory_metrics, season_range
+from core.summary import pitch_summary
+from core.density import precompute_density, pitch_type_density, density_figure
+from core.zone import GRIDS, METRICS, prepare_zone_arrays, zone_stats, zone_heatmap_figure
+from core.cache import cached_stage
+from core.jobs import JOBS, job_result
+from core.reclassify import ORIGINAL_COLUMN, reclassify_summary
+from core.timing import begin_page, end_page
 
 # 데이터 컬러 설정
-cols = {
-    "직구": "#4C569B",
-    "투심": "#B590C3",
-    "커터": "#45B0D8",
-    "슬라": "firebrick",
-    "스위퍼": "#00FF00",
-    "체인": "#FBE25E",
-    "포크": "MediumSeaGreen",
-    "커브": "orange",
-    "너클": "black"
-}
-
-@st.cache_data
-def load_data():
-    # 데이터 URL
-    data_url1 = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/24_merged_data_%EC%88%98%EC%A0%95.xlsx"
-    data_url2 = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/23_merged_data_%EC%88%98%EC%A0%95.xlsx"
-    
-    # 데이터 로드
-    df1 = pd.read_excel(data_url1)
-    df2 = pd.read_excel(data_url2)
-    
-    # 날짜 형식 통일
-    df1['Date'] = pd.to_datetime(df1['Date'])
-    df2['Date'] = pd.to_datetime(df2['Date'])
-    
-    # 병합
-    combined_df = pd.concat([df1, df2], ignore_index=True)
-    return combined_df
-
-# 데이터 로드
-df = load_data()
+cols = PITCH_COLORS
+
+@cached_stage("시즌 찾기", cache_name="seasons")
+def load_seasons():
+    # 파일이 있는 시즌 목록 (데이터는 읽지 않음)
+    return discover_seasons("hawkeye")
+
+@cached_stage("궤적 지표 계산", cache_name="trajectory_metrics")
+def load_metrics():
+    return load_trajectory_metrics()
+
+@cached_stage("데이터 불러오기", cache_name="hawkeye")  # 같은 데이터를 쓰는 페이지끼리 한 벌만 저장 (시즌별)
+def load_season(season):
+    # 한 시즌 데이터 + 투구별 궤적 지표 연결
+    return load_hawkeye_season(season, load_metrics())
+
+# 존 캐시는 필터 조건 + 시즌 목록으로 찾음 (필터된 데이터를 매번 해시하지 않음)
+@cached_stage("존 위치 배열", key=lambda spec, seasons, filtered_df: (spec, seasons))
+def cached_zone_arrays(spec, seasons, filtered_df):
+    return prepare_zone_arrays(filtered_df, "호크아이")
+
+@cached_stage("존 집계", key=lambda spec, seasons, arrays, grid_name: (spec, seasons, grid_name))
+def cached_zone_stats(spec, seasons, arrays, grid_name):
+    return zone_stats(arrays, GRIDS[grid_name])
+
+def load_density_cache(seasons):
+    # 선택한 시즌의 투수 × 구종 로케이션 밀도 맵을 미리 계산 (백그라운드 작업)
+    return precompute_density(concat_seasons(load_season, seasons), '투수', '구종', 'PlateLocSide', 'PlateLocHeight', scale=100)
+
+# 시즌 목록 (실행 단계별 시간 측정 시작, 관리자는 사이드바에서 확인)
+begin_page("호크아이 23-24")
+seasons = load_seasons()
 
 
 st.set_page_config(
@@ -66,7 +75,7 @@ st.subheader("데이터 필터링")
 st.subheader("연도 및 달 ")
 col1, col2 = st.columns(2)
 with col1:
-    unique_years = ["전체"] + sorted(df['Date'].dt.year.unique())
+    unique_years = ["전체"] + seasons  # 데이터를 읽기 전에 파일 목록의 시즌으로
     selected_year = st.selectbox("연도 선택", unique_years)
 with col2:
     unique_months = ["전체"] + list(range(1, 13))
@@ -78,12 +87,21 @@ with col2:
 st.subheader("기간 선택")
 date_range = st.date_input(
     "날짜 범위",
-    [df['Date'].min(), df['Date'].max()],  # 기본값 설정
+    list(season_range(seasons)),  # 기본값 설정 (시즌 전체)
     key="date_range",
     label_visibility="visible",
     help="필터링에 사용할 시작 날짜와 종료 날짜를 선택하세요."
 )
 
+# 데이터 로드: 연도 · 기간에 걸리는 시즌 파일만 읽음
+selected_seasons = prune_seasons(seasons, dict(year=selected_year, date_range=date_range))
+if not selected_seasons:
+    st.warning("선택한 연도 · 기간에 해당하는 시즌 데이터가 없습니다.")
+    st.stop()
+df = concat_seasons(load_season, selected_seasons)
+# 밀도 맵 미리 계산은 백그라운드 작업으로 (끝나기 전에는 선택한 투구로 바로 계산)
+density_cache = job_result(JOBS.submit("밀도 맵 미리 계산", load_density_cache, selected_seasons), show=False)
+
 # -------------------
 # 투수 이름 검색 및 선택 가로 배치
 # -------------------
@@ -91,13 +109,10 @@ st.subheader("투수 이름")
 col3, col4 = st.columns(2)
 with col3:
     search_query = st.text_input("투수 이름 검색", "").strip()
-    if search_query:
-        suggestions = [name for name in sorted(df['투수'].unique()) if search_query.lower() in name.lower()]
-    else:
-        suggestions = sorted(df['투수'].unique())
+    suggestions = search_names(df['투수'], search_query)
 with col4:
     if suggestions:
-        pitcher_name = st.selectbox("투수 이름 선택", suggestions)
+        pitcher_name = st.selectbox("투수 이름 선택", suggestions + ["전체"])
     else:
         pitcher_name = None
 
@@ -115,6 +130,10 @@ with col6:
 # 구종 및 타격결과 필터 가로 배치
 # -------------------
 st.subheader("구종 및 타격결과")
+# 구종은 불러올 때 투수별로 다시 분류한 값 (원래 표기로도 볼 수 있음)
+use_original_types = st.checkbox("원래 구종 표기로 보기", value=False, help="재분류 전 기록된 구종 표기를 사용합니다.")
+if use_original_types and ORIGINAL_COLUMN in df.columns:
+    df = df.assign(구종=df[ORIGINAL_COLUMN])
 col7, col8 = st.columns(2)
 with col7:
     pitch_type = st.multiselect("구종 선택", df['구종'].unique())
@@ -128,67 +147,31 @@ if st.button("검색 실행"):
 
 # 필터 적용 로직
 if st.session_state.filter_applied:
-    filtered_df = df.copy()
-
-    # 날짜 필터 적용
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_df = filtered_df[(filtered_df['Date'] >= pd.Timestamp(start_date)) & (filtered_df['Date'] <= pd.Timestamp(end_date))]
-    
-    if selected_year != "전체":
-        filtered_df = filtered_df[filtered_df['Date'].dt.year == selected_year]
-    if selected_month != "전체":
-        filtered_df = filtered_df[filtered_df['Date'].dt.month == selected_month]
-
-    # 투수 이름 필터 적용
-    if pitcher_name:
-        filtered_df = filtered_df[filtered_df['투수'] == pitcher_name]
-
-    # 타자 유형 필터 적용
-    if batter_type == "우타":
-        filtered_df = filtered_df[filtered_df['타자유형'] == "우타"]
-    elif batter_type == "좌타":
-        filtered_df = filtered_df[filtered_df['타자유형'] == "좌타"]
-
-    # 구종 필터 적용
-    if pitch_type:
-        filtered_df = filtered_df[filtered_df['구종'].isin(pitch_type)]
-
-    # 주자 상황 필터 적용
-    if runner_status == "주자무":
-        filtered_df = filtered_df[filtered_df['주자'] == "주자무"]
-    elif runner_status == "나머지":
-        filtered_df = filtered_df[filtered_df['주자'] != "주자무"]
-
-    # 타격결과 필터 적용
-    if selected_hit_results:
-        filtered_df = filtered_df[filtered_df['타격결과'].astype(str).isin(selected_hit_results)]
+    # 필터 조건 (내보내기 캐시 키로도 사용)
+    filter_spec = dict(
+        page="hawkeye_23_24", year=selected_year, month=selected_month, date_range=date_range,
+        pitcher=pitcher_name, batter_side=batter_type, runner=runner_status, pitch_types=pitch_type,
+        hit_results=selected_hit_results, original_types=use_original_types
+    )
+    filtered_df = apply_filters(df, filter_spec, HAWKEYE_COLUMNS)
 
     # 기본 분석
     if not filtered_df.empty:
         st.subheader("기본 분석 값")
-        analysis = filtered_df.groupby('구종').agg(
-            투구수=('구종', 'count'),
-            투구_비율=('구종', lambda x: round((x.count() / len(filtered_df)) * 100, 1)),
-            스트라이크_비율=('심판콜', lambda x: round((x[x != 'B'].count() / x.count()) * 100, 1) if x.count() > 0 else 0),
-            구속_평균=('RelSpeed', lambda x: round(x.mean(), 0)),
-            구속_최고=('RelSpeed', lambda x: round(x.max(), 0)),
-            회전수=('SpinRate', lambda x: round(x.mean(), 0)),
-            회전효율=('회전효율', lambda x: round(x.mean(), 0)),
-            Tilt=('Tilt', lambda x: x.mode().iloc[0] if not x.mode().empty else None),
-            수직무브_평균=('InducedVertBreak', lambda x: round(x.mean(), 1)),
-            수평무브_평균=('HorzBreak', lambda x: round(x.mean(), 1)),
-            타구속도=('ExitSpeed', lambda x: round(x.mean(), 0)),
-            높이=('RelHeight', lambda x: round(x.mean() * 100, 0)),
-            사이드=('RelSide', lambda x: round(x.mean() * 100, 0)),
-            익스텐션=('Extension', lambda x: round(x.mean() * 100, 0))
-        ).reset_index()
-
-        analysis['구종'] = pd.Categorical(analysis['구종'], categories=list(cols.keys()), ordered=True)
-        analysis = analysis.sort_values('구종')
+        analysis = pitch_summary(filtered_df, order=list(cols.keys()))
 
         st.dataframe(analysis)
 
+        # 구종 재분류 내역 (원래 표기 → 바뀐 구종, 이상치로 표시된 투구 수)
+        if not use_original_types and ORIGINAL_COLUMN in filtered_df.columns:
+            changed, outliers = reclassify_summary(filtered_df)
+            with st.expander(f"구종 재분류 내역 (변경 {int(changed['투구수'].sum())}구, 이상치 {int(outliers['이상치'].sum())}구)"):
+                st.dataframe(changed, hide_index=True)
+                st.dataframe(outliers, hide_index=True)
+
+        # 존 히트맵용 위치 배열 (m 단위 원본에서 추출)
+        zone_arrays = cached_zone_arrays(filter_spec, selected_seasons, filtered_df)
+
         # 구종별 플레이트 위치 시각화
         st.subheader("구종별 플레이트 위치")
         if "PlateLocSide" in filtered_df.columns and "PlateLocHeight" in filtered_df.columns:
@@ -197,72 +180,63 @@ if st.session_state.filter_applied:
 
 
 
-        fig = px.scatter(
-            filtered_df,
-            x="PlateLocSide",
-            y="PlateLocHeight",
-            color="구종",
-            title="구종별 플레이트 위치",
-            color_discrete_map=cols,
-            category_orders={"구종": list(cols.keys())},
-            labels={"PlateLocSide": "좌우 위치 (cm)", "PlateLocHeight": "상하 위치 (cm)"}
-        )
-        fig.update_traces(marker=dict(size=15))
-        fig.update_layout(
-            width=700,  # 가로 크기
-            height=800,  # 세로 크기
-            xaxis=dict(range=[-70, 70], showline=False),
-            yaxis=dict(range=[-10, 150], showline=False)
-        )
-        fig.add_shape(
-            type="rect",
-            x0=-23, x1=23,
-            y0=46, y1=105,
-            line=dict(color="gray", width=2),
-            fillcolor="lightgray", opacity=0.2
+        fig = cached_figure(
+            "hawkeye_location", filtered_df, {"colors": cols, "raster_threshold": RASTER_THRESHOLD},
+            lambda: plate_location_figure(filtered_df, cols),
+            columns=["PlateLocSide", "PlateLocHeight", "구종"]
         )
         st.plotly_chart(fig)
 
+        # 구종별 로케이션 밀도 (위에서 cm 로 변환된 값 사용)
+        st.subheader("구종별 로케이션 밀도")
+        st.plotly_chart(cached_figure(
+            "hawkeye_density", filtered_df, {"colors": cols},
+            lambda: density_figure(
+                pitch_type_density(
+                    filtered_df, '구종', 'PlateLocSide', 'PlateLocHeight',
+                    cache=None if use_original_types else density_cache, pitcher=pitcher_name if pitcher_name != "전체" else None
+                ),
+                cols, order=list(cols.keys())
+            ),
+            columns=["PlateLocSide", "PlateLocHeight", "구종"]
+        ))
+
+        # 존별 히트맵
+        st.subheader("존별 히트맵")
+        col9, col10 = st.columns(2)
+        with col9:
+            grid_name = st.selectbox("구역 나누기", list(GRIDS.keys()))
+        with col10:
+            metric = st.selectbox("지표 선택", list(METRICS.keys()))
+        zone_fig = zone_heatmap_figure(cached_zone_stats(filter_spec, selected_seasons, zone_arrays, grid_name), GRIDS[grid_name], metric, title=f"{grid_name} {metric}")
+        st.plotly_chart(zone_fig)
+
         # 구종별 수평/수직 무브먼트 시각화
         st.subheader("구종별 수평/수직 무브먼트")
-        fig = px.scatter(
-            filtered_df,
-            x="HorzBreak",
-            y="InducedVertBreak",
-            color="구종",
-            hover_data=["투수", "구속"],
-            title="구종별 수평/수직 무브먼트",
-            color_discrete_map=cols,
-            category_orders={"구종": list(cols.keys())},
-            labels={"HorzBreak": "수평 무브 (cm)", "InducedVertBreak": "수직 무브 (cm)"}
+        fig = cached_figure(
+            "hawkeye_movement", filtered_df, {"colors": cols},
+            lambda: movement_figure(filtered_df, cols),
+            columns=["HorzBreak", "InducedVertBreak", "구종", "투수", "구속"]
         )
-        fig.update_traces(marker=dict(size=9))
-        fig.update_layout(
-            xaxis=dict(range=[-70, 70], linecolor="black"),
-            yaxis=dict(range=[-70, 70], linecolor="black")
-        )
-        fig.update_layout(
-            width=800,  # 가로 크기
-            height=750,  # 세로 크기
-            xaxis=dict(range=[-70, 70], linecolor="black"),
-            yaxis=dict(range=[-70, 70], linecolor="black")
-)
-        fig.add_shape(type="line", x0=0, y0=-70, x1=0, y1=70, line=dict(color="black", width=2))
-        fig.add_shape(type="line", x0=-70, y0=0, x1=70, y1=0, line=dict(color="black", width=2))
         st.plotly_chart(fig)
 
         # 데이터 다운로드
         st.subheader("결과 다운로드")
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            filtered_df.to_excel(writer, index=False, sheet_name='Filtered Data')
-        output.seek(0)
+        export_format = st.radio(
+            "파일 형식", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f]["label"], horizontal=True, key="hawkeye_export_format"
+        )
+        file_name, mime = export_name(['Filtered Data'], export_format, 'filtered_data')
 
+        # 파일은 다운로드를 누를 때 만들고, 같은 필터 조건이면 저장된 파일 사용
         st.download_button(
-            label="필터링된 데이터 다운로드 (Excel)",
-            data=output,
-            file_name='filtered_data.xlsx',
-            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            label=f"필터링된 데이터 다운로드 ({EXPORT_FORMATS[export_format]['label']})",
+            data=lambda: cached_export(filter_spec, export_format, lambda: {'Filtered Data': filtered_df}, 'filtered_data'),
+            file_name=file_name,
+            mime=mime,
+            on_click="ignore"
         )
     else:
-        st.info("필터링 조건에 맞는 데이터가 없습니다. 조건을 수정해주세요.")
\ No newline at end of file
+        st.info("필터링 조건에 맞는 데이터가 없습니다. 조건을 수정해주세요.")
+
+# 실행 단계별 시간 측정 종료
+end_page()
@@ -4,26 +4,47 @@ import json
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-
-cols = {
-    "직구": "#4C569B",
-    "투심": "#B590C3",
-    "커터": "#45B0D8",
-    "슬라": "firebrick",
-    "스위퍼": "#00FF00",
-    "체인": "#FBE25E",
-    "포크": "MediumSeaGreen",
-    "커브": "orange",
-    "너클": "black"
-}
-
-@st.cache_data
-def load_new_data():
-    data_url = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/combined_pitch_data.xlsx"
-    df = pd.read_excel(data_url)
-    return df
-
-df = load_new_data()
+from core.trajectory import (
+    APPROACH_COLUMNS, FIT_COLUMNS, PLATE_Y, POSITION_COLUMNS, approach_metrics, fit_table, pitch_bounds,
+    position_at_y, sample_fits, simplify_mask, trajectory_traces
+)
+from core.figures import PITCH_COLORS
+from core.loader import load_trajectories
+from core.tunnel import TUNNEL_WIDTH, consecutive_tunnels, type_tunnels
+from core.cache import cached_stage
+from core.jobs import JOBS, job_result, report_progress
+from core.timing import begin_page, end_page
+
+cols = PITCH_COLORS
+
+@cached_stage("궤적 불러오기")
+def load_trajectory_data():
+    # 날짜 변환, cm 단위 변환, time 값이 줄어드는 순간마다 새 투구 번호(group)
+    return load_trajectories()
+
+@cached_stage("궤적 단순화")
+def load_simplify_mask(tolerance):
+    # 전체 궤적을 한 번에 단순화 (허용 오차별로 한 번만 계산)
+    df = load_trajectory_data()
+    starts, ends = pitch_bounds(df['group'].to_numpy())
+    return simplify_mask(df[POSITION_COLUMNS].to_numpy(dtype=float), starts, ends, tolerance)
+
+def load_pitch_fits():
+    # 모든 투구의 등가속도 모델 계수(9개)와 진입각 · 홈플레이트 통과 지표를 한 번에 계산 (백그라운드 작업)
+    fits = fit_table(load_trajectory_data(), pitch_col='group').set_index('group', drop=False)
+    return fits.join(approach_metrics(fits))
+
+def load_tunnels(fits, date, basis):
+    # 선택한 투수의 구종 쌍 / 연속 투구 쌍 터널링 지표 (fits: 그 투수의 경기 또는 시즌 계수, basis: 'date' 또는 'season', 백그라운드 작업)
+    fits = fits.reset_index(drop=True)
+    fits['season'] = fits['date'].dt.year
+    type_pairs = type_tunnels(fits, by=('pitcher', basis))
+    report_progress(0.5, "구종 쌍 계산 완료")
+    return type_pairs, consecutive_tunnels(fits[fits['date'] == date], by=('pitcher', 'date'), pitch_col='group')
+
+# 실행 단계별 시간 측정 시작 (관리자는 사이드바에서 확인)
+begin_page("호크아이 피칭궤적")
+df = load_trajectory_data()
 
 st.set_page_config(
     page_title="24 호크아이 투수 피칭 궤적",
@@ -38,22 +59,15 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.error("로그인 후에 이 페이지를 이용할 수 있습니다.")
     st.stop()
 
+# 모델 계산은 백그라운드 작업으로 (여러 사람이 동시에 열어도 한 번만 계산, 끝날 때까지는 측정 샘플만 표시)
+fits_job = JOBS.submit("궤적 모델 계산", load_pitch_fits)
+
 st.title("24 투수 피칭 궤적")
 
 # 세션 상태 초기화
 if "filter_applied" not in st.session_state:
     st.session_state.filter_applied = False
 
-df['date'] = pd.to_datetime(df['date'], errors='coerce')
-df = df.dropna(subset=['date'])  # 날짜 없는 데이터 제거
-df['ball_pos_X'] = df['ball_pos_X'] * 100
-df['ball_pos_Y'] = df['ball_pos_Y'] * 100
-df['ball_pos_Z'] = df['ball_pos_Z'] * 100
-
-# time 값 기준으로 그룹화 (time이 줄어드는 순간 새로운 그룹 생성)
-df['time_diff'] = df['time'].diff()
-df['group'] = (df['time_diff'] < 0).cumsum()
-
 # Streamlit UI 구성
 st.title("피칭궤적 시각화")
 st.sidebar.header("Filter Options")
@@ -69,6 +83,15 @@ date_selected = st.sidebar.selectbox("Select Date", sorted(df[df['pitcher'] == p
 pitch_types_selected = st.sidebar.multiselect("Select Pitch Type(s)", df['pitch_type'].unique(), default=df['pitch_type'].unique())
 zone_selected = st.sidebar.multiselect("Select Zone(s)", df['zone'].unique(), default=df['zone'].unique())
 
+# 궤적 표시 방식 (측정 샘플 또는 투구당 9개 계수로 다시 그린 물리 모델)
+render_mode = st.sidebar.radio("궤적 표시", ["측정 샘플", "물리 모델 (9 파라미터)"])
+
+# 궤적 단순화 (허용 오차 이내로 점 수를 줄여 전송량 감소)
+simplify = st.sidebar.checkbox("궤적 단순화", value=True, disabled=render_mode != "측정 샘플")
+tolerance = st.sidebar.select_slider("허용 오차 (cm)", options=[0.1, 0.25, 0.5, 1.0, 2.0], value=0.5, disabled=not simplify)
+if simplify:
+    df['keep'] = load_simplify_mask(tolerance)
+
 # 데이터 필터링
 filtered_data = df[
     (df['pitcher'] == pitcher_selected) &
@@ -77,52 +100,28 @@ filtered_data = df[
     (df['zone'].isin(zone_selected))
 ]
 
-# 시각화 생성
-fig = go.Figure()
-
-for group in filtered_data['group'].unique():
-    group_data = filtered_data[filtered_data['group'] == group]
-    for pitch_type in group_data['pitch_type'].unique():
-        pitch_data = group_data[group_data['pitch_type'] == pitch_type]
-        
-        # 궤적 추가
-        fig.add_trace(go.Scatter3d(
-            x=pitch_data['ball_pos_X'],
-            y=pitch_data['ball_pos_Y'],
-            z=pitch_data['ball_pos_Z'],
-            mode='lines',
-            line=dict(width=4, color=cols[pitch_type]),  # 구종별 선 색상 적용
-            name=f"{pitch_type} (Group {group})",
-            legendgroup=f"{pitch_type} (Group {group})"  # 범례 그룹 지정
-        ))
-
-        # 마지막 점과 그 전 점 계산
-        if len(pitch_data) > 1:
-            last_point = pitch_data.iloc[-1]
-            second_last_point = pitch_data.iloc[-2]
-
-            # 기울기 계산
-            delta_y = last_point['ball_pos_Y'] - second_last_point['ball_pos_Y']
-            delta_x = last_point['ball_pos_X'] - second_last_point['ball_pos_X']
-            delta_z = last_point['ball_pos_Z'] - second_last_point['ball_pos_Z']
-
-            # y=150일 때 x와 z 값 계산
-            if last_point['ball_pos_Y'] > 150:
-                factor = (150 - last_point['ball_pos_Y']) / delta_y
-                extended_x = last_point['ball_pos_X'] + delta_x * factor
-                extended_z = last_point['ball_pos_Z'] + delta_z * factor
-
-                # 익스텐션 선 추가 (legendgroup 동일하게 설정)
-                fig.add_trace(go.Scatter3d(
-                    x=[last_point['ball_pos_X'], extended_x],  # x 좌표
-                    y=[last_point['ball_pos_Y'], 150],         # y 좌표
-                    z=[last_point['ball_pos_Z'], extended_z],  # z 좌표
-                    mode='lines',
-                    line=dict(color=cols[pitch_type], width=4),  # 점선 스타일
-                    name=f"{pitch_type} (Group {group})",  # 동일한 name
-                    legendgroup=f"{pitch_type} (Group {group})",  # 동일한 legendgroup
-                    showlegend=False  # 범례 표시 숨김
-                ))
+# 투구별 표시 선택 (범례 대신 투구 번호로 켜고 끄기)
+pitch_info = filtered_data.drop_duplicates('group')[['group', 'pitch_type', 'zone']]
+pitch_labels = {
+    row.group: f"#{row.group} {row.pitch_type} (Zone {row.zone})" for row in pitch_info.itertuples(index=False)
+}
+pitches_selected = st.sidebar.multiselect(
+    "Select Pitch(es)", list(pitch_labels.keys()), default=list(pitch_labels.keys()), format_func=pitch_labels.get
+)
+filtered_data = filtered_data[filtered_data['group'].isin(pitches_selected)]
+
+# 시각화 생성 (구종당 트레이스 하나, 투구 사이는 NaN 으로 구분하고 익스텐션 선 포함)
+# 모델 계산이 끝나기 전에는 진행률을 표시하고 측정 샘플만 그림 (익스텐션은 마지막 두 샘플로 연장)
+pitch_fits = job_result(fits_job)
+selected_fits = pitch_fits.loc[filtered_data['group'].unique()] if pitch_fits is not None else None
+if render_mode == "측정 샘플" or selected_fits is None:
+    # 익스텐션 끝점은 적합한 모델로 y=150 에서 계산
+    fig = go.Figure(trajectory_traces(
+        filtered_data, cols, pitch_col='group', keep=filtered_data['keep'] if simplify else None,
+        extended=position_at_y(selected_fits[FIT_COLUMNS].to_numpy(dtype=float), PLATE_Y) if selected_fits is not None else None
+    ))
+else:
+    fig = go.Figure(trajectory_traces(sample_fits(selected_fits, pitch_col='group'), cols, pitch_col='group'))
 
 # 사각형 추가 (스트라이크 존)
 x_range = [-23, 23]
@@ -183,5 +182,65 @@ fig.update_layout(
 # Streamlit에 그래프 출력
 st.plotly_chart(fig, use_container_width=True)
 
+# 홈플레이트 통과 지표 (모델 계산 작업에서 함께 구한 값, 구종별 평균)
+st.subheader("진입각 · 홈플레이트 통과 지표")
+if selected_fits is not None:
+    approach_table = selected_fits.groupby('pitch_type')[APPROACH_COLUMNS].mean().round(2).reindex(
+        [name for name in cols if name in selected_fits['pitch_type'].unique()]
+        + [name for name in selected_fits['pitch_type'].unique() if name not in cols]
+    )
+    approach_table.insert(0, '투구수', selected_fits['pitch_type'].value_counts())
+    st.dataframe(approach_table.rename(columns={
+        'VAA': '수직진입각(°)', 'HAA': '수평진입각(°)', 'PlateSpeed': '통과 구속(km/h)', 'TimeToPlate': '도달시간(s)'
+    }))
+else:
+    st.info("궤적 모델 계산이 끝나면 표시됩니다.")
+
+# 피칭 터널링 (구종 평균 궤적 쌍 / 연속 투구 쌍이 언제 갈라지는지, 모델 계산 뒤 백그라운드 작업)
+st.subheader("피칭 터널링")
+tunnel_basis = st.radio("구종 평균 기준", ["경기", "시즌"], horizontal=True)
+tunnels = None
+if pitch_fits is not None:
+    # 작업은 선택한 투수의 그 경기(또는 그 시즌) 계수로만 맡김 (다시 실행할 때 전체 계수 표를 해시하지 않음)
+    pitcher_fits = pitch_fits[pitch_fits['pitcher'] == pitcher_selected]
+    if tunnel_basis == "경기":
+        pitcher_fits = pitcher_fits[pitcher_fits['date'] == date_selected]
+    else:
+        pitcher_fits = pitcher_fits[pitcher_fits['date'].dt.year == pd.Timestamp(date_selected).year]
+    tunnels = job_result(JOBS.submit(
+        "터널링 계산", load_tunnels, pitcher_fits, date_selected, 'date' if tunnel_basis == "경기" else 'season'
+    ))
+else:
+    st.info("궤적 모델 계산이 끝나면 표시됩니다.")
+
+if tunnels is not None:
+    type_pairs, consecutive_pairs = tunnels
+    tunnel_names = {
+        'type_a': '구종 A', 'type_b': '구종 B', 'n_a': 'A 투구수', 'n_b': 'B 투구수',
+        'pitch_a': '투구 A', 'pitch_b': '투구 B',
+        'release_gap': '릴리스 간격(cm)', 'plate_gap': '홈 간격(cm)', 'split_y': '분리 지점 y(cm)',
+        'split_to_plate': '분리~홈 거리(cm)', 'tunnel_length': '같이 간 거리(cm)'
+    }
+    st.caption(f"두 궤적의 간격이 {TUNNEL_WIDTH}cm 를 넘는 첫 지점을 분리 지점으로 표시 (끝까지 안 넘으면 빈 값)")
+
+    if tunnel_basis == "경기":
+        selected_type_pairs = type_pairs[(type_pairs['pitcher'] == pitcher_selected) & (type_pairs['date'] == date_selected)]
+    else:
+        selected_type_pairs = type_pairs[
+            (type_pairs['pitcher'] == pitcher_selected) & (type_pairs['season'] == pd.Timestamp(date_selected).year)
+        ]
+    st.write("구종 평균 궤적 쌍")
+    st.dataframe(selected_type_pairs.drop(columns=['pitcher']).rename(columns=tunnel_names), hide_index=True)
+
+    selected_consecutive = consecutive_pairs[
+        (consecutive_pairs['pitcher'] == pitcher_selected) & (consecutive_pairs['date'] == date_selected)
+        & consecutive_pairs['pitch_a'].isin(pitches_selected) & consecutive_pairs['pitch_b'].isin(pitches_selected)
+    ]
+    st.write("연속 투구 쌍")
+    st.dataframe(selected_consecutive.drop(columns=['pitcher', 'date']).rename(columns=tunnel_names), hide_index=True)
+
 st.write("---")
-st.write("범례에서 보고 싶은 것만 체크하여 확인 가능_한 구종당 범례")
\ No newline at end of file
+st.write("범례에서 보고 싶은 구종만 체크하여 확인 가능_한 구종당 범례, 개별 투구는 사이드바에서 선택 (마우스를 올리면 투구 번호 표시)")
+
+# 실행 단계별 시간 측정 종료
+end_page()
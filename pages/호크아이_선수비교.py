@@ -1,41 +1,35 @@
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-import io
+from core.figcache import cached_figure
+from core.figures import PITCH_COLORS, mean_bar_figure, mean_movement_figure
+from core.filter import search_names
+from core.loader import concat_seasons, discover_seasons, load_hawkeye_season, load_trajectory_metrics
+from core.summary import movement_means, pitcher_comparison
+from core.periods import VARIABLES, custom_periods, monthly_periods, half_periods, compare_periods
+from core.cache import cached_stage
+from core.timing import begin_page, end_page
 
 # 데이터 컬러 설정
-cols = {
-    "직구": "#4C569B",
-    "투심": "#B590C3",
-    "커터": "#45B0D8",
-    "슬라": "firebrick",
-    "스위퍼": "#00FF00",
-    "체인": "#FBE25E",
-    "포크": "MediumSeaGreen",
-    "커브": "orange",
-    "너클": "black"
-}
-
-@st.cache_data
-def load_data():
-    # 데이터 URL
-    data_url1 = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/24_merged_data_%EC%88%98%EC%A0%95.xlsx"
-    data_url2 = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/23_merged_data_%EC%88%98%EC%A0%95.xlsx"
-    
-    # 데이터 로드
-    df1 = pd.read_excel(data_url1)
-    df2 = pd.read_excel(data_url2)
-    
-    # 날짜 형식 통일
-    df1['Date'] = pd.to_datetime(df1['Date'])
-    df2['Date'] = pd.to_datetime(df2['Date'])
-    
-    # 병합
-    combined_df = pd.concat([df1, df2], ignore_index=True)
-    return combined_df
-
-# 데이터 로드
-df = load_data()
+cols = PITCH_COLORS
+
+@cached_stage("시즌 찾기", cache_name="seasons")
+def load_seasons():
+    # 파일이 있는 시즌 목록 (데이터는 읽지 않음)
+    return discover_seasons("hawkeye")
+
+@cached_stage("궤적 지표 계산", cache_name="trajectory_metrics")
+def load_metrics():
+    return load_trajectory_metrics()
+
+@cached_stage("데이터 불러오기", cache_name="hawkeye")  # 같은 데이터를 쓰는 페이지끼리 한 벌만 저장 (시즌별)
+def load_season(season):
+    # 한 시즌 데이터 + 투구별 궤적 지표 연결
+    return load_hawkeye_season(season, load_metrics())
+
+# 데이터 로드 (실행 단계별 시간 측정 시작, 관리자는 사이드바에서 확인)
+begin_page("호크아이 선수비교")
+df = concat_seasons(load_season, load_seasons())  # 선수 · 기간 비교는 모든 시즌을 씀 (시즌별 캐시는 다른 페이지와 공유)
 
 st.set_page_config(
     page_title="23-24 호크아이 데이터 선수간 비교",
@@ -70,10 +64,7 @@ with tab1:
     with col1:
         # 선수 1 검색 및 선택
         search_query_1 = st.text_input("선수 1 검색", key="search_query_1").strip()
-        if search_query_1:
-            suggestions_1 = [name for name in sorted(df['투수'].unique()) if search_query_1.lower() in name.lower()]
-        else:
-            suggestions_1 = sorted(df['투수'].unique())
+        suggestions_1 = search_names(df['투수'], search_query_1)
 
         if suggestions_1:
             pitcher1 = st.selectbox("선수 1 선택", suggestions_1, key="pitcher1")
@@ -84,10 +75,7 @@ with tab1:
     with col2:
         # 선수 2 검색 및 선택
         search_query_2 = st.text_input("선수 2 검색", key="search_query_2").strip()
-        if search_query_2:
-            suggestions_2 = [name for name in sorted(df['투수'].unique()) if search_query_2.lower() in name.lower()]
-        else:
-            suggestions_2 = sorted(df['투수'].unique())
+        suggestions_2 = search_names(df['투수'], search_query_2)
 
         if suggestions_2:
             pitcher2 = st.selectbox("선수 2 선택", suggestions_2, key="pitcher2")
@@ -100,11 +88,7 @@ with tab1:
         pitch_type = st.multiselect("구종 선택", df['구종'].unique(), key="pitch_type")
 
         # 비교할 변수 선택
-        compare_variables = [
-            "구속", "회전수", "회전효율", 
-            "회전축", "수직무브먼트", "수평무브먼트", 
-            "릴리스높이", "릴리스사이드", "익스텐션"
-        ]
+        compare_variables = list(VARIABLES.keys())
         selected_variables = st.multiselect("비교할 변수 선택", compare_variables)
 
         # 검색 버튼 생성
@@ -112,21 +96,6 @@ with tab1:
             st.session_state.filter_applied = True
 
         if st.session_state.filter_applied and selected_variables:
-            # 한글 변수명과 데이터프레임 컬럼명 매핑
-            def map_variable_name(variable):
-                mapping = {
-                    "구속": "RelSpeed",
-                    "회전수": "SpinRate",
-                    "회전효율": "회전효율",
-                    "회전축": "Tilt",
-                    "수직무브먼트": "InducedVertBreak",
-                    "수평무브먼트": "HorzBreak",
-                    "릴리스높이": "RelHeight",
-                    "릴리스사이드": "RelSide",
-                    "익스텐션": "Extension"
-                }
-                return mapping.get(variable, variable)
-
             # 데이터 필터링
             pitcher1_data = df[df['투수'] == pitcher1]
             pitcher2_data = df[df['투수'] == pitcher2]
@@ -137,37 +106,17 @@ with tab1:
                 st.warning(f"선수 2 ({pitcher2})의 데이터가 존재하지 않습니다.")
 
             if not pitcher1_data.empty and not pitcher2_data.empty:
-                comparison_results = []
-                for variable in selected_variables:
-                    df_variable = map_variable_name(variable)
-
-                    # Tilt 처리
-                    if df_variable == "Tilt":
-                        pitcher1_value = pitcher1_data[df_variable].mode().iloc[0] if not pitcher1_data[df_variable].mode().empty else "N/A"
-                        pitcher2_value = pitcher2_data[df_variable].mode().iloc[0] if not pitcher2_data[df_variable].mode().empty else "N/A"
-                    else:
-                        # 평균값 계산
-                        pitcher1_value = round(pitcher1_data[df_variable].mean(), 2)
-                        pitcher2_value = round(pitcher2_data[df_variable].mean(), 2)
-
-                    # 결과 저장
-                    comparison_results.append({
-                        "변수": variable,
-                        "선수 1 평균": pitcher1_value,
-                        "선수 2 평균": pitcher2_value,
-                        "차이": abs(pitcher1_value - pitcher2_value) if df_variable != "Tilt" else "N/A"
-                    })
+                comparison_df = pitcher_comparison(
+                    pitcher1_data, pitcher2_data, {variable: VARIABLES[variable] for variable in selected_variables}
+                )
 
                 # 결과를 데이터프레임으로 표시
-                comparison_df = pd.DataFrame(comparison_results)
                 st.subheader("선수 간 변수 비교 결과")
                 st.dataframe(comparison_df)
 
                 # 여러 변수 시각화
                 for variable in selected_variables:
-                    df_variable = map_variable_name(variable)
-
-                    if df_variable == "Tilt":
+                    if VARIABLES[variable] == "Tilt":
                         st.warning(f"{variable} 변수는 시각화에 적합하지 않습니다.")
                         continue
 
@@ -180,72 +129,28 @@ with tab1:
                         ]
                     })
 
-                    fig = px.bar(
-                        combined_df,
-                        x="선수",
-                        y="평균값",
-                        title=f"{variable} 선수 간 비교 ({pitcher1} vs {pitcher2})",
-                        labels={"평균값": variable},
-                        color="평균값",
-                        color_continuous_scale="Viridis"
-                    )
-
-                    # y축 범위 조정
-                    fig.update_layout(
-                        yaxis=dict(
-                            range=[
-                                min(combined_df["평균값"]) - 15,
-                                max(combined_df["평균값"]) + 15
-                            ],
-                            title=variable
-                        ),
-                        xaxis=dict(title="선수"),
-                        title_font=dict(size=20),
-                        width=800,
-                        height=600
+                    title = f"{variable} 선수 간 비교 ({pitcher1} vs {pitcher2})"
+                    fig = cached_figure(
+                        "compare_bar", combined_df, {"x": "선수", "variable": variable, "title": title, "pad": 15},
+                        lambda: mean_bar_figure(combined_df, "선수", variable, title, pad=15)
                     )
                     st.plotly_chart(fig)
 
                 # 구종별 수평/수직 무브먼트 시각화
                 st.subheader("구종별 수평/수직 무브먼트")
-                pitcher1_grouped = (
-                    pitcher1_data.groupby("구종")[["HorzBreak", "InducedVertBreak"]]
-                    .mean()
-                    .reset_index()
-                    .assign(투수=pitcher1)
-                )
-                pitcher2_grouped = (
-                    pitcher2_data.groupby("구종")[["HorzBreak", "InducedVertBreak"]]
-                    .mean()
-                    .reset_index()
-                    .assign(투수=pitcher2)
-                )
+                pitcher1_grouped = movement_means(pitcher1_data, "투수", pitcher1)
+                pitcher2_grouped = movement_means(pitcher2_data, "투수", pitcher2)
 
                 # 두 선수의 데이터 결합
                 combined_data = pd.concat([pitcher1_grouped, pitcher2_grouped])
 
-                fig = px.scatter(
-                    combined_data,
-                    x="HorzBreak",
-                    y="InducedVertBreak",
-                    color="투수",
-                    symbol="구종",
-                    title="구종별 수평/수직 무브먼트",
-                    hover_data=["구종", "투수"],
-                    labels={"HorzBreak": "수평 무브 (cm)", "InducedVertBreak": "수직 무브 (cm)"},
-                    color_discrete_map={pitcher1: "red", pitcher2: "blue"}
-                )
-
-                # 축 및 레이아웃 설정
-                fig.update_traces(marker=dict(size=12))
-                fig.update_layout(
-                    width=800,
-                    height=750,
-                    xaxis=dict(range=[-70, 70], linecolor="black"),
-                    yaxis=dict(range=[-70, 70], linecolor="black"),
+                color_map = {pitcher1: "red", pitcher2: "blue"}
+                fig = cached_figure(
+                    "compare_movement", combined_data, {"color": "투수", "colors": color_map},
+                    lambda: mean_movement_figure(
+                        combined_data, "투수", "구종별 수평/수직 무브먼트", ["구종", "투수"], color_discrete_map=color_map
+                    )
                 )
-                fig.add_shape(type="line", x0=0, y0=-70, x1=0, y1=70, line=dict(color="black", width=2))
-                fig.add_shape(type="line", x0=-70, y0=0, x1=70, y1=0, line=dict(color="black", width=2))
 
                 st.plotly_chart(fig)
 # -------------------
@@ -256,10 +161,7 @@ with tab2:
 
     # 선수 검색 및 선택
     search_query = st.text_input("선수 이름 검색", "").strip()
-    if search_query:
-        filtered_suggestions = [name for name in sorted(df['투수'].unique()) if search_query.lower() in name.lower()]
-    else:
-        filtered_suggestions = sorted(df['투수'].unique())
+    filtered_suggestions = search_names(df['투수'], search_query)
 
     if filtered_suggestions:
         pitcher_name = st.selectbox("투수 이름 선택", filtered_suggestions, key="pitcher_search")
@@ -267,19 +169,19 @@ with tab2:
         st.warning("검색된 선수가 없습니다.")
         pitcher_name = None
 
-    # 기간 1 설정 (가로 배치)
-    col1, col2 = st.columns(2)
-    with col1:
-        start_date_1 = st.date_input("기간 1 시작 날짜", df['Date'].min(), key="start_date_1")
-    with col2:
-        end_date_1 = st.date_input("기간 1 종료 날짜", df['Date'].max(), key="end_date_1")
-
-    # 기간 2 설정 (가로 배치)
-    col3, col4 = st.columns(2)
-    with col3:
-        start_date_2 = st.date_input("기간 2 시작 날짜", df['Date'].min(), key="start_date_2")
-    with col4:
-        end_date_2 = st.date_input("기간 2 종료 날짜", df['Date'].max(), key="end_date_2")
+    # 기간 설정 방식
+    period_mode = st.radio("기간 나누기", ["직접 설정", "월별", "전반기/후반기"], horizontal=True, key="period_mode")
+    if period_mode == "직접 설정":
+        n_periods = st.number_input("기간 수", min_value=2, max_value=6, value=2, step=1, key="n_periods")
+        date_ranges = []
+        for i in range(1, int(n_periods) + 1):
+            # 기간별 시작/종료 날짜 (가로 배치, 기간끼리 겹쳐도 됨)
+            col1, col2 = st.columns(2)
+            with col1:
+                start_date = st.date_input(f"기간 {i} 시작 날짜", df['Date'].min(), key=f"start_date_{i}")
+            with col2:
+                end_date = st.date_input(f"기간 {i} 종료 날짜", df['Date'].max(), key=f"end_date_{i}")
+            date_ranges.append((start_date, end_date))
 
     # 구종 선택 및 비교할 변수 선택 (가로 배치)
     col5, col6 = st.columns(2)
@@ -287,7 +189,7 @@ with tab2:
         pitch_types = sorted(df['구종'].unique())  # 구종 리스트 생성
         selected_pitch_types = st.multiselect("구종 선택", pitch_types, key="pitch_types")
     with col6:
-        selected_variables = st.multiselect("비교할 변수 선택", compare_variables, key="period_variables")
+        selected_variables = st.multiselect("비교할 변수 선택", list(VARIABLES.keys()), key="period_variables")
 
     # 검색 버튼 생성
     if "period_filter_applied" not in st.session_state:
@@ -296,132 +198,75 @@ with tab2:
     if st.button("기간 비교 실행"):
         st.session_state.period_filter_applied = True
 
-    # 데이터 필터링 (선수 이름 및 구종 포함)
+    # 데이터 필터링 (선수 이름 및 구종 포함, 한 번의 마스크)
     if st.session_state.period_filter_applied and pitcher_name and selected_variables:
-        filtered_df_1 = df[
-            (df['투수'] == pitcher_name) & 
-            (df['Date'] >= pd.Timestamp(start_date_1)) & 
-            (df['Date'] <= pd.Timestamp(end_date_1)) &
-            (df['구종'].isin(selected_pitch_types) if selected_pitch_types else True)
-        ]
-
-        filtered_df_2 = df[
-            (df['투수'] == pitcher_name) & 
-            (df['Date'] >= pd.Timestamp(start_date_2)) & 
-            (df['Date'] <= pd.Timestamp(end_date_2)) &
-            (df['구종'].isin(selected_pitch_types) if selected_pitch_types else True)
-        ]
-
-        if not filtered_df_1.empty and not filtered_df_2.empty:
-            comparison_results = []
-            for variable in selected_variables:
-                df_variable = map_variable_name(variable)
-
-                # Tilt 처리
-                if df_variable == "Tilt":
-                    value_1 = filtered_df_1[df_variable].mode().iloc[0] if not filtered_df_1[df_variable].mode().empty else "N/A"
-                    value_2 = filtered_df_2[df_variable].mode().iloc[0] if not filtered_df_2[df_variable].mode().empty else "N/A"
-                else:
-                    # 평균값 계산 (숫자형 변수)
-                    value_1 = round(filtered_df_1[df_variable].mean(), 2)
-                    value_2 = round(filtered_df_2[df_variable].mean(), 2)
-
-                # 결과 저장
-                comparison_results.append({
-                    "변수": variable,
-                    "기간 1 평균": value_1,
-                    "기간 2 평균": value_2,
-                    "차이": abs(value_1 - value_2) if df_variable != "Tilt" else "N/A"
-                })
-
-            # 결과를 데이터프레임으로 표시
-            comparison_df = pd.DataFrame(comparison_results)
+        mask = df['투수'] == pitcher_name
+        if selected_pitch_types:
+            mask &= df['구종'].isin(selected_pitch_types)
+        pitcher_df = df[mask]
+
+        if period_mode == "직접 설정":
+            periods = custom_periods(date_ranges)
+        elif period_mode == "월별":
+            periods = monthly_periods(pitcher_df['Date'])
+        else:
+            periods = half_periods(pitcher_df['Date'])
+
+        # 모든 기간 · 변수 · 구종별 무브먼트를 한 번에 계산
+        summary, movement_data = compare_periods(
+            pitcher_df, periods, [VARIABLES[v] for v in selected_variables]
+        )
+        period_labels = [label for label, _, _ in periods]
+        empty_periods = [label for label in period_labels if summary.loc["투구수", label] == 0]
+
+        if pitcher_df.empty or len(empty_periods) == len(period_labels):
+            st.warning("선택된 기간 모두에서 데이터가 존재하지 않습니다.")
+        else:
+            if empty_periods:
+                st.warning(f"데이터가 없는 기간: {', '.join(empty_periods)}")
+
+            # 결과를 데이터프레임으로 표시 (변수 × 기간)
+            comparison_df = summary.drop(index="투구수").rename(index={c: v for v, c in VARIABLES.items()})
+            numeric_rows = [v for v in selected_variables if VARIABLES[v] != "Tilt"]
+            numeric_values = comparison_df.loc[numeric_rows, period_labels].astype(float)
+            spread = (numeric_values.max(axis=1) - numeric_values.min(axis=1)).round(2)
+            comparison_df = comparison_df.astype(object)
+            comparison_df["최대 차이"] = [spread.get(v, "N/A") for v in comparison_df.index]
+            comparison_df.loc["투구수"] = summary.loc["투구수"].astype(int).tolist() + [""]
             st.subheader("기간 간 변수 비교 결과")
-            st.dataframe(comparison_df)
+            st.dataframe(comparison_df.rename_axis("변수").reset_index().astype(str))
 
             # 여러 변수 시각화
-            for variable in selected_variables:
-                if variable == "Tilt":
-                    st.warning(f"{variable} 변수는 시각화에 적합하지 않습니다.")
-                    continue
-
+            for variable in numeric_rows:
                 # 데이터프레임 생성
                 combined_df = pd.DataFrame({
-                    "기간": ["기간 1", "기간 2"],
-                    "평균값": [
-                        comparison_df.loc[comparison_df["변수"] == variable, "기간 1 평균"].values[0],
-                        comparison_df.loc[comparison_df["변수"] == variable, "기간 2 평균"].values[0]
-                    ]
-                })
+                    "기간": period_labels,
+                    "평균값": comparison_df.loc[variable, period_labels].astype(float).to_numpy()
+                }).dropna()
 
                 # 변수별 막대그래프 생성
-                fig = px.bar(
-                    combined_df,
-                    x="기간",
-                    y="평균값",
-                    title=f"{variable} 기간 간 비교 ({pitcher_name})",
-                    labels={"평균값": variable},
-                    color="평균값",  # 값에 따라 색상 변화
-                    color_continuous_scale="Viridis"  # 색상 스케일 적용
-                )
-
-                # y축 범위 조정
-                fig.update_layout(
-                    yaxis=dict(
-                        range=[
-                            min(combined_df["평균값"]) - 10, 
-                            max(combined_df["평균값"]) + 10
-                        ],
-                        title=variable
-                    ),
-                    xaxis=dict(title="기간"),
-                    title_font=dict(size=20),  # 제목 폰트 크기 조정
-                    width=800,  # 그래프 넓이
-                    height=600  # 그래프 높이
+                title = f"{variable} 기간 간 비교 ({pitcher_name})"
+                fig = cached_figure(
+                    "period_bar", combined_df, {"x": "기간", "variable": variable, "title": title, "pad": 10},
+                    lambda: mean_bar_figure(combined_df, "기간", variable, title, pad=10)
                 )
                 st.plotly_chart(fig)
 
             # 구종별 수평/수직 무브먼트 시각화
             st.subheader("구종별 수평/수직 무브먼트")
-            grouped_df_1 = (
-                filtered_df_1.groupby("구종")[["HorzBreak", "InducedVertBreak"]]
-                .mean()
-                .reset_index()
-                .assign(기간="기간 1")
-            )
-            grouped_df_2 = (
-                filtered_df_2.groupby("구종")[["HorzBreak", "InducedVertBreak"]]
-                .mean()
-                .reset_index()
-                .assign(기간="기간 2")
-            )
-
-            # 데이터 결합
-            movement_data = pd.concat([grouped_df_1, grouped_df_2])
 
             # 산점도 생성
-            fig3 = px.scatter(
-                movement_data,
-                x="HorzBreak",
-                y="InducedVertBreak",
-                color="기간",
-                symbol="구종",
-                title=f"{pitcher_name} 구종별 수평/수직 무브먼트 비교",
-                hover_data=["구종"],
-                labels={"HorzBreak": "수평 무브 (cm)", "InducedVertBreak": "수직 무브 (cm)"},
-                color_discrete_map={"기간 1": "red", "기간 2": "blue"}
-            )
-
-            # 축 및 레이아웃 설정
-            fig3.update_traces(marker=dict(size=12))
-            fig3.update_layout(
-                width=800,
-                height=750,
-                xaxis=dict(range=[-70, 70], linecolor="black"),
-                yaxis=dict(range=[-70, 70], linecolor="black"),
+            fig3 = cached_figure(
+                "period_movement", movement_data, {"color": "기간", "periods": period_labels, "pitcher": pitcher_name},
+                lambda: mean_movement_figure(
+                    movement_data, "기간", f"{pitcher_name} 구종별 수평/수직 무브먼트 비교", ["구종", "투구수"],
+                    category_orders={"기간": period_labels},
+                    color_discrete_sequence=px.colors.qualitative.Set1
+                )
             )
-            fig3.add_shape(type="line", x0=0, y0=-70, x1=0, y1=70, line=dict(color="black", width=2))
-            fig3.add_shape(type="line", x0=-70, y0=0, x1=70, y1=0, line=dict(color="black", width=2))
 
             # 산점도 출력
             st.plotly_chart(fig3)
+
+# 실행 단계별 시간 측정 종료
+end_page()
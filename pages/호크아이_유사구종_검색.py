@@ -0,0 +1,129 @@
+import pandas as pd
+import streamlit as st
+from core.figcache import cached_figure
+from core.figures import mean_movement_figure
+from core.filter import search_names
+from core.loader import discover_seasons, load_hawkeye_season, load_trajectory_metrics
+from core.similarity import PITCH_INDEX, PROFILE_COLUMNS, pitch_profiles
+from core.cache import cached_stage
+from core.timing import begin_page, end_page
+
+# 결과 표에 보일 컬럼 이름
+DISPLAY_COLUMNS = {
+    "distance": "거리", "season": "시즌", "pitcher": "투수", "pitch_type": "구종", "pitches": "투구수",
+    "RelSpeed": "구속", "SpinRate": "회전수", "InducedVertBreak": "수직무브", "HorzBreak": "수평무브",
+    "RelHeight": "높이", "RelSide": "사이드", "Extension": "익스텐션", "Tilt": "회전축",
+}
+
+@cached_stage("시즌 찾기", cache_name="seasons")
+def load_seasons():
+    # 파일이 있는 시즌 목록 (데이터는 읽지 않음)
+    return discover_seasons("hawkeye")
+
+@cached_stage("궤적 지표 계산", cache_name="trajectory_metrics")
+def load_metrics():
+    return load_trajectory_metrics()
+
+@cached_stage("데이터 불러오기", cache_name="hawkeye")  # 같은 데이터를 쓰는 페이지끼리 한 벌만 저장 (시즌별)
+def load_season(season):
+    # 한 시즌 데이터 + 투구별 궤적 지표 연결
+    return load_hawkeye_season(season, load_metrics())
+
+@cached_stage("구종 프로필", cache_name="profiles")
+def load_profiles(season):
+    # 시즌 · 투수 · 구종별 평균 특성 (색인에 넣을 값)
+    return pitch_profiles(load_season(season))
+
+# 실행 단계별 시간 측정 시작 (관리자는 사이드바에서 확인)
+begin_page("호크아이 유사 구종 검색")
+
+st.set_page_config(
+    page_title="호크아이 유사 구종 검색",
+    page_icon="⚾",
+    layout="wide"
+)
+
+# -------------------------------
+# 로그인 여부 확인
+# -------------------------------
+if "logged_in" not in st.session_state or not st.session_state.logged_in:
+    st.error("로그인 후에 이 페이지를 이용할 수 있습니다.")
+    st.stop()  # 로그인 상태가 아니면 여기서 실행 중지
+
+# 시즌별 프로필을 색인에 반영 (이미 넣은 시즌은 건너뛰고, 바뀐 시즌만 교체)
+seasons = load_seasons()
+for season in seasons:
+    PITCH_INDEX.update(load_profiles(season))
+profiles = PITCH_INDEX.live_profiles()
+
+st.title("호크아이 유사 구종 검색")
+st.caption("구속 · 회전수 · 무브먼트 · 릴리스 높이/사이드 · 익스텐션 · 회전축을 표준화해서 가장 가까운 구종을 찾습니다.")
+
+# -------------------
+# 기준 투수 · 구종 · 시즌 가로 배치
+# -------------------
+st.subheader("기준 구종")
+col1, col2 = st.columns(2)
+with col1:
+    search_query = st.text_input("투수 이름 검색", "").strip()
+    suggestions = search_names(profiles['pitcher'], search_query)
+with col2:
+    pitcher_name = st.selectbox("투수 이름 선택", suggestions) if suggestions else None
+
+if pitcher_name is None:
+    st.info("검색된 투수가 없습니다.")
+    st.stop()
+
+own = profiles[profiles['pitcher'] == pitcher_name]
+col3, col4 = st.columns(2)
+with col3:
+    pitch_type = st.selectbox("구종 선택", sorted(own['pitch_type'].unique()))
+with col4:
+    base_seasons = sorted(own.loc[own['pitch_type'] == pitch_type, 'season'].unique(), reverse=True)
+    base_season = st.selectbox("기준 시즌", base_seasons)
+
+# -------------------
+# 검색 조건
+# -------------------
+st.subheader("검색 조건")
+col5, col6 = st.columns(2)
+with col5:
+    search_seasons = st.multiselect("찾을 시즌", seasons, default=seasons)
+    k = st.slider("찾을 개수", min_value=5, max_value=30, value=10, step=5)
+with col6:
+    same_type = st.checkbox("같은 구종 표기만", value=True)
+    exclude_self = st.checkbox("같은 투수 제외", value=True)
+
+neighbors = PITCH_INDEX.query(
+    pitcher_name, pitch_type, season=base_season, k=k, seasons=search_seasons or None,
+    same_type=same_type, exclude_self=exclude_self,
+)
+
+if neighbors is None or neighbors.empty:
+    st.info("조건에 맞는 구종이 없습니다. 조건을 수정해주세요.")
+else:
+    target = own[(own['pitch_type'] == pitch_type) & (own['season'] == base_season)]
+    table = neighbors[list(DISPLAY_COLUMNS)].copy()
+    table[PROFILE_COLUMNS] = table[PROFILE_COLUMNS].round(1)
+    st.subheader(f"{base_season} {pitcher_name} {pitch_type} 와 비슷한 구종")
+    st.dataframe(table.rename(columns=DISPLAY_COLUMNS), hide_index=True)
+
+    # 기준 구종과 비슷한 구종의 평균 무브먼트
+    movement = pd.concat([target.assign(distance=0.0)[list(DISPLAY_COLUMNS)], neighbors[list(DISPLAY_COLUMNS)]])
+    movement = movement.assign(
+        선수=movement['pitcher'] + " (" + movement['season'].astype(str) + ")",
+        구종=movement['pitch_type'],
+        기준=["기준"] + ["비슷한 구종"] * len(neighbors),
+    )
+    title = f"{pitcher_name} {pitch_type} 무브먼트 비교"
+    fig = cached_figure(
+        "similar_movement", movement, {"title": title},
+        lambda: mean_movement_figure(
+            movement, "기준", title, hover_data=["선수", "RelSpeed", "SpinRate", "distance"],
+            color_discrete_map={"기준": "red", "비슷한 구종": "blue"},
+        ),
+    )
+    st.plotly_chart(fig)
+
+# 실행 단계별 시간 측정 종료
+end_page()
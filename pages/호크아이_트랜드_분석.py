@@ -1,41 +1,33 @@
-import pandas as pd
 import streamlit as st
-import plotly.express as px
-import io
+from core.figcache import cached_figure
+from core.figures import PITCH_COLORS
+from core.filter import HAWKEYE_COLUMNS, apply_filters, prune_seasons, search_names
+from core.loader import concat_seasons, discover_seasons, load_hawkeye_season, load_trajectory_metrics, season_range
+from core.trend import TREND_VARIABLES, trend_figure, trend_table, trend_title
+from core.export import EXPORT_FORMATS, cached_export, export_name
+from core.cache import cached_stage
+from core.timing import begin_page, end_page
 
 # 데이터 컬러 설정
-cols = {
-    "직구": "#4C569B",
-    "투심": "#B590C3",
-    "커터": "#45B0D8",
-    "슬라": "firebrick",
-    "스위퍼": "#00FF00",
-    "체인": "#FBE25E",
-    "포크": "MediumSeaGreen",
-    "커브": "orange",
-    "너클": "black"
-}
-
-@st.cache_data
-def load_data():
-    # 데이터 URL
-    data_url1 = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/24_merged_data_%EC%88%98%EC%A0%95.xlsx"
-    data_url2 = "https://github.com/JUNG-PFe/pitcher-visualization_2/raw/refs/heads/main/23_merged_data_%EC%88%98%EC%A0%95.xlsx"
-    
-    # 데이터 로드
-    df1 = pd.read_excel(data_url1)
-    df2 = pd.read_excel(data_url2)
-    
-    # 날짜 형식 통일
-    df1['Date'] = pd.to_datetime(df1['Date'])
-    df2['Date'] = pd.to_datetime(df2['Date'])
-    
-    # 병합
-    combined_df = pd.concat([df1, df2], ignore_index=True)
-    return combined_df
-
-# 데이터 로드
-df = load_data()
+cols = PITCH_COLORS
+
+@cached_stage("시즌 찾기", cache_name="seasons")
+def load_seasons():
+    # 파일이 있는 시즌 목록 (데이터는 읽지 않음)
+    return discover_seasons("hawkeye")
+
+@cached_stage("궤적 지표 계산", cache_name="trajectory_metrics")
+def load_metrics():
+    return load_trajectory_metrics()
+
+@cached_stage("데이터 불러오기", cache_name="hawkeye")  # 같은 데이터를 쓰는 페이지끼리 한 벌만 저장 (시즌별)
+def load_season(season):
+    # 한 시즌 데이터 + 투구별 궤적 지표 연결
+    return load_hawkeye_season(season, load_metrics())
+
+# 시즌 목록 (실행 단계별 시간 측정 시작, 관리자는 사이드바에서 확인)
+begin_page("호크아이 트랜드 분석")
+seasons = load_seasons()
 
 st.set_page_config(
     page_title="23-24 호크아이 투수 데이터 트랜드 분석",
@@ -52,23 +44,28 @@ if "logged_in" not in st.session_state or not st.session_state.logged_in:
 
 st.title("호크아이 데이터 트랜드 분석")
 
+# 날짜 범위 선택 (사이드바)
+st.sidebar.header("날짜 범위 선택")
+first_day, last_day = season_range(seasons)
+start_date = st.sidebar.date_input("시작 날짜", first_day)
+end_date = st.sidebar.date_input("종료 날짜", last_day)
+
+# 데이터 로드: 기간에 걸리는 시즌 파일만 읽음
+selected_seasons = prune_seasons(seasons, dict(date_range=(start_date, end_date)))
+if not selected_seasons:
+    st.warning("선택한 기간에 해당하는 시즌 데이터가 없습니다.")
+    st.stop()
+df = concat_seasons(load_season, selected_seasons)
+
 # 투수 이름 필터
 search_query = st.text_input("투수 이름 검색", "").strip()
-if search_query:
-    suggestions = [name for name in sorted(df['투수'].unique()) if search_query.lower() in name.lower()]
-else:
-    suggestions = sorted(df['투수'].unique())
+suggestions = search_names(df['투수'], search_query)
 
 if suggestions:
     pitcher_name = st.selectbox("투수 이름 선택", suggestions)
 else:
     pitcher_name = None
 
-# 날짜 범위 선택
-st.sidebar.header("날짜 범위 선택")
-start_date = st.sidebar.date_input("시작 날짜", df['Date'].min())
-end_date = st.sidebar.date_input("종료 날짜", df['Date'].max())
-
 # 구종 필터
 st.sidebar.header("구종 필터")
 pitch_types = st.sidebar.multiselect(
@@ -86,68 +83,57 @@ if st.button("검색 실행"):
 
 # 데이터 필터링 및 시각화
 if st.session_state.filter_applied:
-    # 선택된 투수와 날짜에 따라 데이터 필터링
-    filtered_df = df[(df['Date'] >= pd.Timestamp(start_date)) & (df['Date'] <= pd.Timestamp(end_date))]
-    if pitcher_name:
-        filtered_df = filtered_df[filtered_df['투수'] == pitcher_name]
-    if pitch_types:
-        filtered_df = filtered_df[filtered_df['구종'].isin(pitch_types)]
+    # 선택된 투수와 날짜에 따라 데이터 필터링 (필터 조건은 내보내기 캐시 키로도 사용)
+    filter_spec = dict(
+        page="hawkeye_trend", pitcher=pitcher_name, date_range=(start_date, end_date), pitch_types=pitch_types
+    )
+    filtered_df = apply_filters(df, filter_spec, HAWKEYE_COLUMNS)
 
     if filtered_df.empty:
         st.warning("선택된 날짜 범위, 투수 또는 구종에 해당하는 데이터가 없습니다.")
     else:
         # 15일 간격으로 데이터 집계
-        filtered_df['15_day_interval'] = filtered_df['Date'].dt.to_period('15D').apply(lambda r: r.start_time)
-        
-        # 집계 함수 설정
-        aggregated_df = filtered_df.groupby(['15_day_interval', '구종']).agg({
-            'RelSpeed': lambda x: round(x.mean(), 0),
-            'SpinRate': lambda x: round(x.mean(), 0),
-            '회전효율': lambda x: round(x.mean(), 0),
-            'InducedVertBreak': lambda x: round(x.mean(), 1),
-            'HorzBreak': lambda x: round(x.mean(), 1),
-            'RelHeight': lambda x: round(x.mean() * 100, 0),
-            'RelSide': lambda x: round(x.mean() * 100, 0),
-            'Extension': lambda x: round(x.mean() * 100, 0)
-        }).reset_index()
+        aggregated_df = trend_table(filtered_df)
 
         # 시각화할 변수 선택 (다중 선택)
         st.sidebar.header("시각화할 변수 선택")
         selected_variables = st.sidebar.multiselect(
             "변수를 선택하세요",
-            ["RelSpeed", "SpinRate", "회전효율", "InducedVertBreak", "HorzBreak", "RelHeight", "RelSide", "Extension"],
+            TREND_VARIABLES,
             default=["RelSpeed"]  # 기본값 설정
         )
 
         if selected_variables:
             for variable in selected_variables:
                 # 트렌드 시각화
-                fig = px.line(
-                    aggregated_df,
-                    x='15_day_interval',
-                    y=variable,
-                    color='구종',
-                    color_discrete_map=cols,  # 색상 매핑 적용
-                    title=f"{pitcher_name}의 15일 간격 투구 유형별 {variable} 트렌드" if pitcher_name else f"15일 간격 투구 유형별 {variable} 트렌드",
-                    labels={"15_day_interval": "날짜", variable: variable, "구종": "구종"}
+                title = trend_title(variable, pitcher_name)
+                fig = cached_figure(
+                    "trend_line", aggregated_df, {"variable": variable, "title": title, "colors": cols},
+                    lambda: trend_figure(aggregated_df, variable, cols, title),
+                    columns=['15_day_interval', '구종', variable]
                 )
                 st.plotly_chart(fig)
 
         # 결과 다운로드
         st.subheader("결과 다운로드")
-        output = io.BytesIO()
-
-        # 필터링된 데이터를 Excel로 저장
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            aggregated_df.to_excel(writer, index=False, sheet_name='Aggregated Data')  # 집계된 데이터 저장
-            filtered_df.to_excel(writer, index=False, sheet_name='Filtered Data')  # 필터링된 원본 데이터도 추가로 저장
+        export_format = st.radio(
+            "파일 형식", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f]["label"], horizontal=True, key="trend_export_format"
+        )
 
-        output.seek(0)
+        # 집계된 데이터와 필터링된 원본 데이터를 함께 저장 (CSV · Parquet 는 시트별 파일을 zip 으로)
+        file_name, mime = export_name(['Aggregated Data', 'Filtered Data'], export_format, 'filtered_data')
 
-        # 다운로드 버튼 (Excel 파일)
+        # 다운로드 버튼 (파일은 누를 때 만들고, 같은 필터 조건이면 저장된 파일 사용)
         st.download_button(
-            label="필터링된 데이터 다운로드 (Excel)",
-            data=output,
-            file_name='filtered_data.xlsx',
-            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            label=f"필터링된 데이터 다운로드 ({EXPORT_FORMATS[export_format]['label']})",
+            data=lambda: cached_export(
+                filter_spec, export_format,
+                lambda: {'Aggregated Data': aggregated_df, 'Filtered Data': filtered_df}, 'filtered_data'
+            ),
+            file_name=file_name,
+            mime=mime,
+            on_click="ignore"
         )
+
+# 실행 단계별 시간 측정 종료
+end_page()
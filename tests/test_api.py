@@ -0,0 +1,122 @@
+"""분석 API: ETag · 304, Arrow 응답, 잘못된 조건, 비슷한 구종, 예상 못 한 오류"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow.ipc
+
+from core.api import ARROW_TYPE, AnalyticsApp, request
+from core.cache import LRUCache
+
+PITCHERS = ["양현종", "네일", "정해영"]
+PITCH_TYPES = ["직구", "슬라", "커브"]
+
+
+def _season(season):
+    rng = np.random.default_rng(season)
+    n = 600
+    frame = pd.DataFrame({
+        "Date": pd.Timestamp(f"{season}-04-01") + pd.to_timedelta(rng.integers(0, 150, n), unit="D"),
+        "투수": np.repeat(PITCHERS, n // len(PITCHERS)),
+        "타자유형": rng.choice(["우타", "좌타"], n),
+        "주자": rng.choice(["주자무", "1루"], n),
+        "구종": np.tile(PITCH_TYPES, n // len(PITCH_TYPES)),
+        "타격결과": rng.choice(["안타", "아웃", None], n),
+        "심판콜": rng.choice(list("BSFH"), n),
+        "Tilt": rng.choice(["12:00", "1:30", "2:00"], n),
+        "PlateLocSide": rng.normal(0, 0.3, n),
+        "PlateLocHeight": rng.normal(0.75, 0.3, n),
+    })
+    for column, mean, sd in [
+        ("RelSpeed", 140, 8), ("SpinRate", 2300, 200), ("회전효율", 90, 5), ("InducedVertBreak", 20, 20),
+        ("HorzBreak", 0, 25), ("ExitSpeed", 130, 15), ("RelHeight", 1.8, 0.1), ("RelSide", 0.5, 0.2),
+        ("Extension", 1.9, 0.1), ("VAA", -5, 1), ("HAA", 0, 1), ("PlateSpeed", 130, 8), ("TimeToPlate", 0.42, 0.02),
+    ]:
+        frame[column] = rng.normal(mean, sd, n)
+    return frame
+
+
+def _app():
+    return AnalyticsApp(
+        loaders=dict(hawkeye=_season), cache=LRUCache(None, registry=None), seasons=dict(hawkeye=[2023, 2024]),
+    )
+
+
+def test_etag_and_not_modified():
+    app = _app()
+    status, headers, body = request(app, "/summary", {"pitcher": "양현종", "year": 2024})
+    assert status == 200
+    assert headers["content-type"].startswith("application/json")
+    assert json.loads(body)["count"] == len(PITCH_TYPES)
+
+    etag = headers["etag"]
+    status, headers, body = request(app, "/summary", {"pitcher": "양현종", "year": 2024}, {"If-None-Match": etag})
+    assert (status, headers["etag"], body) == (304, etag, b"")
+
+    # 조건이 다르면 ETag 도 다름
+    _, other, _ = request(app, "/summary", {"pitcher": "네일", "year": 2024})
+    assert other["etag"] != etag
+
+
+def test_arrow_response_round_trips():
+    app = _app()
+    _, _, body = request(app, "/filter", {"pitcher": "네일", "columns": "Date,투수,구종,RelSpeed"})
+    expected = pd.DataFrame(json.loads(body)["data"])
+
+    status, headers, body = request(app, "/filter", {"pitcher": "네일", "columns": "Date,투수,구종,RelSpeed"},
+                                    {"Accept": ARROW_TYPE})
+    assert status == 200
+    assert headers["content-type"] == ARROW_TYPE
+    table = pyarrow.ipc.open_stream(io.BytesIO(body)).read_all().to_pandas()
+    assert list(table.columns) == ["Date", "투수", "구종", "RelSpeed"]
+    assert len(table) == len(expected) == 400
+    assert (table["투수"] == "네일").all()
+    np.testing.assert_allclose(table["RelSpeed"], expected["RelSpeed"])
+
+
+def test_bad_params_return_400():
+    app = _app()
+    for path, params in [
+        ("/summary", {"year": "작년"}),
+        ("/summary", {"start": "2024-13-45"}),
+        ("/summary", {"year": 2019}),  # 없는 시즌
+        ("/summary", {"source": "kbo"}),
+        ("/heatmap", {"grid": "4x4"}),
+        ("/filter", {"columns": "없는컬럼"}),
+        ("/trend", {"variables": "키"}),
+        ("/similar", {"pitcher": "양현종"}),
+        ("/pitchers", {"format": "arrow"}),  # dict 결과는 JSON 만
+        ("/summary", {"format": "csv"}),
+    ]:
+        status, headers, body = request(app, path, params)
+        assert status == 400, (path, params)
+        assert headers["content-type"].startswith("application/json")
+        assert json.loads(body)["error"]
+
+    status, _, _ = request(app, "/없는경로")
+    assert status == 404
+
+
+def test_similar_returns_neighbors_of_other_pitchers():
+    app = _app()
+    status, _, body = request(app, "/similar", {"pitcher": "양현종", "pitch_type": "직구", "season": 2024, "k": 3})
+    assert status == 200
+    data = json.loads(body)["data"]
+    assert 0 < len(data) <= 3
+    assert all(row["pitcher"] != "양현종" and row["pitch_type"] == "직구" for row in data)
+    assert [row["distance"] for row in data] == sorted(row["distance"] for row in data)
+
+    status, _, body = request(app, "/similar", {"pitcher": "없는투수", "pitch_type": "직구"})
+    assert status == 400
+
+
+def test_unexpected_error_returns_500_json():
+    def broken(season):
+        raise KeyError("Date")
+
+    app = AnalyticsApp(loaders=dict(hawkeye=broken), cache=LRUCache(None, registry=None), seasons=dict(hawkeye=[2024]))
+    status, headers, body = request(app, "/summary")
+    assert status == 500
+    assert headers["content-type"].startswith("application/json")
+    assert "KeyError" in json.loads(body)["error"]
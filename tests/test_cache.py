@@ -0,0 +1,92 @@
+"""바이트 상한 · 전체 예산에 따른 캐시 정리, 같은 키 동시 계산"""
+import threading
+import time
+
+import pytest
+
+from core.cache import CacheRegistry, LRUCache, cached_stage
+
+
+def test_lru_cache_evicts_least_recently_used_over_max_bytes():
+    cache = LRUCache(25, registry=None)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    assert cache.get("a") is not None  # a 를 최근에 씀 → b 가 가장 오래 안 쓴 항목
+    cache.put("c", b"x" * 10)
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None and cache.peek("c") is not None
+    assert cache.total_bytes == 20
+    assert cache.evictions == 1
+
+    cache.put("big", b"x" * 30)  # 상한보다 큰 값은 저장하지 않음
+    assert cache.peek("big") is None
+    assert cache.total_bytes == 20
+
+
+def test_registry_keeps_all_caches_within_budget():
+    registry = CacheRegistry(100)
+    small = LRUCache(None, name="small", registry=registry)
+    large = LRUCache(None, name="large", registry=registry)
+    large.put("old", b"x" * 60)
+    small.put("s1", b"x" * 10)
+    small.put("s2", b"x" * 10)
+    large.put("new", b"x" * 30)  # 합계 110 → '크기 × 안 쓴 시간' 이 가장 큰 large/old 를 지움
+    assert large.peek("old") is None
+    assert [small.peek("s1"), small.peek("s2"), large.peek("new")] == [b"x" * 10] * 2 + [b"x" * 30]
+    assert registry.total_bytes() == 50
+    assert registry.evictions == 1
+
+    for i in range(20):  # 계속 넣어도 합계는 예산 안
+        small.put(i, b"x" * 15)
+        assert registry.total_bytes() <= 100
+    assert registry.cache("small") is small
+    assert {s["name"] for s in registry.stats()} == {"small", "large"}
+
+
+def test_cached_stage_computes_same_key_once():
+    calls = []
+    started = threading.Event()
+
+    @cached_stage("테스트", cache_name="test_once")
+    def slow(x):
+        calls.append(x)
+        started.set()
+        time.sleep(0.2)
+        return x * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow(3))) for _ in range(3)]
+    threads[0].start()
+    started.wait()  # 첫 호출이 계산하는 동안 나머지가 같은 키를 요청
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [6] * len(threads)
+    assert calls == [3]
+    assert slow.cache._key_locks == {}
+
+
+def test_key_lock_released_on_error():
+    @cached_stage("테스트", cache_name="test_error")
+    def broken():
+        raise RuntimeError("실패")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            broken()
+    assert broken.cache._key_locks == {}
+
+
+def test_cached_stage_key_uses_spec_instead_of_data():
+    calls = []
+
+    @cached_stage("테스트", cache_name="test_key", key=lambda spec, data: spec)
+    def total(spec, data):
+        calls.append(spec)
+        return sum(data)
+
+    assert total({"pitcher": "A"}, [1, 2]) == 3
+    assert total({"pitcher": "A"}, [1, 2]) == 3
+    assert total({"pitcher": "B"}, [1, 2, 3]) == 6
+    assert calls == [{"pitcher": "A"}, {"pitcher": "B"}]
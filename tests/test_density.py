@@ -0,0 +1,18 @@
+"""로케이션 밀도 맵"""
+import warnings
+
+import numpy as np
+
+from core.density import density_maps
+
+
+def test_density_maps_skip_missing_locations():
+    x = np.array([0.0, np.nan, 10.0, np.inf, 500.0])
+    z = np.array([50.0, 60.0, np.nan, 70.0, 50.0])
+    groups = np.array([0, 1, 1, 2, 2])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # NaN 을 정수로 바꿀 때의 RuntimeWarning 도 실패로
+        maps = density_maps(x, z, groups)
+    # 위치가 없거나 격자 밖인 투구만 있는 그룹도 빈 맵으로 남음
+    assert maps.shape[0] == 3
+    np.testing.assert_allclose(maps.sum(axis=(1, 2)), [1, 0, 0], atol=1e-4)
@@ -0,0 +1,40 @@
+"""내보내기 캐시 키"""
+import gzip
+import io
+
+import pandas as pd
+
+from core.cache import LRUCache
+from core.export import cached_export, export_bytes
+
+
+def test_cached_export_rebuilds_when_data_changes():
+    cache = LRUCache(None, registry=None)
+    spec = {"page": "test", "year": 2024}
+    first = cached_export(spec, "csv.gz", lambda: {"Data": pd.DataFrame({"a": [1, 2]})}, "data", cache=cache)
+    again = cached_export(spec, "csv.gz", lambda: {"Data": pd.DataFrame({"a": [1, 2]})}, "data", cache=cache)
+    assert again == first
+    assert cache.hits == 1
+
+    # 필터 조건이 같아도 원본이 바뀌면 새로 만듦
+    changed = cached_export(spec, "csv.gz", lambda: {"Data": pd.DataFrame({"a": [1, 3]})}, "data", cache=cache)
+    assert pd.read_csv(io.BytesIO(gzip.decompress(changed)))["a"].tolist() == [1, 3]
+    assert cache.stats()["entries"] == 2
+
+
+def test_xlsx_export_writes_missing_values_as_blank():
+    df = pd.DataFrame({
+        "구역": [1, 2, 3],
+        "x_bin": pd.array([1, None, 3], dtype="Int64"),
+        "flag": pd.array([True, None, False], dtype="boolean"),
+        "name": pd.array(["a", None, "c"], dtype="string"),
+        "value": [1.5, float("nan"), 2.5],
+        "date": pd.to_datetime(["2024-04-01", None, "2024-04-03"]),
+    })
+    data, file_name, _ = export_bytes({"Data": df}, "xlsx", "zone")
+    assert file_name == "zone.xlsx"
+    restored = pd.read_excel(io.BytesIO(data))
+    assert restored.iloc[1, 1:].isna().all()
+    assert restored["x_bin"].iloc[[0, 2]].tolist() == [1, 3]
+    assert restored["flag"].iloc[[0, 2]].tolist() == [True, False]
+    assert restored["name"].iloc[[0, 2]].tolist() == ["a", "c"]
@@ -0,0 +1,123 @@
+"""기간 비교: 기간별로 잘라 직접 구한 평균 · 최빈값과 같은지, 겹치는 기간 · 빈 기간 · 월별 / 반기 경계"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.periods import MOVEMENT_COLUMNS, compare_periods, custom_periods, half_periods, monthly_periods
+
+COLUMNS = ["RelSpeed", "SpinRate", "Tilt", "InducedVertBreak"]
+
+
+def _pitches(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Date": pd.Timestamp("2024-04-01") + pd.to_timedelta(rng.integers(0, 120 * 24, n), unit="h"),
+        "구종": rng.choice(["직구", "슬라", "커브"], n),
+        "Tilt": rng.choice(["12:30", "1:00", "1:30", "2:00", None], n),
+        "RelSpeed": rng.normal(140, 8, n),
+        "SpinRate": rng.normal(2300, 200, n),
+        "InducedVertBreak": rng.normal(20, 20, n),
+        "HorzBreak": rng.normal(0, 25, n),
+    })
+    df.loc[::13, "RelSpeed"] = np.nan
+    return df
+
+
+def _naive(df, periods, columns):
+    """기간마다 데이터를 잘라서 평균 · 최빈값 (페이지의 이전 계산 방식)"""
+    summary, movement = {}, []
+    for label, start, end in periods:
+        part = df[(df["Date"].dt.normalize() >= start) & (df["Date"].dt.normalize() <= end)]
+        values = {}
+        for column in columns:
+            if column == "Tilt":
+                mode = part[column].mode()
+                values[column] = mode.iloc[0] if not mode.empty else "N/A"
+            else:
+                values[column] = round(part[column].mean(), 2)
+        values["투구수"] = len(part)
+        summary[label] = values
+        by_type = part.groupby("구종")
+        movement.append(by_type[MOVEMENT_COLUMNS].mean().assign(투구수=by_type.size(), 기간=label).reset_index())
+    movement = pd.concat(movement, ignore_index=True)[["기간", "구종", "투구수", *MOVEMENT_COLUMNS]]
+    return pd.DataFrame(summary), movement
+
+
+def _assert_same(df, periods, columns=COLUMNS):
+    summary, movement = compare_periods(df, periods, columns)
+    expected_summary, expected_movement = _naive(df, periods, columns)
+    assert list(summary.index) == columns + ["투구수"]
+    assert list(summary.columns) == [label for label, _, _ in periods]
+    for column in columns + ["투구수"]:
+        if column == "Tilt":
+            assert list(summary.loc[column]) == list(expected_summary.loc[column])
+        else:
+            np.testing.assert_allclose(
+                summary.loc[column].astype(float), expected_summary.loc[column].astype(float), equal_nan=True
+            )
+    key = ["기간", "구종"]
+    actual = movement.sort_values(key).reset_index(drop=True)
+    expected = expected_movement.sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    return summary, movement
+
+
+def test_matches_naive_per_period_mean_with_overlapping_ranges():
+    df = _pitches()
+    periods = custom_periods([
+        ("2024-04-01", "2024-05-31"),
+        ("2024-05-01", "2024-06-30"),  # 앞 기간과 한 달 겹침
+        ("2024-04-01", "2024-07-31"),  # 전체
+        ("2024-06-15", "2024-06-15"),  # 하루
+    ])
+    summary, _ = _assert_same(df, periods)
+    assert summary.loc["투구수", "기간 3"] == len(df)
+
+
+def test_empty_period():
+    df = _pitches()
+    periods = custom_periods([("2024-04-01", "2024-04-30"), ("2023-01-01", "2023-12-31")])
+    summary, movement = _assert_same(df, periods)
+    assert summary.loc["투구수", "기간 2"] == 0
+    assert summary.loc["Tilt", "기간 2"] == "N/A"
+    assert summary.loc[["RelSpeed", "SpinRate"], "기간 2"].isna().all()
+    assert "기간 2" not in set(movement["기간"])
+
+
+def test_tilt_tie_takes_smallest_value():
+    # 2:00 이 먼저 나와도 동률이면 Series.mode 처럼 정렬 순서 첫 값
+    df = _pitches(8).assign(Date=pd.Timestamp("2024-05-01"), Tilt=["2:00", "2:00", "1:30", "1:30", None, None, None, "12:30"])
+    summary, _ = _assert_same(df, custom_periods([("2024-05-01", "2024-05-01")]))
+    assert summary.loc["Tilt", "기간 1"] == "1:30"
+
+
+def test_monthly_periods_cover_whole_months():
+    dates = pd.Series(pd.to_datetime(["2024-03-31 23:30", "2024-04-01 00:10", "2024-04-30 21:00", "2024-06-02 00:00"]))
+    periods = monthly_periods(dates)
+    assert periods == [
+        ("2024-03", pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-31")),
+        ("2024-04", pd.Timestamp("2024-04-01"), pd.Timestamp("2024-04-30")),
+        ("2024-06", pd.Timestamp("2024-06-01"), pd.Timestamp("2024-06-30")),
+    ]
+    df = _pitches(len(dates)).assign(Date=dates)
+    summary, _ = _assert_same(df, periods)
+    assert list(summary.loc["투구수"]) == [1, 2, 1]
+
+
+@pytest.mark.parametrize("days", [10, 11])
+def test_half_periods_split_each_season_without_gap(days):
+    dates = pd.Series(pd.concat([
+        pd.Series(pd.date_range("2023-04-01", periods=days, freq="D") + pd.Timedelta(hours=18)),
+        pd.Series(pd.date_range("2024-03-23", periods=days, freq="D")),
+    ], ignore_index=True))
+    periods = half_periods(dates)
+    assert [label for label, _, _ in periods] == ["2023 전반기", "2023 후반기", "2024 전반기", "2024 후반기"]
+    for (_, first_start, first_end), (_, second_start, second_end) in [periods[:2], periods[2:]]:
+        assert first_start <= first_end < second_start <= second_end
+        assert second_start - first_end == pd.Timedelta(days=1)
+
+    # 모든 투구가 자기 시즌의 한 기간에만 속함
+    df = _pitches(len(dates)).assign(Date=dates)
+    summary, _ = _assert_same(df, periods)
+    assert summary.loc["투구수"].sum() == len(df)
+    assert summary.loc["투구수", "2023 전반기"] == (days + 1) // 2
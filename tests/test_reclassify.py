@@ -0,0 +1,78 @@
+"""구종 재분류: 잘못 붙은 표기 교정, 잘 나뉜 구종 유지, 원래 표기 보존, 불러올 때 끄기"""
+import numpy as np
+import pandas as pd
+
+from core.loader import load_hawkeye
+from core.reclassify import CHANGED, FLAG_COLUMN, ORIGINAL_COLUMN, RECLASSIFY_ENV, reclassify_pitches
+from core.trajectory import APPROACH_COLUMNS
+
+# 구종별 (구속, 회전수, 수직무브, 수평무브, 회전축) — 서로 충분히 떨어진 군집
+CENTERS = {
+    "직구": (148, 2400, 45, -15, "12:30"),
+    "슬라": (134, 2500, 5, 20, "3:00"),
+    "커브": (118, 2600, -30, 15, "7:00"),
+}
+
+
+def _pitches(pitcher, n, seed, season=2024):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for pitch_type, (speed, spin, ivb, hb, tilt) in CENTERS.items():
+        rows.append(pd.DataFrame({
+            "Date": pd.Timestamp(f"{season}-05-01") + pd.to_timedelta(rng.integers(0, 90, n), unit="D"),
+            "투수": pitcher,
+            "구종": pitch_type,
+            "RelSpeed": rng.normal(speed, 1.5, n),
+            "SpinRate": rng.normal(spin, 40, n),
+            "InducedVertBreak": rng.normal(ivb, 3, n),
+            "HorzBreak": rng.normal(hb, 3, n),
+            "Tilt": tilt,
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def _mislabeled(seed=0):
+    # 직구 5구를 슬라로 잘못 표기
+    df = _pitches("양현종", 80, seed)
+    wrong = df.index[df["구종"] == "직구"][:5]
+    df.loc[wrong, "구종"] = "슬라"
+    return df, wrong
+
+
+def test_mislabeled_pitches_are_corrected():
+    df, wrong = _mislabeled()
+    result = reclassify_pitches(df)
+    assert (result.loc[wrong, "구종"] == "직구").all()
+    assert (result.loc[wrong, FLAG_COLUMN] == CHANGED).all()
+    assert (result.drop(index=wrong)[FLAG_COLUMN] != CHANGED).all()
+
+    # 원래 표기는 원래구종에 남고, 다시 돌려도 결과가 같음
+    pd.testing.assert_series_equal(result[ORIGINAL_COLUMN], df["구종"], check_names=False)
+    again = reclassify_pitches(result)
+    pd.testing.assert_frame_equal(again, result)
+
+
+def test_well_separated_types_unchanged():
+    df = pd.concat([_pitches("양현종", 60, 1), _pitches("네일", 60, 2), _pitches("네일", 60, 3, season=2023)], ignore_index=True)
+    result = reclassify_pitches(df)
+    assert (result["구종"] == df["구종"]).all()
+    assert (result[FLAG_COLUMN] != CHANGED).all()
+    assert (result[ORIGINAL_COLUMN] == df["구종"]).all()
+    assert list(df.columns) == list(result.columns)[:len(df.columns)]
+
+
+def test_load_hawkeye_respects_env_switch(tmp_path, monkeypatch):
+    df, wrong = _mislabeled()
+    path = tmp_path / "24_merged_data_수정.xlsx"
+    df.to_excel(path, index=False)
+    metrics = pd.DataFrame(columns=["pitcher", "date", "pitch_type", *APPROACH_COLUMNS])
+
+    monkeypatch.setenv(RECLASSIFY_ENV, "0")
+    raw = load_hawkeye([str(path)], metrics)
+    assert ORIGINAL_COLUMN not in raw.columns
+    assert (raw.loc[wrong, "구종"] == "슬라").all()
+
+    monkeypatch.delenv(RECLASSIFY_ENV)
+    relabelled = load_hawkeye([str(path)], metrics)
+    assert (relabelled.loc[wrong, "구종"] == "직구").all()
+    assert (relabelled.loc[wrong, ORIGINAL_COLUMN] == "슬라").all()
@@ -0,0 +1,26 @@
+"""리포트 기본 기간 · 읽을 시즌이 없을 때"""
+import pytest
+
+from core import report
+from core.loader import DATA_DIR_ENV, load_hawkeye
+
+
+def test_default_period_covers_discovered_seasons(tmp_path, monkeypatch):
+    for name in ["23_merged_data_수정.xlsx", "25_merged_data_수정.xlsx", "PTS 2024 전경기_수정.xlsx"]:
+        (tmp_path / name).touch()
+    monkeypatch.setenv(DATA_DIR_ENV, str(tmp_path))
+    calls = []
+    monkeypatch.setattr(report, "run", lambda *args, **kwargs: calls.append(args) or [])
+
+    report.main(["--all", "--out", str(tmp_path / "out")])
+    report.main(["양현종", "--start", "2025-04-01", "--out", str(tmp_path / "out")])
+    assert [args[:3] for args in calls] == [
+        ([], "2023-01-01", "2025-12-31"),
+        (["양현종"], "2025-04-01", "2025-12-31"),
+    ]
+
+
+def test_load_hawkeye_without_seasons_raises_friendly_error():
+    for kwargs in [dict(urls=[]), dict(seasons=[])]:
+        with pytest.raises(ValueError, match="불러올 시즌이 없습니다"):
+            load_hawkeye(**kwargs)
@@ -0,0 +1,106 @@
+"""구종 색인: 시즌 단위 추가 · 교체 뒤 검색 결과를 전수 비교와 맞춰 봄"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.similarity import SIMILARITY_FEATURES, PitchIndex
+
+PITCH_TYPES = ["직구", "슬라이더", "커브"]
+
+
+def _profiles(season, n_pitchers, seed):
+    rng = np.random.default_rng(seed)
+    rows = [(season, f"투수{i}", pitch_type) for i in range(n_pitchers) for pitch_type in PITCH_TYPES]
+    frame = pd.DataFrame(rows, columns=["season", "pitcher", "pitch_type"])
+    frame.insert(3, "pitches", 50)
+    for column in SIMILARITY_FEATURES:
+        frame[column] = rng.normal(size=len(frame))
+    frame.loc[::17, "SpinRate"] = np.nan  # 빈 특성은 평균으로 채워서 비교
+    return frame
+
+
+def _brute_force(index, pitcher, pitch_type, season, k, seasons=None, same_type=True, exclude_self=True):
+    live = index.profiles[index.live].reset_index(drop=True)
+    vectors = index._standardize(live)
+    target = vectors[((live["pitcher"] == pitcher) & (live["pitch_type"] == pitch_type) & (live["season"] == season)).to_numpy()][0]
+    allowed = ~((live["pitcher"] == pitcher) & (live["pitch_type"] == pitch_type) & (live["season"] == season)).to_numpy()
+    if seasons is not None:
+        allowed &= live["season"].isin(seasons).to_numpy()
+    if same_type:
+        allowed &= (live["pitch_type"] == pitch_type).to_numpy()
+    if exclude_self:
+        allowed &= (live["pitcher"] != pitcher).to_numpy()
+    distances = np.sqrt(((vectors - target) ** 2).sum(axis=1))[allowed]
+    rows = np.argsort(distances, kind="stable")[:k]
+    return live[allowed].iloc[rows].assign(distance=distances[rows].round(3)).reset_index(drop=True)
+
+
+def _assert_same_neighbors(index, *args, **kwargs):
+    result = index.query(*args, **kwargs)
+    expected = _brute_force(index, *args, **kwargs)
+    np.testing.assert_allclose(result["distance"], expected["distance"], atol=1e-3)
+    keys = ["season", "pitcher", "pitch_type"]
+    # 거리가 같은 이웃은 순서가 바뀔 수 있어서 거리별 집합으로 비교
+    assert sorted(map(tuple, result[keys + ["distance"]].to_numpy().tolist())) == \
+        sorted(map(tuple, expected[keys + ["distance"]].to_numpy().tolist()))
+
+
+def test_incremental_update_matches_brute_force():
+    index = PitchIndex(leaf_size=4)
+    assert index.update(_profiles(2023, 200, seed=1))
+    assert index.rebuilds == 1
+    _assert_same_neighbors(index, "투수3", "직구", 2023, 10)
+
+    # 작은 시즌 추가: 트리를 다시 만들지 않고 버퍼에 붙임
+    assert index.update(_profiles(2024, 20, seed=2))
+    assert index.rebuilds == 1
+    assert len(index) == 660
+    _assert_same_neighbors(index, "투수3", "직구", 2024, 10)
+    _assert_same_neighbors(index, "투수5", "커브", 2023, 7, seasons=[2024], same_type=False, exclude_self=False)
+
+    # 같은 내용은 건너뛰고, 바뀐 시즌은 예전 행을 지우고 교체
+    assert not index.update(_profiles(2024, 20, seed=2))
+    assert index.update(_profiles(2024, 25, seed=3))
+    assert len(index) == 675
+    _assert_same_neighbors(index, "투수1", "슬라이더", 2024, 15)
+    _assert_same_neighbors(index, "투수1", "슬라이더", 2023, 15, seasons=[2023, 2024])
+
+    # 버퍼 · 지운 행이 많아지면 트리를 다시 만듦
+    assert index.update(_profiles(2023, 60, seed=4))
+    assert index.rebuilds == 2
+    assert len(index) == 255
+    _assert_same_neighbors(index, "투수2", "직구", 2023, 10)
+
+
+def test_query_without_base_profile():
+    index = PitchIndex()
+    assert index.query("투수0", "직구") is None
+    index.update(_profiles(2023, 5, seed=1))
+    assert index.query("없는 투수", "직구") is None
+    assert index.query("투수0", "직구", season=2024) is None
+
+
+def test_query_during_updates():
+    index = PitchIndex(leaf_size=4)
+    index.update(_profiles(2023, 100, seed=1))
+    versions = [_profiles(2024, n, seed=n) for n in (10, 40, 80)]
+    errors = []
+
+    def search():
+        for _ in range(200):
+            try:
+                result = index.query("투수1", "직구", season=2023, k=5)
+                assert result is not None and len(result) == 5
+            except Exception as error:  # 다른 스레드에서 난 오류를 모아서 확인
+                errors.append(error)
+
+    threads = [threading.Thread(target=search) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for i in range(30):
+        index.update(versions[i % len(versions)])
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    _assert_same_neighbors(index, "투수1", "직구", 2023, 5)
@@ -0,0 +1,38 @@
+"""실행 기록 · 프로파일러 정리"""
+import threading
+import time
+
+from core import timing
+
+
+def test_profiler_switched_off_when_run_thread_exits():
+    runs = []
+
+    def script():
+        # end_run 없이 끝나는 실행 (st.stop() · 예외와 같음)
+        run = timing.begin_run("테스트", profile=True)
+        runs.append(run)
+        threading.Thread(target=timing._finish_with_thread, args=(threading.current_thread(), run), daemon=True).start()
+        with timing.stage("단계"):
+            sum(range(1000))
+
+    thread = threading.Thread(target=script)
+    thread.start()
+    thread.join()
+    deadline = time.monotonic() + 5
+    while runs[0].seconds is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert runs[0].seconds is not None
+    assert runs[0].profile_text
+    assert timing._profiling == []
+
+
+def test_begin_run_finishes_leftover_profile():
+    first = timing.begin_run("첫 실행", profile=True)
+    second = timing.begin_run("다음 실행", profile=True)  # end_run 없이 다시 시작
+    assert first.seconds is not None and first.profile_error is None
+    assert second.profile_error is None
+    assert timing.end_run() is second
+    assert timing._profiling == []
+    first.finish()  # 여러 번 불러도 그대로
+    assert first.profile_text
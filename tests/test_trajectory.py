@@ -0,0 +1,67 @@
+"""등가속도 모델 적합 · y 통과 시간"""
+import numpy as np
+import pandas as pd
+
+from core.trajectory import FIT_COLUMNS, PLATE_Y, REFERENCE_Y, approach_metrics, fit_table, position_at_y, time_at_y
+
+# 알려진 포물선 (x0, vx0, ax, y0, vy0, ay, z0, vz0, az), cm · s
+TRUE = np.array([-20.0, 150.0, -300.0, 1650.0, -3800.0, 1200.0, 180.0, -250.0, -900.0])
+
+
+def _samples(coefficients, times, pitch_id=0):
+    c = coefficients.reshape(3, 3)
+    positions = c[:, 0] + c[:, 1] * times[:, None] + 0.5 * c[:, 2] * times[:, None] ** 2
+    return pd.DataFrame({
+        "pitch_id": pitch_id, "time": times,
+        "ball_pos_X": positions[:, 0], "ball_pos_Y": positions[:, 1], "ball_pos_Z": positions[:, 2],
+    })
+
+
+def _exact(y):
+    """TRUE 계수에서 y 를 지나는 시간 (릴리스 → 홈플레이트 쪽 해)"""
+    x0, vx, ax, y0, vy, ay, z0, vz, az = TRUE
+    t = (-vy - np.sqrt(vy ** 2 - 2 * ay * (y0 - y))) / ay
+    return t, np.array([x0 + vx * t + 0.5 * ax * t ** 2, y, z0 + vz * t + 0.5 * az * t ** 2])
+
+
+def test_fit_recovers_known_parabola():
+    fits = fit_table(_samples(TRUE, np.linspace(0, 0.4, 40)), meta_cols=())
+    np.testing.assert_allclose(fits[FIT_COLUMNS].to_numpy()[0], TRUE, atol=1e-6)
+    assert fits["rmse"].iloc[0] < 1e-6
+    assert fits["n_samples"].iloc[0] == 40
+
+
+def test_position_at_y_around_first_sample_and_plate():
+    coefficients = TRUE[None, :]
+    for y in [TRUE[3] + 30, TRUE[3], TRUE[3] - 30, PLATE_Y]:
+        t, expected = _exact(y)
+        np.testing.assert_allclose(time_at_y(coefficients, y), [t], atol=1e-9)
+        np.testing.assert_allclose(position_at_y(coefficients, y)[0], expected, atol=1e-6)
+
+    # 첫 샘플보다 릴리스 쪽은 뒤로 연장 (꼭짓점 너머 해를 고르지 않음)
+    assert time_at_y(coefficients, TRUE[3] + 30)[0] < 0
+
+
+def test_time_at_y_ignores_roots_past_vertex():
+    coefficients = TRUE[None, :]
+    vertex_y = TRUE[3] - TRUE[4] ** 2 / (2 * TRUE[5])
+    t = time_at_y(coefficients, np.array([TRUE[3] + 100, PLATE_Y, vertex_y + 1, vertex_y - 1]))[0]
+    assert np.all(t[:3] <= -TRUE[4] / TRUE[5])
+    assert np.isnan(t[3])  # 도달하지 못하는 y
+
+    # 가속도가 0 이면 직선 해
+    linear = TRUE.copy()
+    linear[5] = 0
+    np.testing.assert_allclose(time_at_y(linear[None, :], PLATE_Y), [(TRUE[3] - PLATE_Y) / -TRUE[4]])
+
+
+def test_time_to_plate_measured_from_reference_y():
+    # 같은 궤적을 다른 시점부터 추적해도 도달시간은 같아야 함
+    times = np.linspace(0, 0.4, 40)
+    late = _samples(TRUE, times[8:], pitch_id=1)
+    fits = fit_table(pd.concat([_samples(TRUE, times), late], ignore_index=True), meta_cols=())
+    assert fits["y0"].iloc[1] < REFERENCE_Y < fits["y0"].iloc[0]
+
+    metrics = approach_metrics(fits)
+    expected = _exact(PLATE_Y)[0] - _exact(REFERENCE_Y)[0]
+    np.testing.assert_allclose(metrics["TimeToPlate"], [round(expected, 3)] * 2)
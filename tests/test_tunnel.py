@@ -0,0 +1,58 @@
+"""피칭 터널 분리 지점"""
+import numpy as np
+import pandas as pd
+
+from core.trajectory import FIT_COLUMNS, PLATE_Y
+from core.tunnel import TUNNEL_STEP, TUNNEL_WIDTH, consecutive_tunnels, type_tunnels
+
+Y0, VY, AY = 1650.0, -4000.0, 1000.0
+EXTRA_AZ = -600.0  # 두 번째 궤적에만 더한 z 가속도
+
+
+def _y_at(t):
+    return Y0 + VY * t + 0.5 * AY * t ** 2
+
+
+def _fits(y0_b=Y0):
+    """y 운동은 같고 z 가속도만 다른 두 궤적 (두 번째는 y0_b 에서부터 추적)"""
+    a = np.array([0.0, 100.0, 0.0, Y0, VY, AY, 180.0, -300.0, -800.0])
+    # 두 번째 궤적을 y0_b 를 지나는 시점 기준 계수로 다시 씀
+    t0 = (-VY - np.sqrt(VY ** 2 - 2 * AY * (Y0 - y0_b))) / AY
+    az = a[8] + EXTRA_AZ
+    b = np.array([
+        a[0] + a[1] * t0, a[1], a[2],
+        y0_b, VY + AY * t0, AY,
+        a[6] + a[7] * t0 + 0.5 * az * t0 ** 2, a[7] + az * t0, az,
+    ])
+    fits = pd.DataFrame([a, b], columns=FIT_COLUMNS)
+    fits["pitch_id"] = [1, 2]
+    fits["pitcher"] = "A"
+    fits["date"] = pd.Timestamp("2024-04-01")
+    fits["pitch_type"] = ["직구", "슬라이더"]
+    return fits
+
+
+def _expected_split_y():
+    """간격 0.5·|EXTRA_AZ|·t² 이 TUNNEL_WIDTH 가 되는 y 를 지난 뒤 첫 격자"""
+    y_split = _y_at(np.sqrt(2 * TUNNEL_WIDTH / abs(EXTRA_AZ)))
+    return PLATE_Y + TUNNEL_STEP * np.floor((y_split - PLATE_Y) / TUNNEL_STEP)
+
+
+def test_type_tunnels_split_point():
+    table = type_tunnels(_fits())
+    assert len(table) == 1
+    row = table.iloc[0]
+    assert row["split_y"] == _expected_split_y()
+    assert row["release_gap"] == 0
+    assert row["tunnel_length"] == Y0 - row["split_y"]
+    assert row["split_to_plate"] == row["split_y"] - PLATE_Y
+
+
+def test_consecutive_tunnels_start_at_later_first_sample():
+    # 두 번째 궤적은 1600 부터 추적: 비교는 1600 아래 첫 격자부터, 분리 지점은 그대로
+    table = consecutive_tunnels(_fits(y0_b=1600.0))
+    row = table.iloc[0]
+    start_y = PLATE_Y + TUNNEL_STEP * np.floor((1600.0 - PLATE_Y) / TUNNEL_STEP)
+    assert row["split_y"] == _expected_split_y()
+    assert row["tunnel_length"] == start_y - row["split_y"]
+    assert row["release_gap"] < 1
@@ -0,0 +1,27 @@
+"""존 히트맵 구역별 표"""
+import numpy as np
+
+from core.zone import GRIDS, bin_cells, zone_stats, zone_table
+
+
+def _arrays(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    calls = rng.choice(list("BSFH"), n)
+    return dict(
+        x=rng.normal(0, 30, n), z=rng.normal(75, 30, n),
+        has_call=np.ones(n, dtype=bool), is_strike=calls != "B", is_whiff=calls == "S",
+        is_swing=np.isin(calls, ["S", "F", "H"]), has_exit_speed=calls == "H",
+        exit_speed=np.where(calls == "H", rng.normal(130, 10, n), 0.0),
+    )
+
+
+def test_zone_table_one_row_per_region():
+    arrays = _arrays()
+    for name, grid in GRIDS.items():
+        table = zone_table(zone_stats(arrays, grid), grid)
+        assert table["구역"].tolist() == list(range(1, grid["n_regions"] + 1)), name
+        assert table["투구수"].sum() == (bin_cells(arrays, grid) >= 0).sum(), name
+
+    chase = zone_table(zone_stats(arrays, GRIDS["3x3 + 체이스"]), GRIDS["3x3 + 체이스"])
+    assert chase["x_bin"].isna().sum() == 4
+    assert chase.loc[4, ["x_bin", "z_bin", "x_범위", "z_범위"]].tolist() == [2, 2, "-8~8", "66~85"]